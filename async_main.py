@@ -0,0 +1,144 @@
+"""Asyncio entry point serving the bot through Bolt's AsyncApp on aiohttp.
+
+Every listener registered in `main` is registered here as well, through a
+thread bridge: the listener bodies are the synchronous ones the Flask app
+runs, and each runs on one of ASYNC_HANDLER_THREADS threads. Their `ack()`
+and `client.*` calls are sent on the event loop with Slack's async Web client
+while the listener's thread blocks until the call completes. A slow Slack API
+round trip therefore parks one thread instead of a whole worker process, but
+concurrency is still bounded by the thread pool, not by the event loop.
+
+Run it with:
+
+    gunicorn async_main:web_app --worker-class aiohttp.GunicornWebWorker
+
+or `python async_main.py`.
+"""
+import asyncio
+import inspect
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+from slack_bolt.async_app import AsyncApp
+
+import main
+
+client = None
+if main.api_url:
+    from slack_sdk.web.async_client import AsyncWebClient
+    client = AsyncWebClient(token=main.token, base_url=main.api_url.rstrip("/") + "/")
+
+async_app = AsyncApp(
+    token=main.token,
+    signing_secret=main.secret,
+    client=client,
+)
+
+# Threads that run listener bodies. They spend nearly all their time waiting
+# for the event loop to finish Slack API calls, so this can be generous.
+executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ASYNC_HANDLER_THREADS", "200")),
+    thread_name_prefix="listener",
+)
+
+
+class LoopBridge:
+    """Expose an async callable or client to synchronous code on another thread.
+
+    Calls that return a coroutine are scheduled on `loop` and block the calling
+    thread until they complete; everything else passes straight through.
+    """
+
+    def __init__(self, target, loop):
+        self._target = target
+        self._loop = loop
+
+    def _run(self, result):
+        if inspect.isawaitable(result):
+            return asyncio.run_coroutine_threadsafe(result, self._loop).result()
+        return result
+
+    def __call__(self, *args, **kwargs):
+        return self._run(self._target(*args, **kwargs))
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        return lambda *args, **kwargs: self._run(attr(*args, **kwargs))
+
+
+def bridge(func):
+    """Return an async Bolt listener that runs the sync listener `func`."""
+    arg_names = inspect.getfullargspec(inspect.unwrap(func)).args
+
+    # Bolt injects a single `args` object holding every listener argument.
+    async def async_listener(args):
+        loop = asyncio.get_running_loop()
+        kwargs = {}
+        for name in arg_names:
+            value = getattr(args, name)
+            if name in ("ack", "client"):
+                value = LoopBridge(value, loop)
+            kwargs[name] = value
+        await loop.run_in_executor(executor, lambda: func(**kwargs))
+
+    async_listener.__name__ = func.__name__
+    async_listener.__qualname__ = func.__qualname__
+    return async_listener
+
+
+for kind, matcher, func in main.LISTENERS:
+    getattr(async_app, kind)(matcher)(bridge(func))
+
+
+async def index(request):
+    return web.Response(text="✅ HFC Slack Bot is running.")
+
+
+async def export_metrics(request):
+    return web.Response(text=main.metrics.render(), content_type="text/plain", charset="utf-8")
+
+
+async def stats(request):
+    return web.json_response(main.stats())
+
+
+async def profile_reports(request):
+    text, status, headers = main.profile_report(request.headers.get("Authorization"))
+    return web.Response(text=text, status=status, headers=headers)
+
+
+async def download_export(request):
+    loop = asyncio.get_running_loop()
+    # the store and the row generator block, so they run on listener threads
+    chunks, status, headers = await loop.run_in_executor(
+        executor, main.export_download, request.match_info["poll_id"],
+        request.query.get("format", "csv"), request.headers.get("Authorization"))
+    if status != 200:
+        return web.Response(text=chunks, status=status, headers=headers)
+    response = web.StreamResponse(headers=headers)
+    await response.prepare(request)
+    while True:
+        chunk = await loop.run_in_executor(executor, next, chunks, None)
+        if chunk is None:
+            break
+        await response.write(chunk.encode())
+    await response.write_eof()
+    return response
+
+
+def add_routes(router):
+    router.add_get("/", index)
+    router.add_get("/metrics", export_metrics)
+    router.add_get("/stats", stats)
+    router.add_get("/profiles", profile_reports)
+    router.add_get("/polls/{poll_id}/export", download_export)
+
+
+web_app = async_app.web_app(path="/slack/events")
+add_routes(web_app.router)
+
+if __name__ == "__main__":
+    web.run_app(web_app, host="0.0.0.0", port=int(os.environ.get("PORT", 3000)))
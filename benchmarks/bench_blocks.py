@@ -0,0 +1,67 @@
+"""Micro-benchmark for the poll configuration Block Kit builders.
+
+Reports the mean time per call and the number of allocations each call leaves
+behind (the blocks it returns), for an empty modal and for a fully filled-in
+10 x 10 modal.
+
+    python benchmarks/bench_blocks.py [--repeat N]
+"""
+import argparse
+import timeit
+import tracemalloc
+
+from harness import load_main
+
+
+def fully_configured_state():
+    state = {}
+    for i in range(10):
+        state[f"q_block_{i}"] = {f"q_input_{i}": {"value": f"Question {i}"}}
+        state[f"feedback_q_block_{i}"] = {f"feedback_q_input_{i}": {"value": f"Question {i}"}}
+        state[f"multi_block_{i}"] = {f"multi_select_{i}": {"selected_options": [{"value": "allow_multi"}]}}
+        for j in range(10):
+            state[f"opt_block_{i}_{j}"] = {f"opt_input_{i}_{j}": {"value": f"Option {j}"}}
+    return state
+
+
+def cases(main):
+    state = fully_configured_state()
+    all_vote = {str(i): "vote" for i in range(10)}
+    questions = [f"Question {i}" for i in range(10)]
+    return [
+        ("build_blended_blocks", "empty", lambda: main.build_blended_blocks("Title")),
+        ("build_blended_blocks", "10x10", lambda: main.build_blended_blocks("Title", all_vote, state)),
+        ("build_question_type_blocks", "empty", lambda: main.build_question_type_blocks("Title")),
+        ("build_question_type_blocks", "10x10", lambda: main.build_question_type_blocks("Title", all_vote, state)),
+        ("build_detail_blocks", "10x10", lambda: main.build_detail_blocks("Title", questions, ["vote"] * 10, state)),
+        ("build_feedback_blocks", "empty", lambda: main.build_feedback_blocks("Title")),
+        ("build_feedback_blocks", "10x10", lambda: main.build_feedback_blocks("Title", all_vote, state)),
+    ]
+
+
+def allocations(func):
+    """Return (blocks, bytes) still allocated from one call's result."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func()  # noqa: F841  (kept alive for the snapshot)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    return sum(s.count_diff for s in stats), sum(s.size_diff for s in stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    bot = load_main()
+    print(f"{'builder':<28} {'case':<6} {'us/call':>9} {'allocs':>8} {'bytes':>9}")
+    for name, case, func in cases(bot):
+        per_call = timeit.timeit(func, number=args.repeat) / args.repeat
+        count, size = allocations(func)
+        print(f"{name:<28} {case:<6} {per_call * 1e6:>9.1f} {count:>8} {size:>9}")
+
+
+if __name__ == "__main__":
+    main()
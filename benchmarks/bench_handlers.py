@@ -0,0 +1,232 @@
+"""Handler-level load benchmark.
+
+Replays a synthetic workload straight through the Bolt listeners, using the
+same fakes as the test suite, and reports throughput, latency percentiles and
+peak traced memory for each scenario:
+
+    vote           handle_vote, one call per user (M calls each with --multi)
+    feedback       handle_feedback_submission, one submission per user
+    results        show_poll_results on an unchanged poll (served from cache)
+    results_cold   show_poll_results with the results cache cleared each call
+    close          close_poll on a poll that already holds every vote
+
+    python benchmarks/bench_handlers.py --users 2000 --options 5 --named
+    python benchmarks/bench_handlers.py --save         # record a new baseline
+    python benchmarks/bench_handlers.py --compare      # diff against it
+
+Peak memory comes from a second, traced pass over the same workload; skip it
+with --no-memory. Results are compared against benchmarks/baseline.json by
+--compare; --json writes the raw numbers of the run to a file.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+from harness import MockSlackClient, load_main
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def noop_ack(**kwargs):
+    pass
+
+
+def sent(client, _):
+    """Drop what the fake client recorded so it does not count towards memory."""
+    client.messages.clear()
+    client.updates.clear()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def vote_poll(main, args, channel):
+    return main.store.add_poll(main.new_poll_data(
+        type="vote", question="Benchmark", options=[f"Option {i}" for i in range(args.options)],
+        tallies={i: 0 for i in range(args.options)}, creator_id="Ucreator",
+        channel_id=channel, anonymous=not args.named, multi=args.multi, active=True))
+
+
+def feedback_poll(main, args, channel):
+    # one multiple-choice, one yes/no, one star and one paragraph question
+    return main.store.add_poll(main.new_poll_data(
+        type="feedback", question="Benchmark",
+        feedback_questions=["Pick", "Agree?", "Rate", "Why?"],
+        feedback_formats=[None, None, "stars", "paragraph"],
+        feedback_kinds=["vote", "vote", "feedback", "feedback"],
+        question_options=[[f"Option {i}" for i in range(args.options)], [], [], []],
+        vote_tallies=[{i: 0 for i in range(args.options)}, {"yes": 0, "no": 0}, {}, {}],
+        multi_questions=[args.multi, False, False, False],
+        creator_id="Ucreator", channel_id=channel, anonymous=not args.named, active=True))
+
+
+def vote_calls(main, args, poll, client):
+    for n in range(args.users):
+        body = {"channel": {"id": poll["channel_id"]}, "user": {"id": f"U{n}"}}
+        choices = range(args.options) if args.multi else [n % args.options]
+        for choice in choices:
+            action = {"action_id": f"vote_{choice}", "value": poll["poll_id"]}
+            yield lambda body=body, action=action: sent(client, main.handle_vote(noop_ack, body, action, client))
+
+
+def feedback_state(args, n):
+    pick = {"value": str(n % args.options)}
+    return {"values": {
+        "resp_block_0": {"resp_input_0": {"selected_options": [pick]} if args.multi else {"selected_option": pick}},
+        "resp_block_1": {"resp_input_1": {"selected_option": {"value": "yes" if n % 3 else "no"}}},
+        "resp_block_2": {"resp_input_2": {"selected_option": {"value": str(n % 5 + 1)}}},
+        "resp_block_3": {"resp_input_3": {"value": f"Free-text answer number {n} " + "lorem ipsum " * 4}},
+    }}
+
+
+def feedback_calls(main, args, poll, client):
+    view_meta = json.dumps({"poll_id": poll["poll_id"]})
+    for n in range(args.users):
+        body = {"user": {"id": f"U{n}"}}
+        view = {"private_metadata": view_meta, "state": feedback_state(args, n)}
+        yield lambda body=body, view=view: sent(client, main.handle_feedback_submission(noop_ack, body, view, client))
+
+
+def run_calls(calls):
+    """Time every call and return the per-call latencies in seconds."""
+    latencies = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def scenarios(main, args):
+    """Yield (name, setup) pairs; setup() prepares state and returns the calls."""
+    client = MockSlackClient()
+    fill = {"vote": (vote_poll, vote_calls), "feedback": (feedback_poll, feedback_calls)}
+    make_poll, make_calls = fill[args.poll]
+
+    def filled_poll(channel):
+        poll = make_poll(main, args, channel)
+        if args.poll == "vote":
+            # straight into the store: replaying handle_vote here would render
+            # the voter's results once per vote and dominate the run time
+            for n in range(args.users):
+                for choice in range(args.options) if args.multi else [n % args.options]:
+                    main.store.record_vote(poll, f"U{n}", choice)
+        else:
+            for call in make_calls(main, args, poll, client):
+                call()
+        return poll
+
+    def results(cold):
+        filled_poll("Cresults")
+        body = {"channel_id": "Cresults", "user_id": "U0"}
+
+        def call():
+            if cold:
+                main.results_cache = main.VersionedCache()
+            sent(client, main.show_poll_results(noop_ack, body, client))
+        return [call] * args.reads
+
+    def close():
+        calls = []
+        for n in range(args.closes):
+            filled_poll(f"Cclose{n}")
+            body = {"channel_id": f"Cclose{n}", "user_id": "Ucreator"}
+            calls.append(lambda body=body: sent(client, main.close_poll(noop_ack, body, client)))
+        return calls
+
+    yield args.poll, lambda: list(make_calls(main, args, make_poll(main, args, "Cload"), client))
+    yield "results", lambda: results(cold=False)
+    yield "results_cold", lambda: results(cold=True)
+    yield "close", close
+
+
+def measure(args):
+    report = {}
+    for name, setup in scenarios(load_main(), args):
+        latencies = run_calls(setup())
+        total = sum(latencies)
+        peak = None
+        if args.memory:
+            # second pass on fresh state, traced, for peak memory only; tracing
+            # slows every allocation down, so its timings are not used
+            setup = dict(scenarios(load_main(), args))[name]
+            tracemalloc.start()
+            run_calls(setup())
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        report[name] = {
+            "calls": len(latencies),
+            "ops_per_sec": round(len(latencies) / total, 1) if total else None,
+            "p50_ms": round(percentile(latencies, 50) * 1e3, 4),
+            "p95_ms": round(percentile(latencies, 95) * 1e3, 4),
+            "p99_ms": round(percentile(latencies, 99) * 1e3, 4),
+            "mean_ms": round(statistics.fmean(latencies) * 1e3, 4),
+            "peak_kib": round(peak / 1024, 1) if peak is not None else None,
+        }
+    return report
+
+
+def workload_key(args):
+    mode = "multi" if args.multi else "single"
+    visibility = "named" if args.named else "anonymous"
+    return f"{args.poll}/{args.users}u/{args.options}o/{mode}/{visibility}"
+
+
+def print_report(report, baseline=None):
+    columns = ("ops_per_sec", "p50_ms", "p95_ms", "p99_ms", "peak_kib")
+    print(f"{'scenario':<14}{'calls':>7}" + "".join(f"{c:>18}" for c in columns))
+    for name, row in report.items():
+        line = f"{name:<14}{row['calls']:>7}"
+        for col in columns:
+            cell = f"{row[col]}"
+            if row[col] is not None and baseline and name in baseline and baseline[name].get(col):
+                change = (row[col] - baseline[name][col]) / baseline[name][col] * 100
+                cell += f" ({change:+.0f}%)"
+            line += f"{cell:>18}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Handler-level load benchmark.")
+    parser.add_argument("--poll", choices=("vote", "feedback"), default="vote")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--options", type=int, default=5)
+    parser.add_argument("--multi", action="store_true", help="allow multiple selections")
+    parser.add_argument("--named", action="store_true", help="non-anonymous poll")
+    parser.add_argument("--reads", type=int, default=200, help="/pollresults calls")
+    parser.add_argument("--closes", type=int, default=5, help="polls to close")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="skip the traced pass that measures peak memory")
+    parser.add_argument("--json", help="write this run's numbers to a file")
+    parser.add_argument("--save", action="store_true", help=f"store the run in {BASELINE}")
+    parser.add_argument("--compare", action="store_true", help="show changes against the baseline")
+    args = parser.parse_args()
+
+    key = workload_key(args)
+    report = measure(args)
+    baselines = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baselines = json.load(f)
+
+    print(f"workload: {key}")
+    print_report(report, baselines.get(key) if args.compare else None)
+    if args.compare and key not in baselines:
+        print(f"no baseline recorded for {key}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({key: report}, f, indent=2)
+    if args.save:
+        baselines[key] = report
+        with open(BASELINE, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
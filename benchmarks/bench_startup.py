@@ -0,0 +1,102 @@
+"""Cold start benchmark: how soon a fresh process can answer Slack.
+
+Each run starts a new Python process that imports `main` and then sends,
+through Flask's test client, GET / followed by two signed slash commands to
+/slack/events. It reports the app's own startup phases (see startup.py), the
+time from process start to each first answer and how long the first event
+took compared with the second. Web API calls, including Bolt's auth.test,
+go to the local stand-in, whose --api-latency stands in for the round trip to
+Slack:
+
+    python benchmarks/bench_startup.py --runs 5 --api-latency 0.3
+    python benchmarks/bench_startup.py --fast-start   # FAST_START=1 only
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import slack_api
+from load_signed import ROOT, sign, slash_command
+
+SECRET = "startup-secret"
+
+
+def child():
+    """Runs in the measured process; prints one JSON line of timings."""
+    sys.path.insert(0, ROOT)
+    from startup import process_age
+
+    import main
+    imported = process_age()
+    client = main.flask_app.test_client()
+
+    def timed(send):
+        start = time.perf_counter()
+        response = send()
+        assert response.status_code == 200, response.status_code
+        return (time.perf_counter() - start) * 1e3, process_age()
+
+    def event():
+        body = slash_command("/pollresults", "U0START")
+        return client.post("/slack/events", data=body, headers=sign(SECRET, body))
+
+    index_ms, index_at = timed(lambda: client.get("/"))
+    first_ms, first_at = timed(event)
+    second_ms, _ = timed(event)
+    report = main.startup.report()
+    print(json.dumps({
+        "import_s": imported, "index_at_s": index_at, "first_event_at_s": first_at,
+        "index_ms": index_ms, "first_event_ms": first_ms, "second_event_ms": second_ms,
+        "phases_ms": report["phases_ms"],
+    }))
+
+
+def run_once(api, fast_start):
+    env = dict(os.environ, SLACK_API_URL=api.url, SLACK_BOT_TOKEN="xoxb-startup",
+               SLACK_SIGNING_SECRET=SECRET, SLACK_API_WORKERS="0",
+               FAST_START="1" if fast_start else "0")
+    out = subprocess.run([sys.executable, __file__, "--child"], env=env, cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def report(mode, runs):
+    print(f"\n{mode} (median of {len(runs)} runs)")
+    median = lambda key: statistics.median(r[key] for r in runs)
+    print(f"  import main done at   {median('import_s') * 1e3:8.0f} ms after process start")
+    print(f"  first GET / answered  {median('index_at_s') * 1e3:8.0f} ms")
+    print(f"  first event answered  {median('first_event_at_s') * 1e3:8.0f} ms")
+    print(f"  first event took      {median('first_event_ms'):8.1f} ms (second {median('second_event_ms'):.1f} ms)")
+    for phase in runs[0]["phases_ms"]:
+        print(f"    {phase:<18} {statistics.median(r['phases_ms'][phase] for r in runs):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--api-latency", type=float, default=0.3,
+                        help="seconds the stand-in adds to every Web API call")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--fast-start", action="store_true", help="only measure FAST_START=1")
+    mode.add_argument("--default", action="store_true", help="only measure the default start")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child()
+
+    api = slack_api.SlackAPI(latency=args.api_latency).start()
+    modes = [("default", False), ("FAST_START=1", True)]
+    if args.fast_start:
+        modes = modes[1:]
+    elif args.default:
+        modes = modes[:1]
+    for name, fast_start in modes:
+        report(name, [run_once(api, fast_start) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Load `main` for benchmarking with the same fakes the test suite uses.
+
+Flask and Slack Bolt are replaced by the stand-ins from tests/test_poll.py so
+listeners and builders can be called directly, without Slack credentials or
+network access.
+"""
+import importlib
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from test_poll import DummyFlask, FakeApp, FakeHandler, MockSlackClient  # noqa: E402,F401
+
+
+def load_main(**env):
+    """Import a fresh copy of `main` against the fakes, with `env` applied."""
+    fake_adapter_flask = types.SimpleNamespace(SlackRequestHandler=lambda app: FakeHandler(app))
+    sys.modules["flask"] = types.SimpleNamespace(Flask=DummyFlask, request=None)
+    sys.modules["slack_bolt"] = types.SimpleNamespace(App=FakeApp)
+    sys.modules["slack_bolt.adapter"] = types.SimpleNamespace(flask=fake_adapter_flask)
+    sys.modules["slack_bolt.adapter.flask"] = fake_adapter_flask
+    os.environ.setdefault("SLACK_BOT_TOKEN", "x")
+    os.environ.setdefault("SLACK_SIGNING_SECRET", "y")
+    os.environ.setdefault("SLACK_API_WORKERS", "0")
+    os.environ.update(env)
+    sys.modules.pop("main", None)
+    return importlib.import_module("main")
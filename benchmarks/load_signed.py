@@ -0,0 +1,289 @@
+"""End-to-end load generator for the Flask app.
+
+Sends properly signed slash commands and interactivity payloads to
+/slack/events, so every request pays for the whole path: form decoding,
+signature verification, Bolt's listener matching and the listener's ack().
+Outbound Web API calls go to the local stand-in in slack_api.py.
+
+By default the real `main` is imported and driven through Flask's test client:
+
+    python benchmarks/load_signed.py --requests 5000 --concurrency 8
+
+To measure a server such as gunicorn instead, start this script first (it
+serves the stand-in and waits for the server to answer on /), then start the
+server pointed at the stand-in:
+
+    python benchmarks/load_signed.py --url http://127.0.0.1:3000 --api-port 3001
+    SLACK_API_URL=http://127.0.0.1:3001/api/ SLACK_BOT_TOKEN=xoxb-load \\
+        SLACK_SIGNING_SECRET=load-secret gunicorn main:flask_app -b :3000
+
+With more than one gunicorn worker, set POLL_DB_PATH so every worker sees the
+poll the script creates.
+
+--mix sets the share of each request kind: `vote` (a block_actions button
+click), `results` (/pollresults), `poll` (/poll, which opens a modal) and
+`index` (GET /, the unsigned floor of the web stack). The --api-* options
+slow down or rate-limit the stand-in; see slack_api.py.
+"""
+import argparse
+import hashlib
+import hmac
+import http.client
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import slack_api
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHANNEL = "C0LOAD"
+CREATOR = "U0CREATOR"
+# Slack gives every interaction its own trigger_id; the bot drops repeats
+TRIGGERS = itertools.count()
+
+
+def sign(secret, body, timestamp=None):
+    """Return the Slack signature headers for the form-encoded `body`."""
+    timestamp = str(int(time.time()) if timestamp is None else timestamp)
+    base = f"v0:{timestamp}:{body}".encode()
+    digest = hmac.new(secret.encode(), base, hashlib.sha256).hexdigest()
+    return {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": f"v0={digest}",
+    }
+
+
+def slash_command(command, user, text=""):
+    return urlencode({
+        "token": "load", "team_id": "T0LOAD", "team_domain": "load", "api_app_id": "A0LOAD",
+        "channel_id": CHANNEL, "channel_name": "load", "user_id": user, "user_name": user,
+        "command": command, "text": text, "trigger_id": f"{next(TRIGGERS)}.{user}",
+        "response_url": "https://hooks.slack.com/commands/load",
+    })
+
+
+def interaction(payload, user):
+    payload = {"token": "load", "team": {"id": "T0LOAD"}, "api_app_id": "A0LOAD",
+               "user": {"id": user, "team_id": "T0LOAD"}, "trigger_id": f"{next(TRIGGERS)}.{user}", **payload}
+    return urlencode({"payload": json.dumps(payload)})
+
+
+def vote_click(poll_id, option, user):
+    return interaction({
+        "type": "block_actions",
+        "channel": {"id": CHANNEL},
+        "container": {"type": "message", "channel_id": CHANNEL, "message_ts": "1.000"},
+        "actions": [{"type": "button", "action_id": f"vote_{option}", "block_id": "vote",
+                     "value": poll_id, "action_ts": f"{time.time():.6f}"}],
+    }, user)
+
+
+def vote_poll_submission(options, anonymous=True, multi=False):
+    """A submit_poll view_submission that creates a vote poll in CHANNEL."""
+    meta = {"channel": CHANNEL, "user": CREATOR, "type": "vote", "title": "Load test",
+            "visibility": "anonymous" if anonymous else "named"}
+    values = {f"option_block_{i}": {f"option_input_{i}": {"type": "plain_text_input", "value": f"Option {i}"}}
+              for i in range(options)}
+    if multi:
+        values["multi_block"] = {"multi_select": {"type": "checkboxes",
+                                                  "selected_options": [{"value": "multi"}]}}
+    return interaction({
+        "type": "view_submission",
+        "view": {"id": "V0LOAD", "type": "modal", "callback_id": "submit_poll", "hash": "load",
+                 "private_metadata": json.dumps(meta), "state": {"values": values}},
+    }, CREATOR)
+
+
+class InProcessTarget:
+    """Import `main` with the stand-in configured and use Flask's test client."""
+
+    def __init__(self, api):
+        os.environ["SLACK_API_URL"] = api.url
+        os.environ.setdefault("SLACK_BOT_TOKEN", "xoxb-load")
+        os.environ.setdefault("SLACK_SIGNING_SECRET", "load-secret")
+        # listeners never wait on the dispatcher, but draining its queue at
+        # Slack's real limits would make this a test of the pacer; send calls
+        # inline unless told otherwise
+        os.environ.setdefault("SLACK_API_WORKERS", "0")
+        sys.path.insert(0, ROOT)
+        import main
+        self.main = main
+        self.secret = os.environ["SLACK_SIGNING_SECRET"]
+        self.local = threading.local()
+
+    def request(self, method, path, body="", headers=None):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.main.flask_app.test_client()
+        return client.open(path, method=method, data=body, headers=headers or {}).status_code
+
+    def drain(self):
+        self.main.dispatcher.join()
+
+
+class HTTPTarget:
+    """Send requests to a running server, one keep-alive connection per thread."""
+
+    def __init__(self, url, secret):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.secret = secret
+        self.local = threading.local()
+
+    def request(self, method, path, body="", headers=None):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            conn.request(method, path, body=body.encode(), headers=headers or {})
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self.local.conn = None
+            raise
+
+    def wait_ready(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if self.request("GET", "/") == 200:
+                    return
+            except (OSError, http.client.HTTPException):
+                pass
+            if time.monotonic() > deadline:
+                raise SystemExit(f"no answer from {self.host}:{self.port}")
+            time.sleep(0.2)
+
+    def drain(self):
+        pass
+
+
+def create_poll(target, api, args):
+    body = vote_poll_submission(args.options, anonymous=not args.named, multi=args.multi)
+    known = set(api.poll_ids())
+    status = target.request("POST", "/slack/events", body, sign(target.secret, body))
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        new = [poll_id for poll_id in api.poll_ids() if poll_id not in known]
+        if new:
+            return new[0]
+        time.sleep(0.01)
+    raise SystemExit(f"poll was not posted (submit_poll answered HTTP {status})")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in ("vote", "results", "poll", "index"):
+            raise argparse.ArgumentTypeError(f"unknown request kind {kind!r}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def build_requests(args, poll_id):
+    """Return (kind, method, path, body) tuples; bodies are signed when sent."""
+    rng = random.Random(args.seed)
+    kinds, weights = zip(*args.mix.items())
+    requests = []
+    for n in range(args.requests):
+        kind = rng.choices(kinds, weights)[0]
+        user = f"U{n % args.users:07d}"
+        if kind == "vote":
+            body = vote_click(poll_id, rng.randrange(args.options), user)
+        elif kind == "results":
+            body = slash_command("/pollresults", user)
+        elif kind == "poll":
+            body = slash_command("/poll", user)
+        else:
+            requests.append((kind, "GET", "/", ""))
+            continue
+        requests.append((kind, "POST", "/slack/events", body))
+    return requests
+
+
+def run(target, requests, concurrency):
+    samples = {kind: [] for kind, *_ in requests}
+    errors = {kind: 0 for kind in samples}
+    lock = threading.Lock()
+
+    def send(item):
+        kind, method, path, body = item
+        # signing is Slack's cost, not the server's, so it is left out
+        headers = sign(target.secret, body) if method == "POST" else {}
+        start = time.perf_counter()
+        try:
+            ok = target.request(method, path, body, headers) == 200
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            samples[kind].append(elapsed)
+            if not ok:
+                errors[kind] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, requests))
+    return samples, errors, time.perf_counter() - started
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def report(samples, errors, wall):
+    total = sum(len(s) for s in samples.values())
+    print(f"{total} requests in {wall:.2f}s: {total / wall:.1f} req/s")
+    print(f"{'kind':<10}{'count':>8}{'errors':>8}{'mean_ms':>10}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}")
+    for kind, values in samples.items():
+        print(f"{kind:<10}{len(values):>8}{errors[kind]:>8}"
+              f"{statistics.fmean(values) * 1e3:>10.3f}"
+              + "".join(f"{percentile(values, p) * 1e3:>10.3f}" for p in (50, 95, 99)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Signed end-to-end load against /slack/events.")
+    parser.add_argument("--url", help="base URL of a running server; default drives main in-process")
+    parser.add_argument("--api-port", type=int, default=0, help="port for the Web API stand-in")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--options", type=int, default=5)
+    parser.add_argument("--multi", action="store_true")
+    parser.add_argument("--named", action="store_true")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("vote=8,results=1,poll=1"))
+    parser.add_argument("--seed", type=int, default=0)
+    slack_api.add_arguments(parser, prefix="api-")
+    args = parser.parse_args()
+
+    api = slack_api.from_arguments(args, port=args.api_port, prefix="api-").start()
+    if args.url:
+        target = HTTPTarget(args.url, os.getenv("SLACK_SIGNING_SECRET", "load-secret"))
+        print(f"Web API stand-in listening on {api.url}")
+        target.wait_ready()
+    else:
+        target = InProcessTarget(api)
+
+    poll_id = create_poll(target, api, args)
+    samples, errors, wall = run(target, build_requests(args, poll_id), args.concurrency)
+    target.drain()
+    report(samples, errors, wall)
+    print("Web API calls:")
+    for method, counts in api.stats().items():
+        print(f"  {method:<32}" + "  ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Local stand-in for the Slack Web API.
+
+Implements the methods the bot calls (chat.postMessage, chat.postEphemeral,
+chat.update, views.open/update/push, conversations.open,
+canvases.create, files.getUploadURLExternal,
+files.completeUploadExternal and auth.test) with the fields the bot reads
+back. It keeps the posted messages so a load generator can pick poll ids out
+of the buttons, and the files uploaded to /upload/<file_id>. Slack-side trouble can be injected:
+
+    latency, jitter   every response is delayed by latency ± jitter seconds
+    rate_limit_rate   share of calls answered with HTTP 429 and Retry-After
+    tiers             enforce Slack's per-method rate limit tiers, scaled by
+                      `tier_scale`, answering 429 once a method's minute is used up
+
+Point the bot at it with SLACK_API_URL:
+
+    python benchmarks/slack_api.py --port 3001 --latency 0.2 --jitter 0.1 --tiers
+    SLACK_API_URL=http://127.0.0.1:3001/api/ gunicorn main:flask_app
+
+GET /stats on the stand-in returns call, 429 and latency counts per method.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+# Requests per minute for each method, following Slack's rate limit tiers.
+# chat.postMessage is limited per channel instead (about one a second).
+TIER_LIMITS = {
+    "chat.postEphemeral": 100,              # tier 4
+    "chat.update": 50,                      # tier 3
+    "views.open": 100,                      # tier 4
+    "views.update": 100,                    # tier 4
+    "views.push": 100,                      # tier 4
+    "conversations.open": 50,               # tier 3
+    "canvases.create": 20,                  # tier 2
+    "files.getUploadURLExternal": 100,      # tier 4
+    "files.completeUploadExternal": 100,    # tier 4
+    "auth.test": 100,                       # tier 4
+}
+POST_MESSAGE_PER_SECOND = 1
+
+
+def parse_body(headers, raw):
+    if headers.get("Content-Type", "").startswith("application/json"):
+        return json.loads(raw or b"{}")
+    fields = dict(parse_qsl(raw.decode()))
+    for key in ("blocks", "attachments", "files"):
+        if key in fields:
+            fields[key] = json.loads(fields[key])
+    return fields
+
+
+def respond(method, args):
+    """Return the response body for a Web API `method` called with `args`."""
+    ts = f"{time.time():.6f}"
+    if method == "auth.test":
+        return {"ok": True, "url": "https://example.slack.com/", "team": "Load",
+                "user": "bot", "team_id": "T0LOAD", "user_id": "U0BOT", "bot_id": "B0BOT"}
+    if method == "conversations.open":
+        return {"ok": True, "channel": {"id": "D" + args.get("users", "U0").lstrip("U")}}
+    if method in ("chat.postMessage", "chat.update"):
+        return {"ok": True, "channel": args.get("channel"), "ts": args.get("ts", ts)}
+    if method == "chat.postEphemeral":
+        return {"ok": True, "message_ts": ts}
+    if method.startswith("views."):
+        return {"ok": True, "view": {"id": "V0LOAD", "hash": ts}}
+    if method == "canvases.create":
+        return {"ok": True, "canvas_id": "F0LOAD"}
+    if method == "files.completeUploadExternal":
+        return {"ok": True, "files": [{"id": f["id"], "title": f.get("title")}
+                                      for f in args.get("files", [])]}
+    return {"ok": False, "error": "unknown_method"}
+
+
+class WindowLimiter:
+    """Allow `limit` calls per `window` seconds for each key."""
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.windows = {}
+
+    def check(self, key, now):
+        """Count a call and return 0, or the seconds until `key` may call again."""
+        start, count = self.windows.get(key, (now, 0))
+        if now - start >= self.window:
+            start, count = now, 0
+        if count >= self.limit:
+            return start + self.window - now
+        self.windows[key] = (start, count + 1)
+        return 0
+
+
+class SlackAPI(ThreadingHTTPServer):
+    """Serve the stand-in on `port` (0 picks a free one) from a daemon thread."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, host="127.0.0.1", latency=0.0, jitter=0.0,
+                 rate_limit_rate=0.0, retry_after=1, tiers=False, tier_scale=1.0, seed=None):
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.limiters = {}
+        if tiers:
+            self.limiters = {method: WindowLimiter(max(1, int(limit * tier_scale)), 60)
+                             for method, limit in TIER_LIMITS.items()}
+            self.limiters["chat.postMessage"] = WindowLimiter(
+                max(1, int(POST_MESSAGE_PER_SECOND * tier_scale)), 1)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.limited = {}
+        self.delay = {}
+        self.messages = []
+        self.uploads = {}
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/api/"
+
+    def upload_url(self, file_id):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/upload/{file_id}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="slack-api", daemon=True).start()
+        return self
+
+    def handle_call(self, method, args):
+        """Return (status, body, headers) for one call, after the injected delay."""
+        with self.lock:
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            self.calls[method] = self.calls.get(method, 0) + 1
+            self.delay[method] = self.delay.get(method, 0.0) + delay
+            wait = 0
+            limiter = self.limiters.get(method)
+            if limiter is not None:
+                key = args.get("channel") if method == "chat.postMessage" else None
+                wait = limiter.check(key, time.monotonic())
+            if not wait and self.random.random() < self.rate_limit_rate:
+                wait = self.retry_after
+            if wait:
+                self.limited[method] = self.limited.get(method, 0) + 1
+            elif method == "chat.postMessage":
+                self.messages.append(args)
+        time.sleep(delay)
+        if wait:
+            return 429, {"ok": False, "error": "ratelimited"}, [("Retry-After", str(math.ceil(wait)))]
+        if method == "files.getUploadURLExternal":
+            with self.lock:
+                file_id = f"F{len(self.uploads):07d}"
+                self.uploads[file_id] = None
+            return 200, {"ok": True, "upload_url": self.upload_url(file_id), "file_id": file_id}, []
+        return 200, respond(method, args), []
+
+    def stats(self):
+        with self.lock:
+            return {method: {"calls": count, "rate_limited": self.limited.get(method, 0),
+                             "mean_delay_ms": round(self.delay[method] / count * 1e3, 2)}
+                    for method, count in sorted(self.calls.items())}
+
+    def poll_ids(self):
+        """Return the poll ids found in the buttons of every posted message."""
+        with self.lock:
+            messages = list(self.messages)
+        ids = []
+        for message in messages:
+            for block in message.get("blocks") or []:
+                for element in block.get("elements", []):
+                    value = element.get("value")
+                    if element.get("action_id", "").startswith(("vote_", "open_feedback")) and value not in ids:
+                        ids.append(value)
+        return ids
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        method = self.path.split("?", 1)[0].rsplit("/", 1)[-1]
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.startswith("/upload/"):
+            with self.server.lock:
+                known = method in self.server.uploads
+                if known:
+                    self.server.uploads[method] = raw
+            self.send_json(200 if known else 404, {"ok": known})
+            return
+        status, payload, headers = self.server.handle_call(method, parse_body(self.headers, raw))
+        self.send_json(status, payload, headers)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self.send_json(200, self.server.stats())
+        else:
+            self.send_json(404, {"ok": False, "error": "not_found"})
+
+    def send_json(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def add_arguments(parser, prefix=""):
+    """Add the stand-in's fault injection options to `parser`."""
+    parser.add_argument(f"--{prefix}latency", type=float, default=0.0,
+                        help="seconds added to every response")
+    parser.add_argument(f"--{prefix}jitter", type=float, default=0.0,
+                        help="latency varies uniformly by up to this many seconds")
+    parser.add_argument(f"--{prefix}rate-limit-rate", type=float, default=0.0,
+                        help="share of calls answered with HTTP 429")
+    parser.add_argument(f"--{prefix}retry-after", type=int, default=1,
+                        help="Retry-After seconds sent with injected 429s")
+    parser.add_argument(f"--{prefix}tiers", action="store_true",
+                        help="enforce Slack's per-method rate limit tiers")
+    parser.add_argument(f"--{prefix}tier-scale", type=float, default=1.0,
+                        help="multiply every tier limit, e.g. 10 for a quicker test")
+
+
+def from_arguments(args, port=0, prefix=""):
+    """Build a SlackAPI from options added by `add_arguments`."""
+    option = lambda name: getattr(args, prefix.replace("-", "_") + name)
+    return SlackAPI(port=port, latency=option("latency"), jitter=option("jitter"),
+                    rate_limit_rate=option("rate_limit_rate"), retry_after=option("retry_after"),
+                    tiers=option("tiers"), tier_scale=option("tier_scale"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Slack Web API.")
+    parser.add_argument("--port", type=int, default=3001)
+    add_arguments(parser)
+    args = parser.parse_args()
+    api = from_arguments(args, port=args.port)
+    print(f"Slack Web API stand-in on {api.url} (stats at /stats)")
+    try:
+        api.serve_forever()
+    except KeyboardInterrupt:
+        print(json.dumps(api.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class VersionedCache:
+    """Remember one rendered value per key, valid for a single version.
+
+    A lookup only hits when the caller's version matches the version the
+    value was stored with, so bumping a poll's version on every mutation is
+    all it takes to invalidate its entry. The least recently used entries are
+    dropped beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        """Return the value stored for `key` at `version`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class RecentKeys:
+    """Remember keys for `ttl` seconds, keeping at most `max_entries`.
+
+    Keys are kept in the order they were first seen, so expired ones are
+    always at the front and the oldest are dropped first once full.
+    """
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.repeats = 0
+
+    def seen(self, key):
+        """Record `key` and return True if it was already recorded."""
+        now = time.monotonic()
+        with self._lock:
+            while self._entries and next(iter(self._entries.values())) <= now - self.ttl:
+                self._entries.popitem(last=False)
+            if key in self._entries:
+                self.repeats += 1
+                return True
+            self._entries[key] = now
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return False
+
+    def forget(self, key):
+        """Drop `key`, so it counts as new the next time it is seen."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "repeats": self.repeats}
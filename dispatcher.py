@@ -0,0 +1,215 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from slack_sdk.errors import SlackApiError
+
+# Sustained requests per minute and burst size for each Web API method,
+# following Slack's published rate limit tiers. Methods not listed here fall
+# back to DEFAULT_RATE.
+METHOD_RATES = {
+    "chat_postMessage": (60, 10),               # special tier, ~1/sec
+    "chat_postEphemeral": (100, 20),            # tier 4
+    "chat_update": (50, 10),                    # tier 3
+    "views_open": (100, 20),                    # tier 4
+    "views_update": (100, 20),                  # tier 4
+    "views_push": (100, 20),                    # tier 4
+    "conversations_open": (50, 10),             # tier 3
+    "canvases_create": (20, 5),                 # tier 2
+    "files_getUploadURLExternal": (100, 20),    # tier 4
+    "files_completeUploadExternal": (100, 20),  # tier 4
+}
+DEFAULT_RATE = (20, 5)
+
+
+class TokenBucket:
+    """Pace calls to `per_minute` with bursts of up to `burst` calls."""
+
+    def __init__(self, per_minute, burst):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def block(self, seconds):
+        """Hold every caller back for `seconds`, e.g. after an HTTP 429."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+def retry_after(error):
+    """Return the Retry-After delay of a rate-limited Slack API error, or None."""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) != 429:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", headers.get("retry-after", 1)))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def retryable(error):
+    """Return True for rate limits, server errors and network failures.
+
+    Slack answers invalid requests with HTTP 200 and `ok: false`; repeating
+    those would fail the same way, so they are not retried. Nor is any other
+    exception, which is a bug in the caller rather than a failure to reach
+    Slack.
+    """
+    if isinstance(error, SlackApiError):
+        status = getattr(error.response, "status_code", None) or 0
+        return status == 429 or status >= 500
+    # URLError and socket timeouts are OSErrors
+    return isinstance(error, OSError)
+
+
+class SlackDispatcher:
+    """Send Slack Web API calls from a bounded pool of worker threads.
+
+    `submit` queues a call and returns a Future, so listeners can `ack()` and
+    return without waiting on Slack. Workers pace each method with a token
+    bucket, honour `Retry-After` on HTTP 429 and retry other failures with
+    exponential backoff. With `workers=0` calls run inline in the caller,
+    without pacing, which keeps tests and local debugging synchronous.
+    """
+
+    def __init__(self, workers=8, rates=None, max_retries=3, backoff=0.5, metrics=None):
+        self.workers = workers
+        self.rates = METHOD_RATES if rates is None else rates
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._queue = queue.Queue()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._in_flight = 0
+        self._counts = {"sent": 0, "failed": 0, "retried": 0, "rate_limited": 0}
+        self._latency = self._errors = None
+        if metrics is not None:
+            self._latency = metrics.histogram(
+                "slack_api_call_seconds", "Duration of each Slack Web API call attempt.", ("method",))
+            self._errors = metrics.counter(
+                "slack_api_errors_total", "Slack Web API call attempts that raised.", ("method",))
+            metrics.gauge("slack_api_queue_depth", "Web API calls waiting for a worker.",
+                          lambda: self._queue.qsize())
+            metrics.gauge("slack_api_in_flight", "Web API calls being sent.", lambda: self._in_flight)
+
+    def _bucket(self, method):
+        bucket = self._buckets.get(method)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(method)
+                if bucket is None:
+                    bucket = TokenBucket(*self.rates.get(method, DEFAULT_RATE))
+                    self._buckets[method] = bucket
+        return bucket
+
+    def _count(self, key):
+        with self._lock:
+            self._counts[key] += 1
+
+    def _start(self):
+        """Start the worker threads once per process (again after a fork)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            for n in range(self.workers):
+                threading.Thread(target=self._work, name=f"slack-api-{n}", daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, client, method, **kwargs):
+        """Queue `client.<method>(**kwargs)` and return a Future for its response."""
+        future = Future()
+        if self.workers == 0:
+            self._run(client, method, kwargs, future, paced=False)
+            return future
+        self._start()
+        self._queue.put((client, method, kwargs, future))
+        return future
+
+    def call(self, client, method, **kwargs):
+        """Queue `client.<method>(**kwargs)` and wait for its response."""
+        return self.submit(client, method, **kwargs).result()
+
+    def _work(self):
+        while True:
+            client, method, kwargs, future = self._queue.get()
+            with self._lock:
+                self._in_flight += 1
+            try:
+                self._run(client, method, kwargs, future, paced=True)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                self._queue.task_done()
+
+    def _run(self, client, method, kwargs, future, paced):
+        bucket = self._bucket(method)
+        for attempt in range(self.max_retries + 1):
+            if paced:
+                wait = bucket.reserve()
+                if wait > 0:
+                    time.sleep(wait)
+            start = time.perf_counter()
+            try:
+                result = getattr(client, method)(**kwargs)
+            except Exception as e:
+                self._observe(method, start, failed=True)
+                delay = retry_after(e)
+                if delay is not None:
+                    self._count("rate_limited")
+                    bucket.block(delay)
+                if attempt == self.max_retries or not retryable(e):
+                    self._count("failed")
+                    print(f"Error calling {method}: {e}")
+                    future.set_exception(e)
+                    return
+                self._count("retried")
+                if delay is None:
+                    time.sleep(self.backoff * (2 ** attempt))
+                elif not paced:
+                    time.sleep(delay)
+                continue
+            self._observe(method, start)
+            self._count("sent")
+            future.set_result(result)
+            return
+
+    def _observe(self, method, start, failed=False):
+        if self._latency is not None:
+            self._latency.observe(time.perf_counter() - start, method=method)
+            if failed:
+                self._errors.inc(method=method)
+
+    def join(self):
+        """Block until every queued call has finished."""
+        if self.workers:
+            self._queue.join()
+
+    def stats(self):
+        """Return queue depth, in-flight calls and lifetime counters."""
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "in_flight": self._in_flight,
+                "workers": self.workers,
+                **self._counts,
+            }
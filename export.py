@@ -0,0 +1,151 @@
+"""Export a poll's raw ballots and responses as CSV or JSON Lines.
+
+Rows are generated one at a time from the poll, so the exported document is
+never held in memory: the HTTP route streams it and `upload_file` spools it
+to a temporary file before sending it to Slack.
+"""
+import csv
+import hmac
+import io
+import itertools
+import json
+import tempfile
+import urllib.request
+
+from tallies import Ballots, choices
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+
+# Spreadsheet apps run cells starting with these as formulas.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def export_filename(poll, fmt):
+    return f"poll-{poll['poll_id']}.{fmt}"
+
+
+def columns(poll):
+    """Return the column names: the voter (unless anonymous), then the choice
+    or one column per question."""
+    names = [] if poll.get("anonymous") else ["user"]
+    if poll["type"] == "vote":
+        return names + ["choice"]
+    seen = set(names)
+    for question in poll["feedback_questions"]:
+        name, n = question, 1
+        while name in seen:  # JSON Lines keys must be unique
+            n += 1
+            name = f"{question} ({n})"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def decode_answer(poll, idx, answer):
+    """Return answer `idx` of a response with option indices replaced by
+    their labels and star ratings as ints."""
+    kinds = poll.get("feedback_kinds") or []
+    formats = poll.get("feedback_formats") or []
+    all_options = poll.get("question_options") or []
+    kind = kinds[idx] if idx < len(kinds) else "feedback"
+    if kind == "vote":
+        options = all_options[idx] if idx < len(all_options) else None
+        if not options:
+            return answer
+        if isinstance(answer, list):
+            return [options[int(i)] for i in answer]
+        return options[int(answer)]
+    if idx < len(formats) and formats[idx] == "stars":
+        try:
+            return int(answer)
+        except (TypeError, ValueError):
+            return answer
+    return answer
+
+
+def iter_rows(poll):
+    """Yield one list of values per ballot or feedback response, in the order
+    of `columns(poll)`. Multi-select choices are lists of labels."""
+    named = not poll.get("anonymous")
+    if poll["type"] == "vote":
+        options, multi = poll["options"], poll.get("multi")
+        for user, mask in Ballots.of(poll["votes"], multi).voters():
+            picked = [options[i] for i in choices(mask)]
+            value = picked if multi else picked[0]
+            yield [user, value] if named else [value]
+        return
+    responses = poll["feedback_responses"]
+    # responses recorded while the export runs are left for the next one
+    for resp in itertools.islice(responses, len(responses)):
+        answers = [decode_answer(poll, i, a) for i, a in enumerate(resp["answers"])]
+        yield [resp["user"], *answers] if named else answers
+
+
+def _cell(value):
+    if isinstance(value, list):
+        value = "; ".join(str(v) for v in value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(poll):
+    """Yield the export as CSV, one line at a time, header first."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def line(values):
+        writer.writerow(values)
+        text = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return text
+
+    yield line(columns(poll))
+    for row in iter_rows(poll):
+        yield line([_cell(value) for value in row])
+
+
+def iter_jsonl(poll):
+    """Yield the export as JSON Lines: one object per row, keyed by column."""
+    names = columns(poll)
+    for row in iter_rows(poll):
+        yield json.dumps(dict(zip(names, row)), ensure_ascii=False) + "\n"
+
+
+def iter_export(poll, fmt):
+    """Yield the export of `poll` in `fmt` ("csv" or "jsonl") as text chunks."""
+    return iter_csv(poll) if fmt == "csv" else iter_jsonl(poll)
+
+
+def authorized(token, header):
+    """Return True if `header` is `Bearer <token>` and a token is configured."""
+    if not token or not header:
+        return False
+    return hmac.compare_digest(header, f"Bearer {token}")
+
+
+def upload_file(call, client, chunks, filename, channel_id, comment=None):
+    """Upload the text `chunks` to Slack as a file shared in `channel_id`.
+
+    Slack's external upload needs the length up front, so the chunks are
+    written to a temporary file first and then sent from disk. `call` makes
+    the Web API calls, e.g. `dispatcher.call`.
+    """
+    with tempfile.TemporaryFile() as f:
+        for chunk in chunks:
+            f.write(chunk.encode())
+        length = f.tell()
+        f.seek(0)
+        target = call(client, "files_getUploadURLExternal", filename=filename, length=length)
+        request = urllib.request.Request(
+            target["upload_url"], data=f, method="POST",
+            headers={"Content-Type": "application/octet-stream", "Content-Length": str(length)})
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+    return call(client, "files_completeUploadExternal",
+                files=[{"id": target["file_id"], "title": filename}],
+                channel_id=channel_id, initial_comment=comment)
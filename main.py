@@ -1,9 +1,34 @@
 import os
 import re
 import json
+import atexit
+import logging
+import functools
+import inspect
+import itertools
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, request
 from slack_bolt import App
 from slack_bolt.adapter.flask import SlackRequestHandler
+from slack_sdk import WebClient
+from cache import RecentKeys, VersionedCache
+from dispatcher import SlackDispatcher
+from export import (EXPORT_FORMATS, authorized, decode_answer, export_filename, iter_export,
+                    upload_file)
+from metrics import Registry, resident_memory_bytes
+from scheduler import Scheduler
+from startup import StartupTimer
+from storage import new_poll_data, store_from_env
+from tallies import Ballots, Tally, choices
+from views import ViewUpdater, focus_page, summary_block
+
+# How long each phase of loading this module took, logged once it is ready
+# and served on /stats. The first phase starts when the process did.
+startup = StartupTimer()
+startup.mark("imports")
 
 # ─── App setup ────────────────────────────────────────────────────────────────
 token = os.getenv("SLACK_BOT_TOKEN")
@@ -18,33 +43,216 @@ if token is None or secret is None:
     print(f"Error: Missing required environment variables: {', '.join(missing)}")
     raise SystemExit(1)
 
+# SLACK_API_URL sends Web API calls somewhere other than slack.com, such as
+# the local stand-in the load generators in benchmarks/ run.
+api_url = os.getenv("SLACK_API_URL")
+
+# Bolt checks the token with a blocking auth.test call while the app loads
+# or, if told not to, on the first request. FAST_START=1 authorizes requests
+# with SLACK_BOT_TOKEN directly, so neither waits on Slack; verify_token makes
+# the call in the background and fills in the bot's identity.
+fast_start = os.getenv("FAST_START") == "1"
+bot_identity = {}
+
+def authorize(enterprise_id, team_id, user_id):
+    from slack_bolt.authorization import AuthorizeResult
+    return AuthorizeResult(enterprise_id=enterprise_id, team_id=team_id, user_id=user_id,
+                           bot_token=token, **bot_identity)
+
+# Bolt reads SLACK_BOT_TOKEN from the environment whenever `token` is None,
+# so it warns that the token is unused even when only `client` or `authorize`
+# is given it. Those warnings are dropped while the app is built.
+class _UnusedTokenWarning(logging.Filter):
+    def filter(self, record):
+        return "`token`" not in record.getMessage()
+
 flask_app = Flask(__name__)
-app = App(
-    token=token,
-    signing_secret=secret,
-)
+api_client = WebClient(token=token, base_url=api_url.rstrip("/") + "/") if api_url else None
+bolt_logger = logging.getLogger("slack_bolt.App")
+unused_token_warning = _UnusedTokenWarning()
+bolt_logger.addFilter(unused_token_warning)
+try:
+    app = App(
+        token=None if fast_start or api_client is not None else token,
+        authorize=authorize if fast_start else None,
+        signing_secret=secret,
+        client=api_client,
+    )
+finally:
+    bolt_logger.removeFilter(unused_token_warning)
 handler = SlackRequestHandler(app)
+startup.mark("slack app")
+
+# Exported in the Prometheus text format on GET /metrics.
+metrics = Registry()
+
+# Outbound Web API calls are queued on `dispatcher` after ack(), paced per
+# method and retried on rate limits. SLACK_API_WORKERS=0 sends them inline.
+dispatcher = SlackDispatcher(workers=int(os.getenv("SLACK_API_WORKERS", "8")), metrics=metrics)
+
+# Slow follow-up work, such as publishing a results canvas, runs on these
+# threads once the listener has acked, so it holds up neither the ack nor
+# Bolt's listener threads. Like the dispatcher, SLACK_API_WORKERS=0 runs it inline.
+background_jobs = ThreadPoolExecutor(max_workers=2, thread_name_prefix="background")
+
+def run_in_background(func, *args):
+    def job():
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"Error in background {func.__name__}: {e}")
+    if dispatcher.workers == 0:
+        job()
+    else:
+        background_jobs.submit(job)
+
+listener_seconds = metrics.histogram(
+    "slack_listener_seconds", "Time spent running each Bolt listener.", ("listener",))
+ack_seconds = metrics.histogram(
+    "slack_listener_ack_seconds", "Time from a listener starting to its ack().", ("listener",))
+listener_errors = metrics.counter(
+    "slack_listener_errors_total", "Bolt listeners that raised.", ("listener",))
+
+# Every Bolt listener is registered through `listener`, which also records it
+# in LISTENERS so the async entry point can register the same functions.
+LISTENERS = []
+
+# Set PROFILE_LISTENERS to profile listener calls; see profiling.py. The
+# profilers are only imported when asked for.
+profiler = None
+if os.getenv("PROFILE_LISTENERS"):
+    from profiling import profiler_from_env
+    profiler = profiler_from_env()
+
+# Slack re-sends a request it has not seen acknowledged in time. Requests
+# already handled by this process are acked again and otherwise dropped.
+handled_requests = RecentKeys()
+dropped_retries = metrics.counter(
+    "slack_dropped_retries_total", "Repeated requests acked without running the listener.",
+    ("listener",))
+
+
+def request_fingerprint(body):
+    """Identify one user interaction across Slack's retries of it, or None.
+
+    Every slash command, button click and modal submission carries its own
+    trigger_id; clicks also have an action_ts and submissions a view id and
+    hash.
+    """
+    trigger_id = body.get("trigger_id")
+    if not trigger_id:
+        return None
+    actions = body.get("actions") or [{}]
+    view = body.get("view") or {}
+    return (trigger_id, actions[0].get("action_ts"), view.get("id"), view.get("hash"))
 
-# ─── In‐memory store ────────────────────────────────────────────────────────────
-poll_data = {
-    "type": None,
-    "question": None,
-    "options": [],
-    "feedback_questions": [],
-    "feedback_formats": [],
-    "feedback_kinds": [],
-    "question_options": [],
-    "vote_tallies": [],
-    "votes": {},
-    "tallies": {},
-    "feedback_responses": [],
-    "creator_id": None,
-    "channel_id": None,
-    "anonymous": True,
-    "multi": False,
-    "multi_questions": [],
-    "active": False,
-}
+
+def deduplicated(func):
+    """Wrap listener `func` so a repeated request is acked but not handled.
+
+    A request that `func` never acked, because it raised first, is forgotten
+    again: Slack's retry of it is then handled rather than dropped.
+    """
+    name = func.__name__
+    arg_names = inspect.getfullargspec(inspect.unwrap(func)).args
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        kwargs.update(zip(arg_names, args))
+        fingerprint = request_fingerprint(kwargs["body"])
+        if fingerprint is None:
+            return func(**kwargs)
+        if handled_requests.seen(fingerprint):
+            dropped_retries.inc(listener=name)
+            kwargs["ack"]()
+            return None
+        ack, acked = kwargs["ack"], []
+
+        def tracked_ack(*ack_args, **ack_kwargs):
+            acked.append(True)
+            return ack(*ack_args, **ack_kwargs)
+        kwargs["ack"] = tracked_ack
+        try:
+            return func(**kwargs)
+        finally:
+            if not acked:
+                handled_requests.forget(fingerprint)
+    return wrapper
+
+
+def instrumented(func):
+    """Wrap listener `func` to record its run time and ack() latency."""
+    name = func.__name__
+    arg_names = inspect.getfullargspec(inspect.unwrap(func)).args
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        kwargs.update(zip(arg_names, args))
+        start = time.perf_counter()
+        ack = kwargs.get("ack")
+        if ack is not None:
+            def timed_ack(*ack_args, **ack_kwargs):
+                try:
+                    return ack(*ack_args, **ack_kwargs)
+                finally:
+                    ack_seconds.observe(time.perf_counter() - start, listener=name)
+            kwargs["ack"] = timed_ack
+        try:
+            return func(**kwargs)
+        except Exception:
+            listener_errors.inc(listener=name)
+            raise
+        finally:
+            listener_seconds.observe(time.perf_counter() - start, listener=name)
+    return wrapper
+
+
+def listener(kind, matcher):
+    """Register the decorated function as an `app.<kind>(matcher)` listener."""
+    def decorator(func):
+        if profiler is not None:
+            func = profiler.wrap(func)
+        func = deduplicated(instrumented(func))
+        LISTENERS.append((kind, matcher, func))
+        getattr(app, kind)(matcher)(func)
+        return func
+    return decorator
+
+# ─── Poll store ───────────────────────────────────────────────────────────────
+# Polls live in `store`, keyed by poll id. The id travels in the poll's button
+# values and in the feedback modal's private_metadata. Set POLL_DB_PATH to
+# share state between gunicorn workers through SQLite; otherwise polls are
+# kept in this process's memory.
+store = store_from_env()
+startup.mark("store")
+
+# A journaled store fsyncs in batches, so write out the last batch when the
+# process exits. gunicorn stops workers with SIGTERM; flush first, then hand
+# over to its own handler for the graceful shutdown.
+if hasattr(store, "flush"):
+    atexit.register(store.flush)
+    if threading.current_thread() is threading.main_thread():
+        previous_sigterm = signal.getsignal(signal.SIGTERM)
+
+        def flush_on_sigterm(signum, frame):
+            # flush from another thread: this one may have been interrupted
+            # while holding the store's locks
+            flusher = threading.Thread(target=store.flush, daemon=True)
+            flusher.start()
+            flusher.join(2)
+            if callable(previous_sigterm):
+                previous_sigterm(signum, frame)
+            elif previous_sigterm == signal.SIG_DFL:
+                raise SystemExit(128 + signum)
+
+        signal.signal(signal.SIGTERM, flush_on_sigterm)
+
+votes_total = metrics.counter("poll_votes_total", "Votes recorded.")
+responses_total = metrics.counter("poll_feedback_responses_total", "Feedback responses recorded.")
+metrics.gauge("poll_store_entries", "Polls, votes and feedback responses held by the store.",
+              lambda: {(entry,): n for entry, n in store.stats().items()}, labels=("entry",))
+metrics.gauge("process_resident_memory_bytes", "Resident memory size in bytes.",
+              resident_memory_bytes)
 
 # Helper to format vote results for Canvas
 def format_poll_results_for_canvas(tallies, options):
@@ -59,12 +267,16 @@ def format_poll_results_for_canvas(tallies, options):
 
 
 # Helper to upload poll results to a Slack canvas using the new API
-def upload_results_canvas(client, channel_id, markdown, team_id=None, title=None):
-    """Create a Canvas in `channel_id` where `document_content` is Markdown.
-    Returns a permalink to the new Canvas, or None on failure.
+def upload_results_canvas(client, channel_id, markdown, title=None):
+    """Create a canvas tabbed in `channel_id` whose content is `markdown`.
+    Returns the new canvas's id, or None on failure.
+
+    A channel can hold only one channel canvas, so each poll gets a
+    standalone canvas (canvases.create) rather than conversations.canvases.create.
     """
     try:
-        response = client.conversations_canvases_create(
+        response = dispatcher.call(
+            client, "canvases_create",
             channel_id=channel_id,
             title=title or "Poll Results",
             document_content={
@@ -72,17 +284,317 @@ def upload_results_canvas(client, channel_id, markdown, team_id=None, title=None
                 "markdown": markdown
             }
         )
-        canvas_id = response.get("canvas", {}).get("id")
-        if canvas_id and team_id:
-            return f"https://{team_id}.slack.com/canvas/{canvas_id}"
-        return None
+        return response.get("canvas_id") or response.get("canvas", {}).get("id")
 
     except Exception as e:
         print(f"Error creating canvas: {e}")
         return None
 
+
+def canvas_permalink(canvas_id, team_id=None, team_domain=None):
+    """Return the web link to a canvas, or None without the workspace's id and domain."""
+    if team_id and team_domain:
+        return f"https://{team_domain}.slack.com/docs/{team_id}/{canvas_id}"
+    return None
+
+
+def canvas_mention(user_id):
+    return f"![](@{user_id})"
+
+
+def canvas_text(text):
+    """Return a free-text answer as one Markdown list item's text."""
+    return str(text).strip().replace("\n", "\n  ") or "_(empty)_"
+
+
+def star_histogram(aggregate):
+    """Yield a Markdown table of how often each star rating was given."""
+    most = max(aggregate["stars"]) or 1
+    yield "| Rating | Count | |\n|---|---|---|\n"
+    for stars in range(5, 0, -1):
+        count = aggregate["stars"][stars - 1]
+        yield f"| {'★' * stars}{'☆' * (5 - stars)} | {count} | {'▇' * round(count / most * 20)} |\n"
+
+
+def iter_results_markdown(poll, closed=None):
+    """Yield the complete results of `poll` as Markdown for a canvas.
+
+    Unlike the chat report it lists every answer in full, with a
+    per-person breakdown when the poll is not anonymous.
+    """
+    yield f"# 📊 {poll['question']}\n\n"
+    if closed:
+        yield f"{closed}\n\n"
+    named = not poll.get("anonymous")
+
+    if poll["type"] == "vote":
+        ballots = Ballots.of(poll["votes"], poll.get("multi"))
+        yield f"**{len(ballots)} voters**\n\n## Results\n\n"
+        yield format_poll_results_for_canvas(poll["tallies"], poll["options"]) + "\n"
+        if named:
+            yield "\n## Votes by person\n\n"
+            for user_id, mask in ballots.voters():
+                picked = ", ".join(poll["options"][i] for i in choices(mask))
+                yield f"- {canvas_mention(user_id)}: {picked}\n"
+        return
+
+    responses = poll["feedback_responses"]
+    count = len(responses)
+    kinds = poll.get("feedback_kinds") or []
+    formats = poll.get("feedback_formats") or []
+    all_options = poll.get("question_options") or []
+    tallies = poll.get("vote_tallies") or []
+    aggregates = poll.get("aggregates") or []
+    yield f"**{count} responses**\n"
+    for idx, q in enumerate(poll["feedback_questions"]):
+        yield f"\n## {idx + 1}. {q}\n\n"
+        kind = kinds[idx] if idx < len(kinds) else "feedback"
+        fmt = formats[idx] if idx < len(formats) else None
+        if kind == "vote":
+            options = all_options[idx] if idx < len(all_options) else None
+            tally = tallies[idx] if idx < len(tallies) else {}
+            if options:
+                yield format_poll_results_for_canvas(tally, options) + "\n"
+            else:
+                yield format_poll_results_for_canvas(
+                    {0: tally.get("yes", 0), 1: tally.get("no", 0)}, ["yes", "no"]) + "\n"
+        elif fmt == "stars":
+            if idx < len(aggregates) and aggregates[idx]["count"]:
+                yield f"Average {star_average(poll, idx):.1f}/5 from {aggregates[idx]['count']} ratings\n\n"
+                yield from star_histogram(aggregates[idx])
+            else:
+                yield "_No ratings._\n"
+        else:
+            # every free-text answer, in the order they arrived
+            for resp in itertools.islice(responses, count):
+                if idx < len(resp["answers"]):
+                    who = f"{canvas_mention(resp['user'])}: " if named else ""
+                    yield f"- {who}{canvas_text(resp['answers'][idx])}\n"
+
+    if named:
+        yield "\n## Responses by person\n"
+        for resp in itertools.islice(responses, count):
+            yield f"\n### {canvas_mention(resp['user'])}\n\n"
+            for idx, (q, a) in enumerate(zip(poll["feedback_questions"], resp["answers"])):
+                answer = decode_answer(poll, idx, a)
+                if isinstance(answer, list):
+                    answer = ", ".join(answer)
+                yield f"- **{q}**: {canvas_text(answer)}\n"
+
+
+# ─── Block Kit templates ──────────────────────────────────────────────────────
+# The poll configuration builders below emit the same literal sub-structures
+# (option lists, labels, checkboxes) for every question on every views_update.
+# Those parts are built once here and shared between calls; a builder only
+# copies the block it has to fill in. Builder output must be treated as
+# read-only.
+def _plain(text):
+    return {"type": "plain_text", "text": text}
+
+
+def _input_block(block_id, label, element, dispatch=False):
+    block = {"type": "input", "block_id": block_id, "optional": True}
+    if dispatch:
+        block["dispatch_action"] = True
+    block["label"] = _plain(label)
+    block["element"] = element
+    return block
+
+
+def _with_element(block, **extra):
+    """Return a copy of `block` whose element also carries `extra`."""
+    return {**block, "element": {**block["element"], **extra}}
+
+
+_TYPE_OPTIONS = [
+    {"text": _plain("Feedback"), "value": "feedback"},
+    {"text": _plain("Vote"), "value": "vote"},
+    {"text": _plain("Ranking"), "value": "ranking"},
+    {"text": _plain("Clear Selection"), "value": "clear"},
+]
+_TYPE_INITIAL = {
+    value: {"text": _plain(label), "value": value}
+    for value, label in (("feedback", "Feedback"), ("vote", "Vote"), ("ranking", "Ranking"))
+}
+_KIND_OPTIONS = _TYPE_OPTIONS[:2]
+_KIND_INITIAL = {"feedback": _TYPE_INITIAL["feedback"], "vote": _TYPE_INITIAL["vote"]}
+_FORMAT_OPTIONS = [
+    {"text": _plain("Paragraph"), "value": "paragraph"},
+    {"text": _plain("Stars 1-5"), "value": "stars"},
+]
+_MULTI_OPTIONS = [{"text": _plain("Users can select multiple options"), "value": "allow_multi"}]
+_QUESTION_PLACEHOLDER = _plain("Type your question here")
+_OPTION_PLACEHOLDER = _plain("Type option text here")
+
+
+def _type_initial(sel):
+    initial = _TYPE_INITIAL.get(sel)
+    if initial is None:  # unknown values have always been labelled "Ranking"
+        initial = {"text": _plain("Ranking"), "value": sel}
+    return initial
+
+
+def _kind_initial(sel):
+    initial = _KIND_INITIAL.get(sel)
+    if initial is None:
+        initial = {"text": _plain("Vote"), "value": sel}
+    return initial
+
+
+def _type_select_block(i, dispatch):
+    return _input_block(f"q_type_block_{i}", f"Type for Question {i+1}", {
+        "type": "static_select",
+        "action_id": f"q_type_select_{i}",
+        "options": _TYPE_OPTIONS,
+    }, dispatch=dispatch)
+
+
+def _multi_block(i, checked):
+    element = {"type": "checkboxes", "action_id": f"multi_select_{i}", "options": _MULTI_OPTIONS}
+    if checked:
+        element["initial_options"] = _MULTI_OPTIONS
+    return _input_block(f"multi_block_{i}", "Allow multiple selections?", element)
+
+
+_TYPE_BLOCKS = [_type_select_block(i, dispatch=True) for i in range(10)]
+_TYPE_BLOCKS_STATIC = [_type_select_block(i, dispatch=False) for i in range(10)]
+_QUESTION_BLOCKS = [
+    _input_block(f"q_block_{i}", f"Question {i+1}", {
+        "type": "plain_text_input",
+        "action_id": f"q_input_{i}",
+        "placeholder": _QUESTION_PLACEHOLDER,
+    })
+    for i in range(10)
+]
+_FORMAT_BLOCKS = [
+    _input_block(f"format_block_{i}", f"Format for Question {i+1}", {
+        "type": "static_select",
+        "action_id": f"format_select_{i}",
+        "options": _FORMAT_OPTIONS,
+    })
+    for i in range(10)
+]
+_OPTION_BLOCKS = [
+    [
+        _input_block(f"opt_block_{i}_{j}", f"Q{i+1} Option {j+1}", {
+            "type": "plain_text_input",
+            "action_id": f"opt_input_{i}_{j}",
+            "placeholder": _OPTION_PLACEHOLDER,
+        })
+        for j in range(10)
+    ]
+    for i in range(10)
+]
+_MULTI_BLOCKS = [_multi_block(i, checked=False) for i in range(10)]
+_MULTI_BLOCKS_CHECKED = [_multi_block(i, checked=True) for i in range(10)]
+_FEEDBACK_QUESTION_BLOCKS = [
+    _input_block(f"feedback_q_block_{i}", f"Question {i+1}", {
+        "type": "plain_text_input",
+        "action_id": f"feedback_q_input_{i}",
+        "placeholder": _QUESTION_PLACEHOLDER,
+    })
+    for i in range(10)
+]
+_KIND_BLOCKS = [
+    _input_block(f"kind_block_{i}", f"Type for Question {i+1}", {
+        "type": "static_select",
+        "action_id": f"kind_select_{i}",
+        "options": _KIND_OPTIONS,
+    }, dispatch=True)
+    for i in range(10)
+]
+
+
+def _state_value(state, block_id, action_id, key):
+    return state.get(block_id, {}).get(action_id, {}).get(key)
+
+
+def _text_block(template, value):
+    return _with_element(template, initial_value=value) if value else template
+
+
+def _option_blocks(i, state):
+    """Return the ten option inputs of vote question `i`."""
+    blocks = []
+    for j, template in enumerate(_OPTION_BLOCKS[i]):
+        val = _state_value(state, f"opt_block_{i}_{j}", f"opt_input_{i}_{j}", "value")
+        blocks.append(_text_block(template, val))
+    return blocks
+
+
+# ─── Paged configuration modals ───────────────────────────────────────────────
+# With every question expanded, 10 vote questions need over 100 blocks, past
+# Slack's limit for a modal. The configuration builders take the question
+# being edited as `focus` and then render only it in full, the others as a
+# one-line summary with an Edit button, within these budgets. Called without
+# `focus` they render every question, as before.
+MODAL_MAX_BLOCKS = int(os.getenv("MODAL_MAX_BLOCKS", "100"))
+MODAL_MAX_BYTES = int(os.getenv("MODAL_MAX_BYTES", "24000"))
+SUMMARY_CHARS = 80
+_FORMAT_LABELS = {"paragraph": "Paragraph", "stars": "Stars 1-5"}
+
+
+def _summary_text(i, question, detail):
+    question = question or "_No question yet_"
+    if len(question) > SUMMARY_CHARS:
+        question = question[:SUMMARY_CHARS - 1] + "…"
+    return f"*{i+1}.* {question}\n{detail}"
+
+
+def _vote_summary(i, state, multi=False):
+    n = sum(1 for j in range(10) if _state_value(state, f"opt_block_{i}_{j}", f"opt_input_{i}_{j}", "value"))
+    text = f"Vote · {n} option{'s' if n != 1 else ''}"
+    return text + " · multiple selections" if multi else text
+
+
+def _format_summary(i, state):
+    fmt_sel = _state_value(state, f"format_block_{i}", f"format_select_{i}", "selected_option")
+    return "Feedback · " + _FORMAT_LABELS.get((fmt_sel or {}).get("value"), "Paragraph")
+
+
+def _paged(header, count, focus, render, summary):
+    return focus_page(header, count, focus, render, summary,
+                      max_blocks=MODAL_MAX_BLOCKS, max_bytes=MODAL_MAX_BYTES)
+
+
 # Helper to build the blended poll configuration blocks
-def build_blended_blocks(title, q_types=None, state=None):
+def _blended_question_blocks(i, sel, state):
+    blocks = []
+    if sel and sel != "clear":
+        blocks.append(_with_element(_TYPE_BLOCKS[i], initial_option=_type_initial(sel)))
+        q_text = _state_value(state, f"q_block_{i}", f"q_input_{i}", "value")
+        blocks.append(_text_block(_QUESTION_BLOCKS[i], q_text))
+        if sel != "ranking":
+            fmt_sel = _state_value(state, f"format_block_{i}", f"format_select_{i}", "selected_option")
+            if fmt_sel:
+                blocks.append(_with_element(_FORMAT_BLOCKS[i], initial_option=fmt_sel))
+            else:
+                blocks.append(_FORMAT_BLOCKS[i])
+    else:
+        blocks.append(_TYPE_BLOCKS[i])
+
+    if sel == "vote":
+        blocks.extend(_option_blocks(i, state))
+        multi_checked = _state_value(state, f"multi_block_{i}", f"multi_select_{i}", "selected_options")
+        blocks.append(_MULTI_BLOCKS_CHECKED[i] if multi_checked else _MULTI_BLOCKS[i])
+    return blocks
+
+
+def _blended_summary(i, sel, state):
+    q_text = _state_value(state, f"q_block_{i}", f"q_input_{i}", "value")
+    if not sel or sel == "clear":
+        detail = "_Not used_"
+    elif sel == "vote":
+        multi = _state_value(state, f"multi_block_{i}", f"multi_select_{i}", "selected_options")
+        detail = _vote_summary(i, state, bool(multi))
+    elif sel == "ranking":
+        detail = "Ranking"
+    else:
+        detail = _format_summary(i, state)
+    return summary_block(_summary_text(i, q_text, detail), i)
+
+
+def build_blended_blocks(title, q_types=None, state=None, focus=None):
     """Return block kit structure for blended poll config."""
     blocks = [
         {
@@ -92,102 +604,12 @@ def build_blended_blocks(title, q_types=None, state=None):
     ]
     q_types = q_types or {}
     state = state or {}
+    if focus is not None:
+        return _paged(blocks, 10, focus,
+                      lambda i: _blended_question_blocks(i, q_types.get(str(i)), state),
+                      lambda i: _blended_summary(i, q_types.get(str(i)), state))
     for i in range(10):
-        sel = q_types.get(str(i))
-        element = {
-            "type": "static_select",
-            "action_id": f"q_type_select_{i}",
-            "options": [
-                {"text": {"type": "plain_text", "text": "Feedback"}, "value": "feedback"},
-                {"text": {"type": "plain_text", "text": "Vote"}, "value": "vote"},
-                {"text": {"type": "plain_text", "text": "Ranking"}, "value": "ranking"},
-                {"text": {"type": "plain_text", "text": "Clear Selection"}, "value": "clear"},
-            ],
-        }
-        if sel and sel != "clear":
-            label = "Feedback" if sel == "feedback" else ("Vote" if sel == "vote" else "Ranking")
-            element["initial_option"] = {
-                "text": {"type": "plain_text", "text": label},
-                "value": sel,
-            }
-        blocks.append({
-            "type": "input",
-            "block_id": f"q_type_block_{i}",
-            "optional": True,
-            "dispatch_action": True,
-            "label": {"type": "plain_text", "text": f"Type for Question {i+1}"},
-            "element": element,
-        })
-        if sel and sel != "clear":
-            q_text = state.get(f"q_block_{i}", {}).get(f"q_input_{i}", {}).get("value")
-            q_element = {
-                "type": "plain_text_input",
-                "action_id": f"q_input_{i}",
-                "placeholder": {"type": "plain_text", "text": "Type your question here"},
-            }
-            if q_text:
-                q_element["initial_value"] = q_text
-            blocks.append({
-                "type": "input",
-                "block_id": f"q_block_{i}",
-                "optional": True,
-                "label": {"type": "plain_text", "text": f"Question {i+1}"},
-                "element": q_element,
-            })
-
-            if sel != "ranking":
-                fmt_sel = state.get(f"format_block_{i}", {}).get(f"format_select_{i}", {}).get("selected_option")
-                fmt_element = {
-                    "type": "static_select",
-                    "action_id": f"format_select_{i}",
-                    "options": [
-                        {"text": {"type": "plain_text", "text": "Paragraph"}, "value": "paragraph"},
-                        {"text": {"type": "plain_text", "text": "Stars 1-5"}, "value": "stars"},
-                    ],
-                }
-                if fmt_sel:
-                    fmt_element["initial_option"] = fmt_sel
-                blocks.append({
-                    "type": "input",
-                    "block_id": f"format_block_{i}",
-                    "optional": True,
-                    "label": {"type": "plain_text", "text": f"Format for Question {i+1}"},
-                    "element": fmt_element,
-                })
-
-        if sel == "vote":
-            for j in range(10):
-                    val = state.get(f"opt_block_{i}_{j}", {}).get(f"opt_input_{i}_{j}", {}).get("value")
-                    opt_el = {
-                        "type": "plain_text_input",
-                        "action_id": f"opt_input_{i}_{j}",
-                        "placeholder": {"type": "plain_text", "text": "Type option text here"},
-                    }
-                    if val:
-                        opt_el["initial_value"] = val
-                    blocks.append({
-                        "type": "input",
-                        "block_id": f"opt_block_{i}_{j}",
-                        "optional": True,
-                        "label": {"type": "plain_text", "text": f"Q{i+1} Option {j+1}"},
-                        "element": opt_el,
-                    })
-            multi_checked = state.get(f"multi_block_{i}", {}).get(f"multi_select_{i}", {}).get("selected_options")
-            blocks.append({
-                "type": "input",
-                "block_id": f"multi_block_{i}",
-                "optional": True,
-                "label": {"type": "plain_text", "text": "Allow multiple selections?"},
-                "element": {
-                    "type": "checkboxes",
-                    "action_id": f"multi_select_{i}",
-                    "options": [{
-                        "text": {"type": "plain_text", "text": "Users can select multiple options"},
-                        "value": "allow_multi"
-                    }],
-                    **({"initial_options": [{"text": {"type": "plain_text", "text": "Users can select multiple options"}, "value": "allow_multi"}]} if multi_checked else {})
-                },
-            })
+        blocks.extend(_blended_question_blocks(i, q_types.get(str(i)), state))
     return blocks
 
 
@@ -200,113 +622,92 @@ def build_question_type_blocks(title, q_types=None, state=None):
     q_types = q_types or {}
     state = state or {}
     for i in range(10):
-        q_text = state.get(f"q_block_{i}", {}).get(f"q_input_{i}", {}).get("value")
-        q_el = {
-            "type": "plain_text_input",
-            "action_id": f"q_input_{i}",
-            "placeholder": {"type": "plain_text", "text": "Type your question here"},
-        }
-        if q_text:
-            q_el["initial_value"] = q_text
-        blocks.append({
-            "type": "input",
-            "block_id": f"q_block_{i}",
-            "optional": True,
-            "label": {"type": "plain_text", "text": f"Question {i+1}"},
-            "element": q_el,
-        })
+        q_text = _state_value(state, f"q_block_{i}", f"q_input_{i}", "value")
+        blocks.append(_text_block(_QUESTION_BLOCKS[i], q_text))
 
         sel = q_types.get(str(i))
-        type_el = {
-            "type": "static_select",
-            "action_id": f"q_type_select_{i}",
-            "options": [
-                {"text": {"type": "plain_text", "text": "Feedback"}, "value": "feedback"},
-                {"text": {"type": "plain_text", "text": "Vote"}, "value": "vote"},
-                {"text": {"type": "plain_text", "text": "Ranking"}, "value": "ranking"},
-                {"text": {"type": "plain_text", "text": "Clear Selection"}, "value": "clear"},
-            ],
-        }
         if sel and sel != "clear":
-            label = "Feedback" if sel == "feedback" else ("Vote" if sel == "vote" else "Ranking")
-            type_el["initial_option"] = {
-                "text": {"type": "plain_text", "text": label},
-                "value": sel,
-            }
-        blocks.append({
-            "type": "input",
-            "block_id": f"q_type_block_{i}",
-            "optional": True,
-            "label": {"type": "plain_text", "text": f"Type for Question {i+1}"},
-            "element": type_el,
-        })
+            blocks.append(_with_element(_TYPE_BLOCKS_STATIC[i], initial_option=_type_initial(sel)))
+        else:
+            blocks.append(_TYPE_BLOCKS_STATIC[i])
         if sel == "vote":
-            multi_checked = state.get(f"multi_block_{i}", {}).get(f"multi_select_{i}", {}).get("selected_options")
-            blocks.append({
-                "type": "input",
-                "block_id": f"multi_block_{i}",
-                "optional": True,
-                "label": {"type": "plain_text", "text": "Allow multiple selections?"},
-                "element": {
-                    "type": "checkboxes",
-                    "action_id": f"multi_select_{i}",
-                    "options": [{
-                        "text": {"type": "plain_text", "text": "Users can select multiple options"},
-                        "value": "allow_multi"
-                    }],
-                    **({"initial_options": [{"text": {"type": "plain_text", "text": "Users can select multiple options"}, "value": "allow_multi"}]} if multi_checked else {})
-                },
-            })
+            multi_checked = _state_value(state, f"multi_block_{i}", f"multi_select_{i}", "selected_options")
+            blocks.append(_MULTI_BLOCKS_CHECKED[i] if multi_checked else _MULTI_BLOCKS[i])
     return blocks
 
 
 # Build blocks for vote option entry based on question types (step 3)
-def build_detail_blocks(title, questions, q_types, state=None, multi_flags=None):
+def _allow_multi(i, state, multi_flags):
+    multi_checked = _state_value(state, f"multi_block_{i}", f"multi_select_{i}", "selected_options")
+    if multi_checked is not None:
+        return bool(multi_checked)
+    return multi_flags[i] if i < len(multi_flags) else False
+
+
+def _detail_question_blocks(i, q, kind, state, multi_flags):
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": f"*{q}*"}}]
+    if kind == "vote":
+        blocks.append(_MULTI_BLOCKS_CHECKED[i] if _allow_multi(i, state, multi_flags) else _MULTI_BLOCKS[i])
+        blocks.extend(_option_blocks(i, state))
+    return blocks
+
+
+def _detail_summary(i, q, kind, state, multi_flags):
+    if kind != "vote":  # nothing to enter for it on this page
+        return {"type": "section", "text": {"type": "mrkdwn", "text": _summary_text(i, q, "Feedback")}}
+    detail = _vote_summary(i, state, _allow_multi(i, state, multi_flags))
+    return summary_block(_summary_text(i, q, detail), i)
+
+
+def build_detail_blocks(title, questions, q_types, state=None, multi_flags=None, focus=None):
     """Return block kit structure for entering vote options."""
     blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": f"*{title}*"}}]
     state = state or {}
     multi_flags = multi_flags or [False] * len(questions)
+    if focus is not None and questions:
+        return _paged(blocks, len(questions), focus,
+                      lambda i: _detail_question_blocks(i, questions[i], q_types[i], state, multi_flags),
+                      lambda i: _detail_summary(i, questions[i], q_types[i], state, multi_flags))
     for i, q in enumerate(questions):
-        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*{q}*"}})
-        if q_types[i] == "vote":
-            multi_checked = state.get(f"multi_block_{i}", {}).get(f"multi_select_{i}", {}).get("selected_options")
-            allow_multi = bool(multi_checked) if multi_checked is not None else (multi_flags[i] if i < len(multi_flags) else False)
-            blocks.append({
-                "type": "input",
-                "block_id": f"multi_block_{i}",
-                "optional": True,
-                "label": {"type": "plain_text", "text": "Allow multiple selections?"},
-                "element": {
-                    "type": "checkboxes",
-                    "action_id": f"multi_select_{i}",
-                    "options": [{
-                        "text": {"type": "plain_text", "text": "Users can select multiple options"},
-                        "value": "allow_multi"
-                    }],
-                    **({"initial_options": [{"text": {"type": "plain_text", "text": "Users can select multiple options"}, "value": "allow_multi"}]} if allow_multi else {})
-                },
-            })
-            for j in range(10):
-                val = state.get(f"opt_block_{i}_{j}", {}).get(f"opt_input_{i}_{j}", {}).get("value")
-                opt_el = {
-                    "type": "plain_text_input",
-                    "action_id": f"opt_input_{i}_{j}",
-                    "placeholder": {"type": "plain_text", "text": "Type option text here"},
-                }
-                if val:
-                    opt_el["initial_value"] = val
-                blocks.append({
-                    "type": "input",
-                    "block_id": f"opt_block_{i}_{j}",
-                    "optional": True,
-                    "label": {"type": "plain_text", "text": f"Q{i+1} Option {j+1}"},
-                    "element": opt_el,
-                })
+        blocks.extend(_detail_question_blocks(i, q, q_types[i], state, multi_flags))
     return blocks
 
 
 # Helper to build the feedback poll configuration blocks
-def build_feedback_blocks(title, kinds=None, state=None):
+def _feedback_question_blocks(i, sel_kind, state):
+    blocks = []
+    q_text = _state_value(state, f"feedback_q_block_{i}", f"feedback_q_input_{i}", "value")
+    blocks.append(_text_block(_FEEDBACK_QUESTION_BLOCKS[i], q_text))
+
+    if sel_kind:
+        blocks.append(_with_element(_KIND_BLOCKS[i], initial_option=_kind_initial(sel_kind)))
+    else:
+        blocks.append(_KIND_BLOCKS[i])
+
+    if sel_kind != "vote":
+        fmt_sel = _state_value(state, f"format_block_{i}", f"format_select_{i}", "selected_option")
+        if fmt_sel:
+            blocks.append(_with_element(_FORMAT_BLOCKS[i], initial_option=fmt_sel))
+        else:
+            blocks.append(_FORMAT_BLOCKS[i])
+    else:
+        blocks.extend(_option_blocks(i, state))
+        multi_checked = _state_value(state, f"multi_block_{i}", f"multi_select_{i}", "selected_options")
+        blocks.append(_MULTI_BLOCKS_CHECKED[i] if multi_checked else _MULTI_BLOCKS[i])
+    return blocks
+
+
+def _feedback_summary(i, sel_kind, state):
+    q_text = _state_value(state, f"feedback_q_block_{i}", f"feedback_q_input_{i}", "value")
+    if sel_kind == "vote":
+        multi = _state_value(state, f"multi_block_{i}", f"multi_select_{i}", "selected_options")
+        detail = _vote_summary(i, state, bool(multi))
+    else:
+        detail = _format_summary(i, state)
+    return summary_block(_summary_text(i, q_text, detail), i)
+
+
+def build_feedback_blocks(title, kinds=None, state=None, focus=None):
     """Return block kit structure for feedback poll config."""
     blocks = [
         {
@@ -316,110 +717,221 @@ def build_feedback_blocks(title, kinds=None, state=None):
     ]
     kinds = kinds or {}
     state = state or {}
+    if focus is not None:
+        return _paged(blocks, 10, focus,
+                      lambda i: _feedback_question_blocks(i, kinds.get(str(i)), state),
+                      lambda i: _feedback_summary(i, kinds.get(str(i)), state))
     for i in range(10):
-        q_text = state.get(f"feedback_q_block_{i}", {}).get(f"feedback_q_input_{i}", {}).get("value")
-        q_el = {
-            "type": "plain_text_input",
-            "action_id": f"feedback_q_input_{i}",
-            "placeholder": {"type": "plain_text", "text": "Type your question here"},
-        }
-        if q_text:
-            q_el["initial_value"] = q_text
-        blocks.append({
-            "type": "input",
-            "block_id": f"feedback_q_block_{i}",
-            "optional": True,
-            "label": {"type": "plain_text", "text": f"Question {i+1}"},
-            "element": q_el,
-        })
+        blocks.extend(_feedback_question_blocks(i, kinds.get(str(i)), state))
+    return blocks
 
-        sel_kind = kinds.get(str(i))
-        kind_el = {
-            "type": "static_select",
-            "action_id": f"kind_select_{i}",
-            "options": [
-                {"text": {"type": "plain_text", "text": "Feedback"}, "value": "feedback"},
-                {"text": {"type": "plain_text", "text": "Vote"}, "value": "vote"},
-            ],
-        }
-        if sel_kind:
-            kind_el["initial_option"] = {
-                "text": {"type": "plain_text", "text": "Feedback" if sel_kind == "feedback" else "Vote"},
-                "value": sel_kind,
-            }
-        blocks.append({
-            "type": "input",
-            "block_id": f"kind_block_{i}",
-            "optional": True,
-            "dispatch_action": True,
-            "label": {"type": "plain_text", "text": f"Type for Question {i+1}"},
-            "element": kind_el,
-        })
 
-        fmt_sel = state.get(f"format_block_{i}", {}).get(f"format_select_{i}", {}).get("selected_option")
-        fmt_el = {
-            "type": "static_select",
-            "action_id": f"format_select_{i}",
-            "options": [
-                {"text": {"type": "plain_text", "text": "Paragraph"}, "value": "paragraph"},
-                {"text": {"type": "plain_text", "text": "Stars 1-5"}, "value": "stars"},
-            ],
-        }
-        if fmt_sel:
-            fmt_el["initial_option"] = fmt_sel
-        if sel_kind != "vote":
-            blocks.append({
-                "type": "input",
-                "block_id": f"format_block_{i}",
-                "optional": True,
-                "label": {"type": "plain_text", "text": f"Format for Question {i+1}"},
-                "element": fmt_el,
-            })
+# Helper to build the posted poll message
+def build_poll_blocks(data, live=False):
+    """Return the blocks of the public poll message.
+
+    With `live` set a line of current counts is appended. Closed polls are
+    shown without their buttons.
+    """
+    if data["type"] == "vote":
+        blocks = [
+            {"type": "section",
+             "text": {"type": "mrkdwn", "text": f"*📊 {data['question']}*"}},
+            {"type": "actions",
+             "elements": [
+                 {
+                   "type": "button",
+                   "text": {"type": "plain_text", "text": opt},
+                   "value": data["poll_id"],
+                   "action_id": f"vote_{i}"
+                 }
+                 for i, opt in enumerate(data["options"])
+             ]}
+        ]
+    else:  # feedback, ranking or blended
+        button_text = "Submit Feedback" if data["type"] != "ranking" else "Submit Rating"
+        blocks = [
+            {"type": "section",
+             "text": {"type": "mrkdwn", "text": f"*✏️ {data['question']}*"}},
+            {"type": "actions",
+             "elements": [
+                 {
+                   "type": "button",
+                   "text": {"type": "plain_text", "text": button_text},
+                   "value": data["poll_id"],
+                   "action_id": "open_feedback"
+                 }
+             ]}
+        ]
+    if not data["active"]:
+        blocks.pop()
+    else:
+        closes = []
+        if data.get("close_at"):
+            at = int(data["close_at"])
+            closes.append(f"<!date^{at}^{{date_short_pretty}} at {{time}}|at its deadline>")
+        if data.get("quorum"):
+            closes.append(f"after {data['quorum']} responses")
+        if closes:
+            text = "⏰ Closes " + " or ".join(closes)
+            blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": text}]})
+    if live:
+        if data["type"] == "vote":
+            counts = " · ".join(
+                f"*{opt}* {data['tallies'].get(i, 0)}" for i, opt in enumerate(data["options"])
+            )
+            summary = f"{counts} — {len(data['votes'])} voters"
         else:
-            for j in range(10):
-                val = state.get(f"opt_block_{i}_{j}", {}).get(f"opt_input_{i}_{j}", {}).get("value")
-                opt_el = {
-                    "type": "plain_text_input",
-                    "action_id": f"opt_input_{i}_{j}",
-                    "placeholder": {"type": "plain_text", "text": "Type option text here"},
-                }
-                if val:
-                    opt_el["initial_value"] = val
-                blocks.append({
-                    "type": "input",
-                    "block_id": f"opt_block_{i}_{j}",
-                    "optional": True,
-                    "label": {"type": "plain_text", "text": f"Q{i+1} Option {j+1}"},
-                    "element": opt_el,
-                })
-            multi_checked = state.get(f"multi_block_{i}", {}).get(f"multi_select_{i}", {}).get("selected_options")
-            blocks.append({
-                "type": "input",
-                "block_id": f"multi_block_{i}",
-                "optional": True,
-                "label": {"type": "plain_text", "text": "Allow multiple selections?"},
-                "element": {
-                    "type": "checkboxes",
-                    "action_id": f"multi_select_{i}",
-                    "options": [{
-                        "text": {"type": "plain_text", "text": "Users can select multiple options"},
-                        "value": "allow_multi"
-                    }],
-                    **({"initial_options": [{"text": {"type": "plain_text", "text": "Users can select multiple options"}, "value": "allow_multi"}]} if multi_checked else {})
-                },
-            })
+            summary = f"{len(data['feedback_responses'])} responses"
+        if not data["active"]:
+            summary += " — closed"
+        blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": summary}]})
     return blocks
 
 
+# ─── Live results ─────────────────────────────────────────────────────────────
+# With LIVE_RESULTS_INTERVAL set, the posted poll message shows current counts
+# and voters only get a short acknowledgement. Changes are coalesced so each
+# poll gets at most one chat_update per interval however fast votes arrive.
+live_interval = float(os.getenv("LIVE_RESULTS_INTERVAL", "0"))
+scheduler = Scheduler()
+_live_lock = threading.Lock()
+_live_pending = set()
+_live_sent = {}
+
+
+def schedule_live_update(poll_id, client):
+    """Refresh the poll message once the current interval has passed."""
+    with _live_lock:
+        if poll_id in _live_pending:
+            return
+        _live_pending.add(poll_id)
+        due = max(time.monotonic(), _live_sent.get(poll_id, 0) + live_interval)
+    scheduler.call_at(due, push_live_update, poll_id, client)
+
+
+def push_live_update(poll_id, client):
+    """Rewrite the poll message with the poll's current counts."""
+    with _live_lock:
+        # changes made after this point schedule another update
+        _live_pending.discard(poll_id)
+        _live_sent[poll_id] = time.monotonic()
+    poll = store.get_poll(poll_id)
+    if poll is None or not poll["active"]:
+        # this is the final update, or a stray one after it
+        with _live_lock:
+            _live_sent.pop(poll_id, None)
+    if poll is None or not poll.get("message_ts"):
+        return
+    dispatcher.submit(
+        client, "chat_update",
+        channel=poll["channel_id"],
+        ts=poll["message_ts"],
+        text=poll["question"],
+        blocks=build_poll_blocks(poll, live=True),
+    )
+
+
+# ─── Auto-close ───────────────────────────────────────────────────────────────
+# A poll can close itself at a deadline (`close_at`, in epoch seconds) or once
+# it has `quorum` responses. Deadlines are timers on the live-results
+# scheduler, re-armed from the store when the process starts; the quorum is
+# compared with the response count after every recorded vote or submission.
+_DURATION = re.compile(r"(?:\s*\d+\s*[dhm])+\s*")
+_DURATION_UNITS = {"d": 86400, "h": 3600, "m": 60}
+_close_timers = {}
+
+
+def parse_duration(text):
+    """Return the seconds in a duration such as "90m", "2h" or "1d 12h", or
+    None if `text` is not one."""
+    text = text.lower()
+    if not _DURATION.fullmatch(text):
+        return None
+    return sum(int(n) * _DURATION_UNITS[unit] for n, unit in re.findall(r"(\d+)\s*([dhm])", text))
+
+
+def schedule_auto_close(poll_id, close_at, client=None):
+    """Close the poll when the wall clock reaches `close_at`."""
+    delay = max(0.0, close_at - time.time())
+    _close_timers[poll_id] = scheduler.call_later(
+        delay, run_in_background, auto_close, poll_id, client, "at its deadline")
+
+
+def cancel_auto_close(poll_id):
+    timer = _close_timers.pop(poll_id, None)
+    if timer is not None:
+        timer.cancel()
+
+
+def check_quorum(poll, count, client):
+    """Close `poll` once `count`, its responses so far, reaches its quorum."""
+    quorum = poll.get("quorum")
+    if quorum and count >= quorum:
+        noun = "response" if quorum == 1 else "responses"
+        run_in_background(auto_close, poll["poll_id"], client, f"after {quorum} {noun}")
+
+
+def auto_close(poll_id, client=None, reason=""):
+    """Close the poll and post its results, unless it is already closed."""
+    _close_timers.pop(poll_id, None)
+    # close_poll succeeds once, so a deadline racing the quorum, /closepoll
+    # or another worker posts the results only once
+    if store.get_poll(poll_id) is None or not store.close_poll(poll_id):
+        return
+    post_closed_results(client or app.client, store.get_poll(poll_id),
+                        closed_note(f"automatically {reason}"))
+
+
+# ─── Poll drafts ──────────────────────────────────────────────────────────────
+# The answers given so far in the /poll modals are saved in the store as a
+# draft, and the modals' private_metadata only carries its id. That keeps
+# each views_update small and lets a draft grow past private_metadata's
+# 3000 characters.
+def load_draft(view):
+    """Return the draft a /poll modal belongs to, or None once it expired.
+
+    Modals opened before drafts were kept server-side carry the draft itself.
+    """
+    meta = view.get("private_metadata") or ""
+    if meta.startswith("{"):
+        return json.loads(meta)
+    return store.get_draft(meta)
+
+
+def update_draft(view, change):
+    """Apply `change(draft)` to the draft a /poll modal belongs to and save
+    it, atomically against other actions on the same modal. Returns the
+    updated draft, or None once it expired."""
+    meta = view.get("private_metadata") or ""
+    if meta.startswith("{"):
+        draft = json.loads(meta)
+        change(draft)
+        store.save_draft(draft)
+        return draft
+    return store.update_draft(meta, change)
+
+
+def draft_expired_view():
+    return {
+        "type": "modal",
+        "title": {"type": "plain_text", "text": "Create a Poll"},
+        "close": {"type": "plain_text", "text": "Close"},
+        "blocks": [{"type": "section", "text": {
+            "type": "mrkdwn", "text": "⌛ This poll draft has expired. Run `/poll` to start again."}}],
+    }
+
+
 # ─── /poll ────────────────────────────────────────────────────────────────────
-@app.command("/poll")
+@listener("command", "/poll")
 def open_poll_modal(ack, body, client):
     """Begin poll creation by selecting type and title."""
     ack()
     trigger_id = body["trigger_id"]
-    metadata = json.dumps({"channel": body["channel_id"], "user": body["user_id"]})
+    metadata = store.save_draft({"channel": body["channel_id"], "user": body["user_id"]})
 
-    client.views_open(
+    dispatcher.submit(
+        client, "views_open",
         trigger_id=trigger_id,
         view={
             "type": "modal",
@@ -468,23 +980,81 @@ def open_poll_modal(ack, body, client):
                             {"text": {"type": "plain_text", "text": "Public"}, "value": "public"}
                         ]
                     }
+                },
+                {
+                    "type": "input",
+                    "block_id": "close_in_block",
+                    "optional": True,
+                    "label": {"type": "plain_text", "text": "Close after"},
+                    "hint": {"type": "plain_text", "text": "Minutes, hours or days, e.g. 30m, 2h or 1d 12h"},
+                    "element": {
+                        "type": "plain_text_input",
+                        "action_id": "close_in_input",
+                        "placeholder": {"type": "plain_text", "text": "2h"}
+                    }
+                },
+                {
+                    "type": "input",
+                    "block_id": "close_at_block",
+                    "optional": True,
+                    "label": {"type": "plain_text", "text": "Or close at"},
+                    "element": {"type": "datetimepicker", "action_id": "close_at_picker"}
+                },
+                {
+                    "type": "input",
+                    "block_id": "quorum_block",
+                    "optional": True,
+                    "label": {"type": "plain_text", "text": "Close after this many responses"},
+                    "element": {
+                        "type": "number_input",
+                        "action_id": "quorum_input",
+                        "is_decimal_allowed": False,
+                        "min_value": "1"
+                    }
                 }
             ]
         }
     )
 
-@app.view("poll_step1")
+@listener("view", "poll_step1")
 def handle_poll_step1(ack, body, view, client):
     """Show appropriate fields based on poll type."""
-    info = json.loads(view["private_metadata"])
-    channel_id = info["channel"]
-    creator_id = info["user"]
+    meta_data = load_draft(view)
+    if meta_data is None:
+        ack(response_action="update", view=draft_expired_view())
+        return
     state = view["state"]["values"]
     p_type = state["type_block"]["poll_type"]["selected_option"]["value"]
     title = state["question_block"]["question_input"]["value"]
     visibility = state["visibility_block"]["visibility_select"]["selected_option"]["value"]
-    meta_data = {"channel": channel_id, "user": creator_id, "type": p_type, "title": title, "visibility": visibility}
-    meta = json.dumps(meta_data)
+    meta_data.update(type=p_type, title=title, visibility=visibility)
+    if p_type in ("feedback", "blended"):
+        meta_data.update(questions=[], q_types={})
+
+    # auto-close: a duration counts from when the poll is posted; values
+    # from an attempt that was sent back with errors are dropped first
+    for key in ("close_in", "close_at", "quorum"):
+        meta_data.pop(key, None)
+    errors = {}
+    close_in = _state_value(state, "close_in_block", "close_in_input", "value")
+    close_at = _state_value(state, "close_at_block", "close_at_picker", "selected_date_time")
+    quorum = _state_value(state, "quorum_block", "quorum_input", "value")
+    if close_in:
+        meta_data["close_in"] = parse_duration(close_in)
+        if not meta_data["close_in"]:
+            errors["close_in_block"] = "Use minutes, hours or days, e.g. 30m, 2h or 1d 12h."
+    if close_at:
+        meta_data["close_at"] = close_at
+        if close_in:
+            errors["close_at_block"] = "Choose a duration or a time, not both."
+        elif close_at <= time.time():
+            errors["close_at_block"] = "Pick a time in the future."
+    if quorum:
+        meta_data["quorum"] = int(quorum)
+    if errors:
+        ack(response_action="errors", errors=errors)
+        return
+    meta = store.save_draft(meta_data)
 
     if p_type == "vote":
         blocks = [
@@ -548,14 +1118,12 @@ def handle_poll_step1(ack, body, view, client):
             },
         )
     else:  # feedback or blended
-        meta_data["questions"] = []
-        meta_data["q_types"] = {}
         ack(
             response_action="update",
             view={
                 "type": "modal",
                 "callback_id": "poll_step2",
-                "private_metadata": json.dumps(meta_data),
+                "private_metadata": meta,
                 "title": {"type": "plain_text", "text": "Create a Poll"},
                 "submit": {"type": "plain_text", "text": "Next"},
                 "blocks": build_question_type_blocks(title),
@@ -563,11 +1131,14 @@ def handle_poll_step1(ack, body, view, client):
         )
 
 
-@app.view("poll_step2")
+@listener("view", "poll_step2")
 def handle_poll_step2(ack, body, view, client):
     """Collect question text and types then request details."""
+    meta = load_draft(view)
+    if meta is None:
+        ack(response_action="update", view=draft_expired_view())
+        return
     ack()
-    meta = json.loads(view["private_metadata"])
     state = view["state"]["values"]
     questions = []
     q_types = []
@@ -592,93 +1163,146 @@ def handle_poll_step2(ack, body, view, client):
     meta["q_types"] = q_types
     meta["multi_flags"] = multi_flags
     meta["q_formats"] = q_formats
+    # start on the first question that needs options
+    meta["page"] = "detail"
+    meta["focus"] = next((i for i, t in enumerate(q_types) if t == "vote"), 0)
 
-    blocks = build_detail_blocks(meta["title"], questions, q_types, multi_flags=multi_flags)
+    blocks = build_detail_blocks(meta["title"], questions, q_types,
+                                 multi_flags=multi_flags, focus=meta["focus"])
 
     ack(
         response_action="update",
         view={
             "type": "modal",
             "callback_id": "submit_poll",
-            "private_metadata": json.dumps(meta),
+            "private_metadata": store.save_draft(meta),
             "title": {"type": "plain_text", "text": "Create a Poll"},
             "submit": {"type": "plain_text", "text": "Post Poll"},
             "blocks": blocks,
         },
     )
 
+# ─── Re-render the config modal on dispatch actions ───────────────────────────
+# Block actions cannot update their view through ack(), so the modal is
+# re-rendered with views_update: once per burst of selections on a view,
+# only when its layout changes, and checked against the view's hash.
+view_updates = ViewUpdater(
+    dispatcher.submit, scheduler.call_later,
+    delay=0 if dispatcher.workers == 0 else float(os.getenv("VIEW_UPDATE_COALESCE_MS", "100")) / 1000,
+)
+
+
+def config_page_blocks(meta, inputs):
+    """Return the blocks of the config page the draft is on, showing its
+    focused question."""
+    focus = meta.get("focus", 0)
+    if meta.get("page") == "detail":
+        return build_detail_blocks(meta["title"], meta["questions"], meta["q_types"], inputs,
+                                   meta.get("multi_flags"), focus=focus)
+    if meta.get("page") == "feedback":
+        return build_feedback_blocks(meta["title"], meta.get("q_kinds", {}), inputs, focus=focus)
+    return build_blended_blocks(meta["title"], meta.get("q_types", {}), inputs, focus=focus)
+
+
+def config_view(draft_id, meta, notice=None):
+    """Return the config modal on the draft's current page, with `notice`
+    below its title."""
+    blocks = config_page_blocks(meta, meta.get("inputs", {}))
+    if notice:
+        blocks.insert(1, {"type": "context", "elements": [{"type": "mrkdwn", "text": notice}]})
+    return {
+        "type": "modal",
+        "callback_id": "submit_poll",
+        "private_metadata": draft_id,
+        "title": {"type": "plain_text", "text": "Create a Poll"},
+        "submit": {"type": "plain_text", "text": "Post Poll"},
+        "blocks": blocks,
+    }
+
+
+def request_config_update(client, view, change):
+    """Apply `change` to the draft and update the config modal to its
+    current page.
+
+    Only the focused question's inputs are on the page, so the values entered
+    for the others are kept in the draft, in the form of the view's state.
+    """
+    values = view.get("state", {}).get("values", {})
+
+    def apply(meta):
+        change(meta)
+        meta["inputs"] = {**meta.get("inputs", {}), **values}
+
+    meta = update_draft(view, apply)
+    if meta is None:
+        return
+    view_updates.request(client, view["id"], view.get("hash"),
+                         lambda: config_view(meta["draft_id"], meta))
+
+
 # ─── Handle question type selection for blended polls ─────────────────────────
-@app.action(re.compile(r"^q_type_select_\d+$"))
-def update_blended_question(ack, body):
+@listener("action", re.compile(r"^q_type_select_\d+$"))
+def update_blended_question(ack, body, client):
     """Update blended poll modal when a question type is chosen."""
+    ack()
     view = body["view"]
     action = body["actions"][0]
     idx = int(action["action_id"].split("_")[-1])
     sel_type = action["selected_option"]["value"]
-    meta = json.loads(view["private_metadata"])
-    q_types = meta.get("q_types", {})
-    if sel_type == "clear":
-        q_types.pop(str(idx), None)
-    else:
-        q_types[str(idx)] = sel_type
-    meta["q_types"] = q_types
 
-    state = view.get("state", {}).get("values", {})
-    blocks = build_blended_blocks(meta["title"], q_types, state)
+    def change(meta):
+        q_types = meta.get("q_types", {})
+        if sel_type == "clear":
+            q_types.pop(str(idx), None)
+        else:
+            q_types[str(idx)] = sel_type
+        meta.update(q_types=q_types, page="blended", focus=idx)
 
-    ack(
-        response_action="update",
-        view={
-            "type": "modal",
-            "callback_id": "submit_poll",
-            "private_metadata": json.dumps(meta),
-            "title": {"type": "plain_text", "text": "Create a Poll"},
-            "submit": {"type": "plain_text", "text": "Post Poll"},
-            "blocks": blocks,
-        },
-    )
+    request_config_update(client, view, change)
 
 # ─── Handle kind selection for feedback polls ───────────────────────────────
-@app.action(re.compile(r"^kind_select_\d+$"))
-def update_feedback_kind(ack, body):
+@listener("action", re.compile(r"^kind_select_\d+$"))
+def update_feedback_kind(ack, body, client):
     """Update feedback poll modal when a question kind is chosen."""
+    ack()
     view = body["view"]
     action = body["actions"][0]
     idx = int(action["action_id"].split("_")[-1])
     sel_kind = action["selected_option"]["value"]
-    meta = json.loads(view["private_metadata"])
-    if meta.get("type") != "feedback":
-        ack()
+    meta = load_draft(view)
+    if meta is None or meta.get("type") != "feedback":
         return
-    kinds = meta.get("q_kinds", {})
-    kinds[str(idx)] = sel_kind
-    meta["q_kinds"] = kinds
 
-    state = view.get("state", {}).get("values", {})
-    blocks = build_feedback_blocks(meta["title"], kinds, state)
+    def change(meta):
+        kinds = meta.get("q_kinds", {})
+        kinds[str(idx)] = sel_kind
+        meta.update(q_kinds=kinds, page="feedback", focus=idx)
+
+    request_config_update(client, view, change)
+
+
+# ─── Page between questions of the config modal ─────────────────────────────
+@listener("action", re.compile(r"^(edit_q_\d+|page_q_prev|page_q_next)$"))
+def focus_question(ack, body, client):
+    """Show the chosen question of the config modal in full."""
+    ack()
+    focus = int(body["actions"][0]["value"])
+    request_config_update(client, body["view"], lambda meta: meta.update(focus=focus))
 
-    ack(
-        response_action="update",
-        view={
-            "type": "modal",
-            "callback_id": "submit_poll",
-            "private_metadata": json.dumps(meta),
-            "title": {"type": "plain_text", "text": "Create a Poll"},
-            "submit": {"type": "plain_text", "text": "Post Poll"},
-            "blocks": blocks,
-        },
-    )
 # ─── Submit Poll ───────────────────────────────────────────────────────────────
-@app.view("submit_poll")
+@listener("view", "submit_poll")
 def handle_poll_submission(ack, body, view, client):
-    ack()
-    info = json.loads(view["private_metadata"])
+    info = load_draft(view)
+    if info is None:
+        ack(response_action="update", view=draft_expired_view())
+        return
     channel_id = info["channel"]
     creator_id = info["user"]
     p_type = info["type"]
     title = info["title"]
     visibility = info.get("visibility", "anonymous")
-    state = view["state"]["values"]
+    # values of questions that are not on the current page are in the draft
+    state = {**info.get("inputs", {}), **view["state"]["values"]}
 
     # collect
     opts, fqs, f_formats, f_kinds = [], [], [], []
@@ -728,37 +1352,42 @@ def handle_poll_submission(ack, body, view, client):
                 f_formats.append(fmt or "paragraph")
                 multi_flags.append(False)
 
-    # validation
+    # validation: the modal stays open with the error, so nothing entered
+    # on this or any other page is lost
     if p_type == "vote" and len(opts) < 2:
-        client.chat_postEphemeral(
-            channel=channel_id,
-            user=creator_id,
-            text="❌ You must provide at least *2* vote options."
-        )
-        return
-    if p_type in ("feedback", "ranking") and len(fqs) < 1:
-        client.chat_postEphemeral(
-            channel=channel_id,
-            user=creator_id,
-            text="❌ You must provide at least *1* feedback question."
-        )
+        empty = next(i for i in range(10) if not _state_value(state, f"option_block_{i}", f"option_input_{i}", "value"))
+        ack(response_action="errors", errors={f"option_block_{empty}": "You must provide at least 2 vote options."})
         return
-    if p_type == "blended" and len(fqs) < 1:
-        client.chat_postEphemeral(
-            channel=channel_id,
-            user=creator_id,
-            text="❌ You must provide at least *1* question."
-        )
+    if p_type in ("feedback", "ranking", "blended") and len(fqs) < 1:
+        noun = "question" if p_type == "blended" else "feedback question"
+        blocks = build_question_type_blocks(title)
+        blocks.insert(1, {"type": "context", "elements": [
+            {"type": "mrkdwn", "text": f"❌ You must provide at least *1* {noun}."}]})
+        ack(response_action="update", view={
+            "type": "modal",
+            "callback_id": "poll_step2",
+            "private_metadata": store.save_draft(info),
+            "title": {"type": "plain_text", "text": "Create a Poll"},
+            "submit": {"type": "plain_text", "text": "Next"},
+            "blocks": blocks,
+        })
         return
     if p_type in ("blended", "feedback"):
         for idx, k in enumerate(f_kinds):
             if k == "vote" and len(question_opts[idx]) < 2:
-                client.chat_postEphemeral(
-                    channel=channel_id,
-                    user=creator_id,
-                    text=f"❌ Question {idx+1} needs at least 2 options."
-                )
+                msg = f"Question {idx+1} needs at least 2 options."
+                block_id = f"opt_block_{idx}_0"
+                if any(b.get("block_id") == block_id for b in view.get("blocks", [])):
+                    ack(response_action="errors", errors={block_id: msg})
+                else:
+                    # the question is not on this page: turn to it
+                    info = update_draft(view, lambda meta: meta.update(inputs=state, focus=idx))
+                    if info is None:
+                        ack(response_action="update", view=draft_expired_view())
+                    else:
+                        ack(response_action="update", view=config_view(info["draft_id"], info, "❌ " + msg))
                 return
+    ack()
 
     allow_multi = False
     if p_type == "vote":
@@ -766,6 +1395,16 @@ def handle_poll_submission(ack, body, view, client):
         allow_multi = bool(sel_opts)
 
     # store
+    common = {
+        "type": p_type,
+        "question": title,
+        "creator_id": creator_id,
+        "channel_id": channel_id,
+        "anonymous": visibility == "anonymous",
+        "active": True,
+        "close_at": info.get("close_at") or (time.time() + info["close_in"] if info.get("close_in") else None),
+        "quorum": info.get("quorum"),
+    }
     if p_type == "blended":
         vt = []
         for kind, opts_list in zip(f_kinds, question_opts):
@@ -773,45 +1412,24 @@ def handle_poll_submission(ack, body, view, client):
                 vt.append({i: 0 for i in range(len(opts_list))})
             else:
                 vt.append({})
-        poll_data.update({
-            "type": p_type,
-            "question": title,
-            "options": [],
-            "feedback_questions": fqs,
-            "feedback_formats": f_formats,
-            "feedback_kinds": f_kinds,
-            "question_options": question_opts,
-            "vote_tallies": vt,
-            "votes": {},
-            "tallies": {},
-            "feedback_responses": [],
-            "creator_id": creator_id,
-            "channel_id": channel_id,
-            "anonymous": visibility == "anonymous",
-            "multi": False,
-            "multi_questions": multi_flags,
-            "active": True,
-        })
+        poll = new_poll_data(
+            feedback_questions=fqs,
+            feedback_formats=f_formats,
+            feedback_kinds=f_kinds,
+            question_options=question_opts,
+            vote_tallies=vt,
+            multi_questions=multi_flags,
+            **common,
+        )
     elif p_type == "ranking":
-        poll_data.update({
-            "type": p_type,
-            "question": title,
-            "options": [],
-            "feedback_questions": fqs,
-            "feedback_formats": f_formats,
-            "feedback_kinds": f_kinds,
-            "question_options": question_opts,
-            "vote_tallies": [{}],
-            "votes": {},
-            "tallies": {},
-            "feedback_responses": [],
-            "creator_id": creator_id,
-            "channel_id": channel_id,
-            "anonymous": visibility == "anonymous",
-            "multi": False,
-            "multi_questions": [],
-            "active": True,
-        })
+        poll = new_poll_data(
+            feedback_questions=fqs,
+            feedback_formats=f_formats,
+            feedback_kinds=f_kinds,
+            question_options=question_opts,
+            vote_tallies=[{}],
+            **common,
+        )
     elif p_type == "feedback":
         vt = []
         for kind, opts_list in zip(f_kinds, question_opts):
@@ -822,94 +1440,63 @@ def handle_poll_submission(ack, body, view, client):
                     vt.append({"yes": 0, "no": 0})
             else:
                 vt.append({})
-        poll_data.update({
-            "type": p_type,
-            "question": title,
-            "options": [],
-            "feedback_questions": fqs,
-            "feedback_formats": f_formats,
-            "feedback_kinds": f_kinds,
-            "question_options": question_opts,
-            "vote_tallies": vt,
-            "votes": {},
-            "tallies": {},
-            "feedback_responses": [],
-            "creator_id": creator_id,
-            "channel_id": channel_id,
-            "anonymous": visibility == "anonymous",
-            "multi": False,
-            "multi_questions": multi_flags,
-            "active": True,
-        })
+        poll = new_poll_data(
+            feedback_questions=fqs,
+            feedback_formats=f_formats,
+            feedback_kinds=f_kinds,
+            question_options=question_opts,
+            vote_tallies=vt,
+            multi_questions=multi_flags,
+            **common,
+        )
     else:
-        poll_data.update({
-            "type": p_type,
-            "question": title,
-            "options": opts,
-            "feedback_questions": fqs,
-            "feedback_formats": f_formats,
-            "feedback_kinds": f_kinds,
-            "question_options": [],
-            "vote_tallies": [{"yes": 0, "no": 0} for _ in range(len(fqs))],
-            "votes": {},
-            "tallies": {i: 0 for i in range(len(opts))},
-            "feedback_responses": [],
-            "creator_id": creator_id,
-            "channel_id": channel_id,
-            "anonymous": visibility == "anonymous",
-            "multi": allow_multi,
-            "multi_questions": [],
-            "active": True,
-        })
-
-    # build blocks
-    if p_type == "vote":
-        blocks = [
-            {"type": "section",
-             "text": {"type": "mrkdwn", "text": f"*📊 {title}*"}},
-            {"type": "actions",
-             "elements": [
-                 {
-                   "type": "button",
-                   "text": {"type": "plain_text", "text": opt},
-                   "value": str(i),
-                   "action_id": f"vote_{i}"
-                 }
-                 for i, opt in enumerate(opts)
-             ]}
-        ]
-    else:  # feedback, ranking or blended
-        button_text = "Submit Feedback" if p_type != "ranking" else "Submit Rating"
-        blocks = [
-            {"type": "section",
-             "text": {"type": "mrkdwn", "text": f"*✏️ {title}*"}},
-            {"type": "actions",
-             "elements": [
-                 {
-                   "type": "button",
-                   "text": {"type": "plain_text", "text": button_text},
-                   "action_id": "open_feedback"
-                 }
-             ]}
-        ]
-
-    # post the poll
-    client.chat_postMessage(channel=channel_id, text=title, blocks=blocks)
+        poll = new_poll_data(
+            options=opts,
+            feedback_questions=fqs,
+            feedback_formats=f_formats,
+            feedback_kinds=f_kinds,
+            vote_tallies=[{"yes": 0, "no": 0} for _ in range(len(fqs))],
+            tallies={i: 0 for i in range(len(opts))},
+            multi=allow_multi,
+            **common,
+        )
+    poll_id = store.add_poll(poll)["poll_id"]
+    if info.get("draft_id"):
+        store.delete_draft(info["draft_id"])
+
+    if poll["close_at"]:
+        schedule_auto_close(poll_id, poll["close_at"], client)
+
+    # post the poll, then DM the creator, each once the call before it is
+    # sent, so this listener does not wait on Slack
+    def posted(future):
+        if future.exception() is not None:
+            return  # logged by the dispatcher
+        resp = future.result()
+        if resp is not None:
+            store.set_message_ts(poll_id, resp.get("ts"))
+        dispatcher.submit(client, "conversations_open", users=creator_id).add_done_callback(dm_opened)
+
+    def dm_opened(future):
+        try:
+            dm = future.result()["channel"]["id"]
+        except Exception as e:
+            print(f"Error sending confirmation DM: {e}")
+            return
+        dispatcher.submit(client, "chat_postMessage", channel=dm, text="✅ Your poll has been posted.")
 
-    # DM creator
-    try:
-        im = client.conversations_open(users=creator_id)
-        dm = im["channel"]["id"]
-        client.chat_postMessage(channel=dm, text="✅ Your poll has been posted.")
-    except Exception as e:
-        print(f"Error sending confirmation DM: {e}")
+    blocks = build_poll_blocks(poll, live=live_interval > 0)
+    dispatcher.submit(client, "chat_postMessage", channel=channel_id, text=title,
+                      blocks=blocks).add_done_callback(posted)
 
 # ─── Voting ───────────────────────────────────────────────────────────────────
-@app.action(re.compile(r"^vote_\d$"))
+@listener("action", re.compile(r"^vote_\d$"))
 def handle_vote(ack, body, action, client):
     ack()
-    if not poll_data["active"] or poll_data["type"] != "vote":
-        client.chat_postEphemeral(channel=body["channel"]["id"],
+    # only the settings and counts are needed, not every ballot
+    poll = store.get_poll_counts(action.get("value"))
+    if poll is None or not poll["active"] or poll["type"] != "vote":
+        dispatcher.submit(client, "chat_postEphemeral", channel=body["channel"]["id"],
             user=body["user"]["id"],
             text="❌ This poll is closed or not a vote poll."
         )
@@ -919,41 +1506,52 @@ def handle_vote(ack, body, action, client):
     choice = int(action["action_id"].split("_")[1])
     ch   = body["channel"]["id"]
 
-    if poll_data.get("multi"):
-        choices = poll_data["votes"].setdefault(user, set())
-        if choice in choices:
-            client.chat_postEphemeral(channel=ch, user=user,
-                text="✅ You’ve already voted for this option!")
-            return
-        choices.add(choice)
-    else:
-        if user in poll_data["votes"]:
-            client.chat_postEphemeral(channel=ch, user=user,
-                text="✅ You’ve already voted!")
-            return
-        poll_data["votes"][user] = choice
-
-    poll_data["tallies"][choice] += 1
+    voters = store.record_vote(poll, user, choice)
+    if not voters:
+        if not store.get_poll_counts(poll["poll_id"])["active"]:
+            text = "❌ This poll is closed or not a vote poll."
+        elif poll.get("multi"):
+            text = "✅ You’ve already voted for this option!"
+        else:
+            text = "✅ You’ve already voted!"
+        dispatcher.submit(client, "chat_postEphemeral", channel=ch, user=user, text=text)
+        return
+    votes_total.inc()
 
     blocks = [
         {
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": f"🗳 Vote recorded for *{poll_data['options'][choice]}*"
+                "text": f"🗳 Vote recorded for *{poll['options'][choice]}*"
             }
         }
     ]
-    blocks += build_vote_results_blocks(poll_data)
+    if live_interval > 0:
+        schedule_live_update(poll["poll_id"], client)
+    else:
+        # the individual votes are listed only when the poll is not anonymous
+        load = store.get_poll if poll.get("anonymous") is False else store.get_poll_counts
+        blocks += build_vote_results_blocks(load(poll["poll_id"]))
+        # long lists of individual votes are cut off; /pollresults pages them
+        blocks = blocks[:RESULTS_CHUNK_BLOCKS]
 
-    client.chat_postEphemeral(channel=ch, user=user, blocks=blocks)
+    dispatcher.submit(client, "chat_postEphemeral", channel=ch, user=user, blocks=blocks)
+    check_quorum(poll, voters, client)
 
 # ─── Open Feedback Modal ─────────────────────────────────────────────────────
-@app.action("open_feedback")
+@listener("action", "open_feedback")
 def open_feedback_modal(ack, body, client):
     ack()
     trigger_id = body["trigger_id"]
-    questions  = poll_data["feedback_questions"]
+    poll = store.get_poll(body["actions"][0].get("value"))
+    if poll is None or not poll["active"]:
+        dispatcher.submit(client, "chat_postEphemeral", channel=body["channel"]["id"],
+            user=body["user"]["id"],
+            text="❌ This poll is closed."
+        )
+        return
+    questions  = poll["feedback_questions"]
 
     # add a header + one input per question
     blocks = [
@@ -964,12 +1562,12 @@ def open_feedback_modal(ack, body, client):
     ]
 
     for i, q in enumerate(questions):
-        fmt = poll_data.get("feedback_formats", ["paragraph"] * len(questions))[i]
-        kind = poll_data.get("feedback_kinds", ["feedback"] * len(questions))[i]
-        multi_flags = poll_data.get("multi_questions", [])
+        fmt = poll.get("feedback_formats", ["paragraph"] * len(questions))[i]
+        kind = poll.get("feedback_kinds", ["feedback"] * len(questions))[i]
+        multi_flags = poll.get("multi_questions", [])
         multi = multi_flags[i] if i < len(multi_flags) else False
         if kind == "vote":
-            q_opts = poll_data.get("question_options", [])
+            q_opts = poll.get("question_options", [])
             if q_opts and i < len(q_opts) and q_opts[i]:
                 element = {
                     "type": "multi_static_select" if multi else "static_select",
@@ -1014,11 +1612,13 @@ def open_feedback_modal(ack, body, client):
             "element": element
         })
 
-    client.views_open(
+    dispatcher.submit(
+        client, "views_open",
         trigger_id=trigger_id,
         view={
             "type": "modal",
             "callback_id": "submit_feedback",
+            "private_metadata": json.dumps({"poll_id": poll["poll_id"]}),
             "title": {"type": "plain_text", "text": "Submit Feedback"},
             "submit": {"type": "plain_text", "text": "Send"},
             "blocks": blocks
@@ -1026,48 +1626,38 @@ def open_feedback_modal(ack, body, client):
     )
 
 # ─── Handle Feedback ─────────────────────────────────────────────────────────
-@app.view("submit_feedback")
+@listener("view", "submit_feedback")
 def handle_feedback_submission(ack, body, view, client):
     ack()
+    info = json.loads(view.get("private_metadata") or "{}")
+    poll = store.get_poll_counts(info.get("poll_id"))
     user_id = body["user"]["id"]
+    if poll is None or not poll["active"]:
+        if poll is not None:
+            dispatcher.submit(
+                client, "chat_postEphemeral",
+                channel=poll["channel_id"],
+                user=user_id,
+                text="❌ This poll is closed."
+            )
+        return
     state   = view["state"]["values"]
     answers = []
 
-    q_types = poll_data.get("feedback_kinds", ["feedback"] * len(poll_data["feedback_questions"]))
-    q_opts_all = poll_data.get("question_options", [])
-    multi_flags = poll_data.get("multi_questions", [])
-    for i in range(len(poll_data["feedback_questions"])):
+    q_types = poll.get("feedback_kinds", ["feedback"] * len(poll["feedback_questions"]))
+    q_opts_all = poll.get("question_options", [])
+    multi_flags = poll.get("multi_questions", [])
+    for i in range(len(poll["feedback_questions"])):
         kind = q_types[i]
-        fmt = poll_data.get("feedback_formats", ["paragraph"])[i]
+        fmt = poll.get("feedback_formats", ["paragraph"])[i]
+        has_opts = bool(q_opts_all and i < len(q_opts_all) and q_opts_all[i])
         if kind == "vote":
             if multi_flags[i] if i < len(multi_flags) else False:
                 sel_opts = state[f"resp_block_{i}"][f"resp_input_{i}"]["selected_options"]
-                vt = poll_data.get("vote_tallies", [])
-                selections = []
-                for opt in sel_opts:
-                    val = opt["value"]
-                    if q_opts_all and i < len(q_opts_all) and q_opts_all[i]:
-                        idx = int(val)
-                        if i < len(vt):
-                            vt[i][idx] = vt[i].get(idx, 0) + 1
-                        selections.append(idx)
-                    else:
-                        if i < len(vt):
-                            vt[i][val] = vt[i].get(val, 0) + 1
-                        selections.append(val)
-                ans = selections
+                ans = [int(opt["value"]) if has_opts else opt["value"] for opt in sel_opts]
             else:
                 sel = state[f"resp_block_{i}"][f"resp_input_{i}"]["selected_option"]["value"]
-                vt = poll_data.get("vote_tallies", [])
-                if q_opts_all and i < len(q_opts_all) and q_opts_all[i]:
-                    idx = int(sel)
-                    if i < len(vt):
-                        vt[i][idx] = vt[i].get(idx, 0) + 1
-                    ans = idx
-                else:
-                    if i < len(vt):
-                        vt[i][sel] = vt[i].get(sel, 0) + 1
-                    ans = sel
+                ans = int(sel) if has_opts else sel
         else:
             if fmt == "stars":
                 ans = state[f"resp_block_{i}"][f"resp_input_{i}"]["selected_option"]["value"]
@@ -1075,94 +1665,58 @@ def handle_feedback_submission(ack, body, view, client):
                 ans = state[f"resp_block_{i}"][f"resp_input_{i}"]["value"]
         answers.append(ans)
 
-    poll_data["feedback_responses"].append({
-        "user": user_id,
-        "answers": answers
-    })
-
-    try:
-        client.chat_postEphemeral(
-            channel=poll_data["channel_id"],
-            user=user_id,
-            text="✅ Your feedback has been submitted."
-        )
-    except Exception as e:
-        print(f"Error sending feedback confirmation: {e}")
+    responses = store.record_feedback(poll, user_id, answers)
+    if not responses:
+        dispatcher.submit(client, "chat_postEphemeral", channel=poll["channel_id"],
+                          user=user_id, text="❌ This poll is closed.")
+        return
+    responses_total.inc()
+    if live_interval > 0:
+        schedule_live_update(poll["poll_id"], client)
+
+    dispatcher.submit(
+        client, "chat_postEphemeral",
+        channel=poll["channel_id"],
+        user=user_id,
+        text="✅ Your feedback has been submitted."
+    )
+    check_quorum(poll, responses, client)
 
 # ─── /pollresults ────────────────────────────────────────────────────────────
-@app.command("/pollresults")
+# Rendered result pages, reused until the poll's version changes. The version
+# is read on its own, so a hit does not load the poll's votes and responses.
+results_cache = VersionedCache()
+
+@listener("command", "/pollresults")
 def show_poll_results(ack, body, client):
     ack()
     ch, usr = body["channel_id"], body["user_id"]
+    head = store.channel_poll_version(ch)
 
-    if not poll_data["active"]:
-        client.chat_postEphemeral(channel=ch, user=usr,
-                                  text="❗ No active poll right now.")
+    if head is None or not head[1]:
+        dispatcher.submit(client, "chat_postEphemeral", channel=ch, user=usr,
+                          text="❗ No active poll right now.")
         return
 
-    if poll_data["type"] == "vote":
-        blocks = build_vote_results_blocks(poll_data)
-        client.chat_postEphemeral(channel=ch, user=usr, blocks=blocks)
-        return
-    else:
-        text = f"*✏️ Feedback for:* {poll_data['question']}\n"
-        q_types = poll_data.get("feedback_kinds", ["feedback"] * len(poll_data["feedback_questions"]))
-        q_opts_all = poll_data.get("question_options", [])
-        if poll_data.get("anonymous"):
-            for idx, q in enumerate(poll_data["feedback_questions"]):
-                kind = q_types[idx]
-                fmt = poll_data.get("feedback_formats", ["paragraph"])[idx]
-                if kind == "vote":
-                    tallies = poll_data.get("vote_tallies", [])
-                    opts = q_opts_all[idx] if q_opts_all and idx < len(q_opts_all) else None
-                    if opts:
-                        counts = [tallies[idx].get(i, 0) for i in range(len(opts))] if idx < len(tallies) else [0]*len(opts)
-                        result = ", ".join(f"{opt} {cnt}" for opt, cnt in zip(opts, counts))
-                        text += f"• *{q}*: {result}\n"
-                    else:
-                        yes = tallies[idx]["yes"] if idx < len(tallies) else 0
-                        no = tallies[idx]["no"] if idx < len(tallies) else 0
-                        text += f"• *{q}*: yes {yes}, no {no}\n"
-                elif fmt == "stars":
-                    vals = [int(r["answers"][idx]) for r in poll_data["feedback_responses"]]
-                    avg = sum(vals) / len(vals) if vals else 0
-                    text += f"• *{q}*: average {avg:.1f}/5\n"
-                else:
-                    text += f"\n*{q}*\n"
-                    for resp in poll_data["feedback_responses"]:
-                        text += f"    • {resp['answers'][idx]}\n"
+    poll_id, _, version = head
+    cached = results_cache.get(poll_id, version)
+    if cached is None:
+        poll = store.get_poll(poll_id)
+        if poll["type"] == "vote":
+            cached = ("blocks", list(pack_blocks(build_vote_results_blocks(poll))))
         else:
-            for resp in poll_data["feedback_responses"]:
-                text += f"\n— <@{resp['user']}>'s answers:\n"
-                for idx, (q, a) in enumerate(zip(poll_data["feedback_questions"], resp["answers"])):
-                    kind = q_types[idx]
-                    fmt = poll_data.get("feedback_formats", ["paragraph"])[idx]
-                    if kind == "vote":
-                        opts = q_opts_all[idx] if q_opts_all and idx < len(q_opts_all) else None
-                        if opts:
-                            if isinstance(a, list):
-                                sel = ", ".join(opts[int(x)] for x in a)
-                            else:
-                                sel = opts[int(a)]
-                            text += f"    • *{q}*: {sel}\n"
-                        else:
-                            if isinstance(a, list):
-                                sel = ", ".join(a)
-                            else:
-                                sel = a
-                            text += f"    • *{q}*: {sel}\n"
-                    elif fmt == "stars":
-                        text += f"    • *{q}*: {a}/5\n"
-                    else:
-                        text += f"    • *{q}*: {a}\n"
-
-
-    client.chat_postEphemeral(channel=ch, user=usr, text=text)
+            pages = list(pack_text(iter_results_text(poll), RESULTS_CHUNK_CHARS - 20))
+            if len(pages) > 1:
+                pages = [f"{page}\n_Page {n}/{len(pages)}_" for n, page in enumerate(pages, 1)]
+            cached = ("text", pages)
+        results_cache.put(poll_id, version, cached)
+    key, pages = cached
+    post_pages(client, ch, pages, user=usr, key=key)
 
 # Helper to build Block Kit results for vote polls
 def build_vote_results_blocks(data, header=None, context=None):
     """Return a list of blocks summarizing vote tallies."""
-    total = sum(data["tallies"].values())
+    total = Tally.of(data["tallies"]).total()
     header_text = header or f"📊 Poll Results: *{data['question']}*"
     blocks = [
         {"type": "header", "text": {"type": "plain_text", "text": header_text}},
@@ -1188,8 +1742,12 @@ def build_vote_results_blocks(data, header=None, context=None):
 
     if data.get("anonymous") is False:
         vote_lines = []
-        for user_id, choice in data["votes"].items():
-            selected = data["options"][choice]
+        # voters share a handful of distinct ballots, so label each mask once
+        labels = {}
+        for user_id, mask in Ballots.of(data["votes"], data.get("multi")).voters():
+            selected = labels.get(mask)
+            if selected is None:
+                selected = labels[mask] = ", ".join(data["options"][i] for i in choices(mask))
             vote_lines.append(f"• <@{user_id}> → {selected}")
         if vote_lines:
             blocks.append({"type": "divider"})
@@ -1203,41 +1761,49 @@ def build_vote_results_blocks(data, header=None, context=None):
 
     return blocks
 
-# Helper to summarize results for non-vote polls
-def _non_vote_results_text():
-    """Return a text summary for feedback, ranking or blended polls."""
-    text = f"*✏️ Feedback for:* {poll_data['question']}\n"
-    q_types = poll_data.get("feedback_kinds", ["feedback"] * len(poll_data["feedback_questions"]))
-    q_opts_all = poll_data.get("question_options", [])
-    if poll_data.get("anonymous"):
-        for idx, q in enumerate(poll_data["feedback_questions"]):
+# Helper to read a star question's running average
+def star_average(data, idx):
+    """Return the mean rating of star question `idx` from its aggregate."""
+    aggs = data.get("aggregates") or []
+    if idx >= len(aggs) or not aggs[idx]["count"]:
+        return 0
+    return aggs[idx]["sum"] / aggs[idx]["count"]
+
+# Helper to stream the results report for non-vote polls
+def iter_results_text(poll):
+    """Yield the feedback, ranking or blended results report line by line."""
+    yield f"*✏️ Feedback for:* {poll['question']}\n"
+    q_types = poll.get("feedback_kinds", ["feedback"] * len(poll["feedback_questions"]))
+    q_opts_all = poll.get("question_options", [])
+    formats = poll.get("feedback_formats", ["paragraph"])
+    if poll.get("anonymous"):
+        for idx, q in enumerate(poll["feedback_questions"]):
             kind = q_types[idx]
-            fmt = poll_data.get("feedback_formats", ["paragraph"])[idx]
+            fmt = formats[idx]
             if kind == "vote":
-                tallies = poll_data.get("vote_tallies", [])
+                tallies = poll.get("vote_tallies", [])
                 opts = q_opts_all[idx] if q_opts_all and idx < len(q_opts_all) else None
                 if opts:
                     counts = [tallies[idx].get(i, 0) for i in range(len(opts))] if idx < len(tallies) else [0] * len(opts)
                     result = ", ".join(f"{opt} {cnt}" for opt, cnt in zip(opts, counts))
-                    text += f"• *{q}*: {result}\n"
+                    yield f"• *{q}*: {result}\n"
                 else:
                     yes = tallies[idx]["yes"] if idx < len(tallies) else 0
                     no = tallies[idx]["no"] if idx < len(tallies) else 0
-                    text += f"• *{q}*: yes {yes}, no {no}\n"
+                    yield f"• *{q}*: yes {yes}, no {no}\n"
             elif fmt == "stars":
-                vals = [int(r["answers"][idx]) for r in poll_data["feedback_responses"]]
-                avg = sum(vals) / len(vals) if vals else 0
-                text += f"• *{q}*: average {avg:.1f}/5\n"
+                avg = star_average(poll, idx)
+                yield f"• *{q}*: average {avg:.1f}/5\n"
             else:
-                text += f"\n*{q}*\n"
-                for resp in poll_data["feedback_responses"]:
-                    text += f"    • {resp['answers'][idx]}\n"
+                yield f"\n*{q}*\n"
+                for resp in poll["feedback_responses"]:
+                    yield f"    • {resp['answers'][idx]}\n"
     else:
-        for resp in poll_data["feedback_responses"]:
-            text += f"\n— <@{resp['user']}>'s answers:\n"
-            for idx, (q, a) in enumerate(zip(poll_data["feedback_questions"], resp["answers"])):
+        for resp in poll["feedback_responses"]:
+            yield f"\n— <@{resp['user']}>'s answers:\n"
+            for idx, (q, a) in enumerate(zip(poll["feedback_questions"], resp["answers"])):
                 kind = q_types[idx]
-                fmt = poll_data.get("feedback_formats", ["paragraph"])[idx]
+                fmt = formats[idx]
                 if kind == "vote":
                     opts = q_opts_all[idx] if q_opts_all and idx < len(q_opts_all) else None
                     if opts:
@@ -1245,29 +1811,96 @@ def _non_vote_results_text():
                             sel = ", ".join(opts[int(x)] for x in a)
                         else:
                             sel = opts[int(a)]
-                        text += f"    • *{q}*: {sel}\n"
                     else:
-                        if isinstance(a, list):
-                            sel = ", ".join(a)
-                        else:
-                            sel = a
-                        text += f"    • *{q}*: {sel}\n"
+                        sel = ", ".join(a) if isinstance(a, list) else a
+                    yield f"    • *{q}*: {sel}\n"
                 elif fmt == "stars":
-                    text += f"    • *{q}*: {a}/5\n"
+                    yield f"    • *{q}*: {a}/5\n"
                 else:
-                    text += f"    • *{q}*: {a}\n"
-    return text
+                    yield f"    • *{q}*: {a}\n"
+
+
+# Slack truncates message text past 40,000 characters and recommends keeping
+# it under 4,000; messages carry at most 50 blocks.
+RESULTS_CHUNK_CHARS = 3500
+RESULTS_CHUNK_BLOCKS = 50
+
+
+def pack_text(fragments, limit=RESULTS_CHUNK_CHARS):
+    """Join `fragments` into strings of at most `limit` characters.
+
+    Chunks break between fragments where possible; a single fragment longer
+    than `limit` is split across chunks.
+    """
+    buf, size = [], 0
+    for frag in fragments:
+        while size + len(frag) > limit:
+            if buf:
+                yield "".join(buf)
+                buf, size = [], 0
+            else:
+                yield frag[:limit]
+                frag = frag[limit:]
+        if frag:
+            buf.append(frag)
+            size += len(frag)
+    if buf:
+        yield "".join(buf)
+
+
+def pack_blocks(blocks, limit=RESULTS_CHUNK_BLOCKS):
+    """Split `blocks` into lists of at most `limit` blocks."""
+    for start in range(0, len(blocks), limit):
+        yield blocks[start:start + limit]
+
+
+def post_pages(client, channel, pages, user=None, key="text"):
+    """Deliver report `pages` in order, without waiting for Slack.
+
+    With `user` each page is an ephemeral message; otherwise the first page is
+    posted to the channel and the rest follow as replies in its thread. Each
+    page is queued on the dispatcher once the one before it was sent, so no
+    listener thread waits on the pacer. Delivery stops at a page that failed.
+    """
+    pages = iter(pages)
+
+    def send(n, thread_ts, future=None):
+        # `future` holds page n's response; loops while calls complete inline
+        while True:
+            if future is not None:
+                if future.exception() is not None:
+                    return  # logged by the dispatcher
+                if n == 0 and user is None:
+                    thread_ts = (future.result() or {}).get("ts")
+                n += 1
+            page = next(pages, None)
+            if page is None:
+                return
+            if user is not None:
+                future = dispatcher.submit(client, "chat_postEphemeral", channel=channel, user=user, **{key: page})
+            else:
+                kwargs = {key: page}
+                if n and thread_ts:
+                    kwargs["thread_ts"] = thread_ts
+                future = dispatcher.submit(client, "chat_postMessage", channel=channel, **kwargs)
+            if not future.done():
+                future.add_done_callback(functools.partial(send, n, thread_ts))
+                return
+
+    send(0, None)
 
 # ─── /closepoll ──────────────────────────────────────────────────────────────
-@app.command("/closepoll")
+@listener("command", "/closepoll")
 def close_poll(ack, body, client):
     ack()
     usr = body["user_id"]
     ch = body["channel_id"]
+    poll = store.get_channel_poll(ch)
 
     # If no active poll, notify and exit
-    if not poll_data["active"]:
-        client.chat_postEphemeral(
+    if poll is None or not poll["active"]:
+        dispatcher.submit(
+            client, "chat_postEphemeral",
             channel=ch,
             user=usr,
             text="❗ No active poll to close."
@@ -1275,8 +1908,9 @@ def close_poll(ack, body, client):
         return
 
     # Only the creator can close the poll
-    if poll_data["creator_id"] != usr:
-        client.chat_postEphemeral(
+    if poll["creator_id"] != usr:
+        dispatcher.submit(
+            client, "chat_postEphemeral",
             channel=ch,
             user=usr,
             text="❌ Only the poll creator can close it."
@@ -1284,29 +1918,197 @@ def close_poll(ack, body, client):
         return
 
     # Mark poll as inactive
-    poll_data["active"] = False
+    if not store.close_poll(poll["poll_id"]):
+        return  # closed automatically meanwhile, which posts the results
+    cancel_auto_close(poll["poll_id"])
+    # reload so votes recorded since the poll was read are in the report
+    post_closed_results(client, store.get_poll(poll["poll_id"]), closed_note(f"by <@{usr}>"),
+                        body.get("team_id"), body.get("team_domain"))
+
 
+def closed_note(how):
     from datetime import datetime
     timestamp = datetime.now().strftime("%B %d, %Y %I:%M %p EDT")
+    return f"_Closed {how} on {timestamp}_"
+
 
-    if poll_data.get("type") != "vote":
-        text = _non_vote_results_text()
-        text += f"\n_Closed by <@{usr}> on {timestamp}_"
-        client.chat_postMessage(channel=ch, text=text)
+def post_closed_results(client, poll, closed, team_id=None, team_domain=None):
+    """Post the final results of a poll that was just closed, ending with the
+    `closed` note."""
+    ch = poll["channel_id"]
+    if live_interval > 0:
+        push_live_update(poll["poll_id"], client)
+
+    if poll.get("type") != "vote":
+        pages = pack_text(itertools.chain(iter_results_text(poll), [f"\n{closed}"]))
+        first = list(itertools.islice(pages, 2))
+        if len(first) == 1 or not results_canvas:
+            post_pages(client, ch, itertools.chain(first, pages), key="text")
+            return
+    elif len(blocks := build_vote_results_blocks(poll, context=closed)) <= RESULTS_CHUNK_BLOCKS or not results_canvas:
+        post_pages(client, ch, pack_blocks(blocks), key="blocks")
         return
 
-    context_text = f"_Closed by <@{usr}> on {timestamp}_"
-    blocks = build_vote_results_blocks(poll_data, context=context_text)
-    client.chat_postMessage(channel=ch, blocks=blocks)
+    # too long for one message: publish everything to a canvas instead
+    run_in_background(publish_results_canvas, client, poll, closed, team_id, team_domain)
+
+
+# Reports longer than one message are published to a canvas on /closepoll;
+# RESULTS_CANVAS=0 posts them as threaded messages instead.
+results_canvas = os.getenv("RESULTS_CANVAS", "1") != "0"
+
+def publish_results_canvas(client, poll, closed, team_id=None, team_domain=None):
+    """Create a canvas with the complete results of `poll` and post a summary
+    linking to it, or the chat report if the canvas cannot be created."""
+    ch = poll["channel_id"]
+    markdown = "".join(iter_results_markdown(poll, closed))
+    canvas_id = upload_results_canvas(client, ch, markdown, title=f"Results: {poll['question']}")
+    if canvas_id is None:
+        if poll.get("type") == "vote":
+            post_pages(client, ch, pack_blocks(build_vote_results_blocks(poll, context=closed)), key="blocks")
+        else:
+            pages = pack_text(itertools.chain(iter_results_text(poll), [f"\n{closed}"]))
+            post_pages(client, ch, pages, key="text")
+        return
+
+    link = canvas_permalink(canvas_id, team_id, team_domain)
+    where = f"<{link}|in this canvas>" if link else "in a canvas in this channel"
+    if poll.get("type") == "vote":
+        blocks = build_vote_results_blocks({**poll, "anonymous": True})
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"📄 Every vote is {where}."}})
+        blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": closed}]})
+        dispatcher.call(client, "chat_postMessage", channel=ch, blocks=blocks)
+    else:
+        text = (f"*✏️ Feedback for:* {poll['question']}\n"
+                f"📄 All {len(poll['feedback_responses'])} responses are {where}.\n{closed}")
+        dispatcher.call(client, "chat_postMessage", channel=ch, text=text)
+
+# ─── /pollexport ─────────────────────────────────────────────────────────────
+@listener("command", "/pollexport")
+def export_poll(ack, body, client):
+    ack()
+    usr = body["user_id"]
+    ch = body["channel_id"]
+    fmt = (body.get("text") or "csv").strip().lower()
+    poll = store.get_channel_poll(ch)
+
+    if poll is None:
+        dispatcher.submit(client, "chat_postEphemeral", channel=ch, user=usr,
+                          text="❗ No poll to export.")
+        return
+    if poll["creator_id"] != usr:
+        dispatcher.submit(client, "chat_postEphemeral", channel=ch, user=usr,
+                          text="❌ Only the poll creator can export it.")
+        return
+    if fmt not in EXPORT_FORMATS:
+        dispatcher.submit(client, "chat_postEphemeral", channel=ch, user=usr,
+                          text="Usage: `/pollexport csv` or `/pollexport jsonl`")
+        return
+
+    # spooling and uploading a large survey takes a while, so it runs after
+    # the listener returns
+    run_in_background(send_export, client, poll, fmt, usr, ch)
+
+
+def send_export(client, poll, fmt, user, channel):
+    """Upload the export of `poll` to `user`'s DM, not the channel the poll
+    ran in. If that fails, tell them in `channel`."""
+    try:
+        im = dispatcher.call(client, "conversations_open", users=user)
+        upload_file(dispatcher.call, client, iter_export(poll, fmt), export_filename(poll, fmt),
+                    im["channel"]["id"], comment=f"Results of *{poll['question']}*")
+    except Exception as e:
+        print(f"Error exporting poll {poll['poll_id']}: {e}")
+        dispatcher.submit(client, "chat_postEphemeral", channel=channel, user=user,
+                          text="❌ The export could not be sent. Please try again.")
 
 # ─── Routes ───────────────────────────────────────────────────────────────────
+events_seconds = metrics.histogram(
+    "slack_events_request_seconds",
+    "Time to answer POST /slack/events, which lasts until the listener's ack().")
+
 @flask_app.route("/slack/events", methods=["POST"])
 def slack_events():
-    return handler.handle(request)
+    start = time.perf_counter()
+    try:
+        return handler.handle(request)
+    finally:
+        events_seconds.observe(time.perf_counter() - start)
+
+@flask_app.route("/stats", methods=["GET"])
+def stats():
+    return {
+        "dispatcher": dispatcher.stats(),
+        "results_cache": results_cache.stats(),
+        "view_updates": view_updates.stats(),
+        "handled_requests": handled_requests.stats(),
+        "store_restore": getattr(store, "restore_stats", None),
+        "startup": startup.report(),
+    }
+
+@flask_app.route("/metrics", methods=["GET"])
+def export_metrics():
+    return metrics.render(), 200, {"Content-Type": metrics.content_type}
+
+def profile_report(authorization):
+    """Return the `/profiles` response for an `Authorization` header."""
+    if profiler is None or not profiler.authorized(authorization):
+        return "Not found", 404, {}
+    return profiler.summary(), 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+@flask_app.route("/profiles", methods=["GET"])
+def profile_reports():
+    return profile_report(request.headers.get("Authorization"))
+
+# GET /polls/<poll_id>/export?format=csv|jsonl with `Authorization: Bearer
+# <EXPORT_TOKEN>` downloads a poll's ballots or responses. Rows are streamed
+# in chunks of about EXPORT_CHUNK_CHARS as they are generated.
+export_token = os.getenv("EXPORT_TOKEN")
+EXPORT_CHUNK_CHARS = 64 * 1024
+
+def export_download(poll_id, fmt, authorization):
+    """Return the export response: an iterator of text chunks, the status and
+    the headers, or "Not found" when the token, poll or format is wrong."""
+    if not authorized(export_token, authorization):
+        return "Not found", 404, {}
+    poll = store.get_poll(poll_id)
+    if poll is None or fmt not in EXPORT_FORMATS:
+        return "Not found", 404, {}
+    return pack_text(iter_export(poll, fmt), EXPORT_CHUNK_CHARS), 200, {
+        "Content-Type": EXPORT_FORMATS[fmt],
+        "Content-Disposition": f'attachment; filename="{export_filename(poll, fmt)}"',
+    }
+
+@flask_app.route("/polls/<poll_id>/export", methods=["GET"])
+def download_export(poll_id):
+    return export_download(poll_id, request.args.get("format", "csv"),
+                           request.headers.get("Authorization"))
 
 @flask_app.route("/", methods=["GET"])
 def index():
     return "✅ HFC Slack Bot is running."
 
+def verify_token():
+    """Make the auth.test call FAST_START skipped, reporting a bad token and
+    recording the bot's ids for `authorize`."""
+    start = time.perf_counter()
+    try:
+        result = app.client.auth_test(token=token)
+    except Exception as e:
+        print(f"Error verifying SLACK_BOT_TOKEN: {e}")
+        return
+    bot_identity.update(bot_user_id=result.get("user_id"), bot_id=result.get("bot_id"))
+    startup.background["auth.test"] = time.perf_counter() - start
+
+# re-arm the deadlines of polls restored from the store
+for poll_id, close_at in store.pending_deadlines():
+    schedule_auto_close(poll_id, close_at)
+
+startup.mark("listeners")
+if fast_start:
+    threading.Thread(target=verify_token, name="verify-token", daemon=True).start()
+startup.done()
+print(startup)
+
 if __name__ == "__main__":
     flask_app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 3000)))
@@ -0,0 +1,135 @@
+"""Opt-in profiling of Bolt listeners, controlled by environment variables.
+
+    PROFILE_LISTENERS  comma-separated listener names, or "all"; unset disables
+    PROFILE_MODE       "cpu" (cProfile), "memory" (tracemalloc) or "cpu,memory"
+    PROFILE_DIR        where reports are written, default "profiles"
+    PROFILE_MIN_MS     only keep calls slower than this, default 0
+    PROFILE_EVERY      profile one call in N per listener, default 1
+    PROFILE_TOP        rows in each text report, default 25
+    PROFILE_TOKEN      bearer token for GET /profiles; unset disables the route
+
+Each kept call writes `<listener>.<time>.txt` with the slowest functions by
+cumulative time and the lines that allocated the most, and, in cpu mode,
+`<listener>.<time>.prof` for pstats or snakeviz.
+"""
+import cProfile
+import functools
+import hmac
+import io
+import itertools
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+
+class ListenerProfiler:
+    """Wrap listeners so their calls are profiled and reported to `directory`."""
+
+    def __init__(self, directory, listeners=("all",), cpu=True, memory=False,
+                 min_seconds=0.0, every=1, top=25, token=None):
+        self.directory = directory
+        self.listeners = set(listeners)
+        self.cpu = cpu
+        self.memory = memory
+        self.min_seconds = min_seconds
+        self.every = max(1, every)
+        self.top = top
+        self.token = token
+        self.latest = {}
+        self._lock = threading.Lock()
+        # cProfile can only be active once at a time on Python 3.12+, so
+        # calls that overlap a profiled one run without the CPU profiler
+        self._cpu_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+
+    def wants(self, name):
+        return "all" in self.listeners or name in self.listeners
+
+    def wrap(self, func):
+        """Return `func` profiled on every `every`-th call, or `func` itself."""
+        name = func.__name__
+        if not self.wants(name):
+            return func
+        calls = itertools.count()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if next(calls) % self.every:
+                return func(*args, **kwargs)
+            return self._profile(name, func, args, kwargs)
+        return wrapper
+
+    def _profile(self, name, func, args, kwargs):
+        profile = None
+        if self.cpu and self._cpu_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+        before = tracemalloc.take_snapshot() if self.memory else None
+        start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._cpu_lock.release()
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.min_seconds and (profile is not None or before is not None):
+                after = tracemalloc.take_snapshot() if self.memory else None
+                self._report(name, elapsed, profile, before, after)
+
+    def _report(self, name, elapsed, profile, before, after):
+        lines = [f"{name}: {elapsed * 1e3:.1f} ms", ""]
+        if profile is not None:
+            out = io.StringIO()
+            pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(self.top)
+            lines += ["Slowest functions by cumulative time:", out.getvalue()]
+        if after is not None:
+            lines.append(f"Largest allocations (top {self.top} lines):")
+            for stat in after.compare_to(before, "lineno")[:self.top]:
+                lines.append(f"  {stat}")
+        text = "\n".join(lines) + "\n"
+
+        path = os.path.join(self.directory, f"{name}.{time.time_ns()}")
+        with open(path + ".txt", "w") as f:
+            f.write(text)
+        if profile is not None:
+            profile.dump_stats(path + ".prof")
+        with self._lock:
+            self.latest[name] = text
+
+    def authorized(self, header):
+        """Return True if `header` is `Bearer <PROFILE_TOKEN>`."""
+        if not self.token or not header:
+            return False
+        return hmac.compare_digest(header, f"Bearer {self.token}")
+
+    def summary(self):
+        """Return the latest report of every profiled listener."""
+        with self._lock:
+            reports = sorted(self.latest.items())
+        if not reports:
+            return "No profiled calls yet.\n"
+        return "\n".join(text for _, text in reports)
+
+
+def profiler_from_env():
+    """Return a ListenerProfiler configured by PROFILE_*, or None if unset."""
+    listeners = os.getenv("PROFILE_LISTENERS")
+    if not listeners:
+        return None
+    modes = {m.strip() for m in os.getenv("PROFILE_MODE", "cpu").split(",")}
+    return ListenerProfiler(
+        directory=os.getenv("PROFILE_DIR", "profiles"),
+        listeners=[name.strip() for name in listeners.split(",")],
+        cpu="cpu" in modes,
+        memory="memory" in modes,
+        min_seconds=float(os.getenv("PROFILE_MIN_MS", "0")) / 1000,
+        every=int(os.getenv("PROFILE_EVERY", "1")),
+        top=int(os.getenv("PROFILE_TOP", "25")),
+        token=os.getenv("PROFILE_TOKEN"),
+    )
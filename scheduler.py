@@ -0,0 +1,79 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+
+
+class Timer:
+    """Handle for a scheduled callback."""
+
+    __slots__ = ("when", "func", "args", "cancelled")
+
+    def __init__(self, when, func, args):
+        self.when = when
+        self.func = func
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    """Run callbacks at `time.monotonic()` deadlines on one background thread.
+
+    Pending timers sit in a heap, so scheduling is O(log n) no matter how many
+    are waiting. Cancelled timers stay in the heap and are skipped when due.
+    Callbacks run one at a time on the scheduler thread and should hand slow
+    work (such as Slack API calls) to the dispatcher.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._pid = None
+
+    def _start(self):
+        """Start the scheduler thread once per process (again after a fork)."""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="scheduler", daemon=True).start()
+
+    def call_at(self, when, func, *args):
+        """Run `func(*args)` once `time.monotonic()` reaches `when`."""
+        timer = Timer(when, func, args)
+        with self._cond:
+            self._start()
+            heapq.heappush(self._heap, (when, next(self._seq), timer))
+            if self._heap[0][2] is timer:
+                self._cond.notify()
+        return timer
+
+    def call_later(self, delay, func, *args):
+        """Run `func(*args)` after `delay` seconds."""
+        return self.call_at(time.monotonic() + delay, func, *args)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                _, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+            try:
+                timer.func(*timer.args)
+            except Exception as e:
+                print(f"Error in scheduled {getattr(timer.func, '__name__', timer.func)}: {e}")
@@ -0,0 +1,61 @@
+"""Startup timing: how long each phase of loading the app took."""
+import os
+import time
+
+
+def process_age():
+    """Return seconds since this process started, or None where /proc is missing.
+
+    A gunicorn worker is forked before it imports the app, so this covers the
+    worker's imports too.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # the command name may contain spaces; fields resume after ")"
+            started = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    return max(0.0, uptime - started / os.sysconf("SC_CLK_TCK"))
+
+
+class StartupTimer:
+    """Record the duration of each named startup phase.
+
+    The first phase runs from process start (or from creating the timer, if
+    that is unknown), so it includes the interpreter and module imports.
+    Work moved off the startup path is recorded with `background`.
+    """
+
+    def __init__(self):
+        now = time.perf_counter()
+        self.start = now - (process_age() or 0.0)
+        self._last = now if self.start == now else self.start
+        self.phases = {}
+        self.background = {}
+        self.ready = None
+
+    def mark(self, phase):
+        """End `phase` now; the next phase starts here."""
+        now = time.perf_counter()
+        self.phases[phase] = now - self._last
+        self._last = now
+
+    def done(self):
+        """Mark the app as ready to serve requests."""
+        self.ready = time.perf_counter() - self.start
+
+    def report(self):
+        """Return the phase durations in milliseconds, for /stats."""
+        ms = lambda seconds: round(seconds * 1e3, 1)
+        return {
+            "phases_ms": {phase: ms(s) for phase, s in self.phases.items()},
+            "background_ms": {task: ms(s) for task, s in self.background.items()},
+            "ready_ms": ms(self.ready) if self.ready is not None else None,
+        }
+
+    def __str__(self):
+        phases = ", ".join(f"{phase} {s * 1e3:.0f} ms" for phase, s in self.phases.items())
+        ready = f"{self.ready * 1e3:.0f} ms" if self.ready is not None else "not yet"
+        return f"Ready in {ready}: {phases}"
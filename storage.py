@@ -0,0 +1,866 @@
+import copy
+import itertools
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from collections import OrderedDict
+
+from tallies import Ballots, Tally
+
+# Poll creation drafts, the answers given so far in the /poll modals, are
+# kept for this long after their last step, so only a short id has to travel
+# in the modal's private_metadata.
+DRAFT_TTL = 6 * 3600
+
+
+def new_poll_data(**fields):
+    """Return a fresh poll state dict with `fields` applied over the defaults."""
+    data = {
+        "poll_id": None,
+        "message_ts": None,
+        "type": None,
+        "question": None,
+        "options": [],
+        "feedback_questions": [],
+        "feedback_formats": [],
+        "feedback_kinds": [],
+        "question_options": [],
+        "vote_tallies": [],
+        "votes": {},
+        "tallies": {},
+        "feedback_responses": [],
+        "aggregates": [],
+        "creator_id": None,
+        "channel_id": None,
+        "anonymous": True,
+        "multi": False,
+        "multi_questions": [],
+        "active": False,
+        # auto-close: epoch seconds of the deadline, and responses needed
+        "close_at": None,
+        "quorum": None,
+        "version": 0,
+    }
+    data.update(fields)
+    data["tallies"] = Tally.of(data["tallies"])
+    data["vote_tallies"] = [Tally.of(vt) for vt in data["vote_tallies"]]
+    data["votes"] = Ballots.of(data["votes"], multi=data["multi"])
+    return data
+
+
+def feedback_choices(data, answers):
+    """Yield `(question index, choice)` for every vote answer in `answers`.
+
+    Choices are option indices for questions with custom options and the raw
+    "yes"/"no" values otherwise, matching the keys of `data["vote_tallies"]`.
+    """
+    kinds = data.get("feedback_kinds") or []
+    for i, ans in enumerate(answers):
+        if i >= len(kinds) or kinds[i] != "vote":
+            continue
+        for choice in (ans if isinstance(ans, list) else [ans]):
+            yield i, choice
+
+
+def new_aggregate():
+    """Return an empty running aggregate for one star-rated question."""
+    return {"count": 0, "sum": 0, "stars": [0, 0, 0, 0, 0]}
+
+
+def star_ratings(data, answers):
+    """Yield `(question index, stars)` for every star rating in `answers`."""
+    kinds = data.get("feedback_kinds") or []
+    formats = data.get("feedback_formats") or []
+    for i, ans in enumerate(answers):
+        if i < len(kinds) and kinds[i] == "vote":
+            continue
+        if i >= len(formats) or formats[i] != "stars":
+            continue
+        try:
+            stars = int(ans)
+        except (TypeError, ValueError):
+            continue
+        if 1 <= stars <= 5:
+            yield i, stars
+
+
+def dump_poll(data):
+    """Return a poll as plain JSON-serialisable values."""
+    record = dict(data)
+    record["tallies"] = list(data["tallies"].items())
+    record["vote_tallies"] = [list(vt.items()) for vt in data["vote_tallies"]]
+    record["votes"] = data["votes"].dump()
+    return record
+
+
+def load_poll(record):
+    """Rebuild a poll from the output of `dump_poll`."""
+    record = dict(record)
+    names, masks = record.pop("votes")
+    record["tallies"] = dict(record["tallies"])
+    record["vote_tallies"] = [dict(vt) for vt in record["vote_tallies"]]
+    data = new_poll_data(**record)
+    data["votes"] = Ballots.load(names, masks, multi=data["multi"])
+    return data
+
+
+# ─── In-memory backend ────────────────────────────────────────────────────────
+class MemoryStore:
+    """Keep polls in process memory. State is lost on restart and is not
+    shared between gunicorn workers.
+
+    Mutations take one of `lock_stripes` locks chosen by poll id, so the
+    check-then-set in `record_vote` stays atomic under threaded or gevent
+    workers while different polls rarely contend for the same lock.
+    """
+
+    def __init__(self, lock_stripes=64, max_drafts=10000):
+        # poll_id -> poll state; channel_id -> poll_id of the latest poll there
+        self.polls = {}
+        self.channel_polls = {}
+        self._locks = [threading.Lock() for _ in range(lock_stripes)]
+        # draft_id -> (expiry, draft), least recently saved first
+        self.drafts = OrderedDict()
+        self.max_drafts = max_drafts
+        self._drafts_lock = threading.Lock()
+
+    def _lock(self, poll_id):
+        return self._locks[hash(poll_id) % len(self._locks)]
+
+    def add_poll(self, data):
+        """Store a new poll, assigning it an id, and return it."""
+        if not data.get("poll_id"):
+            data["poll_id"] = uuid.uuid4().hex
+        if len(data.get("aggregates") or []) != len(data["feedback_questions"]):
+            data["aggregates"] = [new_aggregate() for _ in data["feedback_questions"]]
+        with self._lock(data["poll_id"]):
+            self.polls[data["poll_id"]] = data
+            self.channel_polls[data["channel_id"]] = data["poll_id"]
+            self._log("poll", data["poll_id"], data)
+        return data
+
+    def get_poll(self, poll_id):
+        """Return the poll stored under `poll_id`, or None."""
+        if not poll_id:
+            return None
+        return self.polls.get(poll_id)
+
+    def get_poll_counts(self, poll_id):
+        """Return the poll's settings, state and tallies, or None. Its
+        individual votes and responses may be left out."""
+        return self.polls.get(poll_id) if poll_id else None
+
+    def get_channel_poll(self, channel_id):
+        """Return the poll most recently posted in `channel_id`, or None."""
+        return self.get_poll(self.channel_polls.get(channel_id))
+
+    def channel_poll_version(self, channel_id):
+        """Return `(poll_id, active, version)` of the poll most recently
+        posted in `channel_id`, or None."""
+        poll = self.polls.get(self.channel_polls.get(channel_id))
+        return None if poll is None else (poll["poll_id"], poll["active"], poll["version"])
+
+    def set_message_ts(self, poll_id, ts):
+        with self._lock(poll_id):
+            self.polls[poll_id]["message_ts"] = ts
+            self._log("ts", poll_id, ts)
+
+    def close_poll(self, poll_id):
+        """Close the poll. Returns False if it was already closed."""
+        with self._lock(poll_id):
+            poll = self.polls[poll_id]
+            if not poll["active"]:
+                return False
+            poll["active"] = False
+            poll["version"] += 1
+            self._log("close", poll_id)
+        return True
+
+    def pending_deadlines(self):
+        """Return `(poll_id, close_at)` for every open poll with a deadline."""
+        return [(p["poll_id"], p["close_at"]) for p in list(self.polls.values())
+                if p["active"] and p.get("close_at")]
+
+    def _log(self, op, poll_id, *args):
+        """Called with the poll's lock held after every change; see
+        JournaledStore."""
+
+    def record_vote(self, data, user, choice):
+        """Record `user`'s vote for option `choice`.
+
+        Returns the poll's number of voters, or False when the vote is a
+        duplicate or the poll is closed and nothing was recorded.
+        """
+        poll = self.polls[data["poll_id"]]
+        with self._lock(poll["poll_id"]):
+            if not poll["active"]:
+                return False
+            if not poll["votes"].add(user, choice, poll.get("multi")):
+                return False
+            poll["tallies"].add(choice)
+            poll["version"] += 1
+            self._log("vote", poll["poll_id"], user, choice)
+            return len(poll["votes"])
+
+    def record_feedback(self, data, user, answers):
+        """Record one feedback submission and update its tallies and
+        star aggregates. Returns the poll's number of responses, or False
+        when the poll is closed and nothing was recorded."""
+        poll = self.polls[data["poll_id"]]
+        with self._lock(poll["poll_id"]):
+            if not poll["active"]:
+                return False
+            vt = poll["vote_tallies"]
+            for i, choice in feedback_choices(poll, answers):
+                if i < len(vt):
+                    vt[i].add(choice)
+            aggs = poll["aggregates"]
+            for i, stars in star_ratings(poll, answers):
+                agg = aggs[i]
+                agg["count"] += 1
+                agg["sum"] += stars
+                agg["stars"][stars - 1] += 1
+            poll["feedback_responses"].append({"user": user, "answers": answers})
+            poll["version"] += 1
+            self._log("feedback", poll["poll_id"], user, answers)
+            return len(poll["feedback_responses"])
+
+    def save_draft(self, draft):
+        """Store a poll creation draft, assigning it an id, and return the id.
+
+        Drafts are not journaled: one lost in a restart has to be started
+        again with /poll.
+        """
+        if not draft.get("draft_id"):
+            draft["draft_id"] = secrets.token_urlsafe(9)
+        with self._drafts_lock:
+            self._put_draft(copy.deepcopy(draft))
+        return draft["draft_id"]
+
+    def _put_draft(self, draft):
+        now = time.monotonic()
+        # every save moves the draft to the back, so the front expires first
+        self.drafts.pop(draft["draft_id"], None)
+        self.drafts[draft["draft_id"]] = (now + DRAFT_TTL, draft)
+        while self.drafts and (len(self.drafts) > self.max_drafts
+                               or next(iter(self.drafts.values()))[0] <= now):
+            self.drafts.popitem(last=False)
+
+    def get_draft(self, draft_id):
+        """Return a copy of the draft saved under `draft_id`, or None if it
+        expired."""
+        entry = self.drafts.get(draft_id)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return copy.deepcopy(entry[1])
+
+    def update_draft(self, draft_id, change):
+        """Apply `change(draft)` to the draft saved under `draft_id` and save
+        it, atomically. Returns a copy of the result, or None if it expired."""
+        with self._drafts_lock:
+            entry = self.drafts.get(draft_id)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            draft = copy.deepcopy(entry[1])
+            change(draft)
+            self._put_draft(draft)
+            return copy.deepcopy(draft)
+
+    def delete_draft(self, draft_id):
+        with self._drafts_lock:
+            self.drafts.pop(draft_id, None)
+
+    def stats(self):
+        """Return how many polls, votes and feedback responses are held."""
+        polls = list(self.polls.values())
+        return {
+            "polls": len(polls),
+            "active_polls": sum(1 for p in polls if p["active"]),
+            "votes": sum(p["tallies"].total() for p in polls),
+            "responses": sum(len(p["feedback_responses"]) for p in polls),
+        }
+
+
+# ─── Snapshot + journal backend ───────────────────────────────────────────────
+# The journal is one JSON array per line: [seq, op, poll_id, *args]. Every poll
+# remembers the seq of the last change applied to it, and a snapshot saves
+# that alongside the poll, so replay skips journal lines a snapshot already
+# holds. Journal files are numbered by generation. Taking a snapshot starts a
+# new generation first, so once the snapshot is on disk the older files only
+# hold changes it already includes and can be deleted.
+_SNAPSHOT = "snapshot.json"
+_JOURNAL = "journal.{}.log"
+
+
+class JournaledStore(MemoryStore):
+    """Keep polls in memory, as MemoryStore does, and make them survive restarts.
+
+    Each change is appended to a journal in `directory`. A background thread
+    writes and fsyncs the journal every `fsync_interval` seconds, so a crash
+    loses at most that much. Every `snapshot_interval` seconds all polls are
+    written to a snapshot and the journal is restarted. On startup the
+    snapshot is loaded and only the journal written since is replayed;
+    `restore_stats` records how long that took.
+    """
+
+    def __init__(self, directory, fsync_interval=0.05, snapshot_interval=300, lock_stripes=64):
+        super().__init__(lock_stripes)
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.snapshot_interval = snapshot_interval
+        self._seqs = {}
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._file = None
+        self._stop = threading.Event()
+        os.makedirs(directory, exist_ok=True)
+        self._dir_lock = _lock_directory(directory)
+        self.restore_stats = self._restore()
+        self._seq = itertools.count(self.restore_stats["seq"] + 1)
+        self._snapshot_seq = self._last_seq = self.restore_stats["seq"]
+        self._generation = self.restore_stats["generation"] + 1
+        self._file = open(self._journal_path(self._generation), "ab")
+        threading.Thread(target=self._run, name="poll-journal", daemon=True).start()
+
+    def _journal_path(self, generation):
+        return os.path.join(self.directory, _JOURNAL.format(generation))
+
+    def _journals(self):
+        """Return `(generation, path)` for every journal file, oldest first."""
+        found = []
+        for name in os.listdir(self.directory):
+            prefix, _, rest = name.partition(".")
+            generation, _, suffix = rest.partition(".")
+            if prefix == "journal" and suffix == "log" and generation.isdigit():
+                found.append((int(generation), os.path.join(self.directory, name)))
+        return sorted(found)
+
+    def _restore(self):
+        start = time.perf_counter()
+        snapshot = {"generation": 0, "seq": 0, "polls": []}
+        path = os.path.join(self.directory, _SNAPSHOT)
+        if os.path.exists(path):
+            with open(path) as f:
+                snapshot = json.load(f)
+        for seq, record in snapshot["polls"]:
+            data = load_poll(record)
+            self.polls[data["poll_id"]] = data
+            self.channel_polls[data["channel_id"]] = data["poll_id"]
+            self._seqs[data["poll_id"]] = seq
+        first = generation = snapshot["generation"]
+        last = snapshot["seq"]
+        loaded = time.perf_counter()
+
+        replayed = 0
+        for gen, path in self._journals():
+            generation = max(generation, gen)
+            if gen < first:
+                continue
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        seq, op, poll_id, *args = json.loads(line)
+                    except ValueError:
+                        break  # torn write at the end of the file
+                    last = max(last, seq)
+                    if self._replay(seq, op, poll_id, args):
+                        replayed += 1
+        done = time.perf_counter()
+        stats = {
+            "polls": len(self.polls),
+            "snapshot_ms": round((loaded - start) * 1e3, 2),
+            "journal_entries": replayed,
+            "journal_ms": round((done - loaded) * 1e3, 2),
+            "seq": last,
+            "generation": generation,
+        }
+        if self.polls or replayed:
+            print(f"Restored {stats['polls']} polls: snapshot in {stats['snapshot_ms']} ms, "
+                  f"{replayed} journal entries in {stats['journal_ms']} ms")
+        return stats
+
+    def _replay(self, seq, op, poll_id, args):
+        """Apply one journal line unless the poll already includes it."""
+        if op == "poll":
+            if poll_id in self.polls:
+                return False
+            MemoryStore.add_poll(self, load_poll(args[0]))
+        elif seq <= self._seqs.get(poll_id, 0) or poll_id not in self.polls:
+            return False
+        elif op == "vote":
+            self.record_vote({"poll_id": poll_id}, *args)
+        elif op == "feedback":
+            self.record_feedback({"poll_id": poll_id}, *args)
+        elif op == "close":
+            self.close_poll(poll_id)
+        elif op == "ts":
+            self.set_message_ts(poll_id, *args)
+        else:
+            return False
+        self._seqs[poll_id] = seq
+        return True
+
+    def _log(self, op, poll_id, *args):
+        if self._file is None:  # replaying
+            return
+        if op == "poll":
+            args = (dump_poll(args[0]),)
+        seq = self._last_seq = next(self._seq)
+        self._seqs[poll_id] = seq
+        line = _encode([seq, op, poll_id, *args]).encode() + b"\n"
+        with self._pending_lock:
+            self._pending.append(line)
+
+    def flush(self):
+        """Write and fsync every change logged so far."""
+        with self._io_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            if pending:
+                self._file.write(b"".join(pending))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def snapshot(self):
+        """Write every poll to a new snapshot and drop the journal it replaces."""
+        with self._snapshot_lock:
+            self._snapshot()
+
+    def _snapshot(self):
+        with self._io_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            self._file.write(b"".join(pending))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._generation += 1
+            self._file = open(self._journal_path(self._generation), "ab")
+            generation = self._generation
+
+        # encode each poll while holding its lock: the lists in it keep growing
+        polls, seq = [], 0
+        for poll_id in list(self.polls):
+            with self._lock(poll_id):
+                poll_seq = self._seqs.get(poll_id, 0)
+                polls.append(f"[{poll_seq},{_encode(dump_poll(self.polls[poll_id]))}]")
+            seq = max(seq, poll_seq)
+        path = os.path.join(self.directory, _SNAPSHOT)
+        with open(path + ".tmp", "w") as f:
+            f.write(f'{{"generation":{generation},"seq":{seq},"polls":[{",".join(polls)}]}}')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        _fsync_directory(self.directory)
+        for gen, old in self._journals():
+            if gen < generation:
+                os.remove(old)
+        self._snapshot_seq = seq
+
+    def _run(self):
+        next_snapshot = time.monotonic() + self.snapshot_interval
+        while not self._stop.wait(self.fsync_interval):
+            try:
+                self.flush()
+                if time.monotonic() >= next_snapshot:
+                    next_snapshot = time.monotonic() + self.snapshot_interval
+                    if self._last_seq > self._snapshot_seq:
+                        self.snapshot()
+            except Exception as e:
+                print(f"Error writing poll journal: {e}")
+
+    def close(self):
+        """Stop the flush thread and flush what is left."""
+        self._stop.set()
+        self.flush()
+        with self._io_lock:
+            self._file.close()
+        self._dir_lock.close()
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _lock_directory(directory):
+    """Take an exclusive lock on `directory` so that a second process (such as
+    another gunicorn worker) fails at startup instead of interleaving its
+    journal with ours."""
+    f = open(os.path.join(directory, "lock"), "w")
+    if fcntl is not None:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            raise RuntimeError(f"{directory} is in use by another process; "
+                               "POLL_STATE_DIR needs a single worker")
+    return f
+
+
+def _fsync_directory(directory):
+    """Make a rename in `directory` durable (a no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# ─── SQLite backend ───────────────────────────────────────────────────────────
+# Votes and feedback responses are append-only rows, so concurrent writers from
+# different worker processes never overwrite each other. Tallies are read with
+# GROUP BY queries served from the covering indexes below. The SQL text is kept
+# constant so sqlite3's per-connection statement cache reuses each prepared
+# statement instead of recompiling it on every call.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS polls (
+    poll_id    TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    active     INTEGER NOT NULL,
+    message_ts TEXT,
+    config     TEXT NOT NULL,
+    version    INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS polls_by_channel ON polls (channel_id);
+
+CREATE TABLE IF NOT EXISTS votes (
+    id      INTEGER PRIMARY KEY,
+    poll_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    choice  INTEGER NOT NULL,
+    UNIQUE (poll_id, user_id, choice)
+);
+CREATE INDEX IF NOT EXISTS votes_tally ON votes (poll_id, choice);
+
+CREATE TABLE IF NOT EXISTS responses (
+    id      INTEGER PRIMARY KEY,
+    poll_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    answers TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_poll ON responses (poll_id, id);
+
+CREATE TABLE IF NOT EXISTS response_choices (
+    response_id INTEGER NOT NULL,
+    poll_id     TEXT NOT NULL,
+    question    INTEGER NOT NULL,
+    choice      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS response_choices_tally
+    ON response_choices (poll_id, question, choice);
+
+CREATE TABLE IF NOT EXISTS star_counts (
+    poll_id  TEXT NOT NULL,
+    question INTEGER NOT NULL,
+    stars    INTEGER NOT NULL,
+    count    INTEGER NOT NULL,
+    PRIMARY KEY (poll_id, question, stars)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS drafts (
+    draft_id TEXT PRIMARY KEY,
+    draft    TEXT NOT NULL,
+    expires  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS drafts_by_expiry ON drafts (expires);
+"""
+
+_INSERT_POLL = (
+    "INSERT INTO polls (poll_id, channel_id, active, message_ts, config) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_SELECT_POLL = "SELECT active, message_ts, config, version FROM polls WHERE poll_id = ?"
+_SELECT_CHANNEL_POLL = (
+    "SELECT poll_id FROM polls WHERE channel_id = ? ORDER BY rowid DESC LIMIT 1"
+)
+_SELECT_CHANNEL_POLL_VERSION = (
+    "SELECT poll_id, active, version FROM polls WHERE channel_id = ? ORDER BY rowid DESC LIMIT 1"
+)
+_UPDATE_MESSAGE_TS = "UPDATE polls SET message_ts = ? WHERE poll_id = ?"
+_CLOSE_POLL = "UPDATE polls SET active = 0, version = version + 1 WHERE poll_id = ? AND active = 1"
+_SELECT_ACTIVE = "SELECT active FROM polls WHERE poll_id = ?"
+_SELECT_ACTIVE_CONFIGS = "SELECT poll_id, config FROM polls WHERE active = 1"
+_BUMP_VERSION = "UPDATE polls SET version = version + 1 WHERE poll_id = ?"
+_USER_HAS_VOTED = "SELECT 1 FROM votes WHERE poll_id = ? AND user_id = ? LIMIT 1"
+_INSERT_VOTE = "INSERT OR IGNORE INTO votes (poll_id, user_id, choice) VALUES (?, ?, ?)"
+_SELECT_VOTES = "SELECT user_id, choice FROM votes WHERE poll_id = ? ORDER BY id"
+_TALLY_VOTES = "SELECT choice, COUNT(*) FROM votes WHERE poll_id = ? GROUP BY choice"
+_INSERT_RESPONSE = "INSERT INTO responses (poll_id, user_id, answers) VALUES (?, ?, ?)"
+_INSERT_RESPONSE_CHOICE = (
+    "INSERT INTO response_choices (response_id, poll_id, question, choice) "
+    "VALUES (?, ?, ?, ?)"
+)
+_COUNT_STARS = (
+    "INSERT INTO star_counts (poll_id, question, stars, count) VALUES (?, ?, ?, 1) "
+    "ON CONFLICT (poll_id, question, stars) DO UPDATE SET count = count + 1"
+)
+_SELECT_STAR_COUNTS = "SELECT question, stars, count FROM star_counts WHERE poll_id = ?"
+_SELECT_RESPONSES = "SELECT user_id, answers FROM responses WHERE poll_id = ? ORDER BY id"
+_COUNT_POLL_RESPONSES = "SELECT COUNT(*) FROM responses WHERE poll_id = ?"
+_COUNT_POLL_VOTERS = "SELECT COUNT(DISTINCT user_id) FROM votes WHERE poll_id = ?"
+_SAVE_DRAFT = "INSERT OR REPLACE INTO drafts (draft_id, draft, expires) VALUES (?, ?, ?)"
+_EXPIRE_DRAFTS = "DELETE FROM drafts WHERE expires <= ?"
+_SELECT_DRAFT = "SELECT draft FROM drafts WHERE draft_id = ? AND expires > ?"
+_DELETE_DRAFT = "DELETE FROM drafts WHERE draft_id = ?"
+_COUNT_POLLS = "SELECT COUNT(*), COALESCE(SUM(active), 0) FROM polls"
+_COUNT_VOTES = "SELECT COUNT(*) FROM votes"
+_COUNT_RESPONSES = "SELECT COUNT(*) FROM responses"
+_TALLY_RESPONSE_CHOICES = (
+    "SELECT question, choice, COUNT(*) FROM response_choices "
+    "WHERE poll_id = ? GROUP BY question, choice"
+)
+
+# Poll fields rebuilt from the votes/responses tables rather than stored in
+# the config blob.
+_DYNAMIC_FIELDS = ("votes", "tallies", "vote_tallies", "feedback_responses",
+                   "aggregates", "active", "message_ts", "version")
+
+
+
+def _is_active(conn, poll_id):
+    """Return whether the poll is open, read inside the caller's transaction."""
+    row = conn.execute(_SELECT_ACTIVE, (poll_id,)).fetchone()
+    return bool(row and row[0])
+
+
+class SQLiteStore:
+    """Keep polls in an SQLite database in WAL mode so every gunicorn worker
+    reads and writes the same state."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(polls)")}
+            if "version" not in columns:  # databases created before versioning
+                conn.execute("ALTER TABLE polls ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    def _conn(self):
+        """Return this thread's connection, reconnecting after a fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _write(self):
+        """Return a connection inside a write transaction.
+
+        BEGIN IMMEDIATE takes the database write lock up front, so the
+        check-then-insert in `record_vote` cannot interleave with another
+        worker doing the same.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def add_poll(self, data):
+        """Store a new poll, assigning it an id, and return it."""
+        if not data.get("poll_id"):
+            data["poll_id"] = uuid.uuid4().hex
+        config = {k: v for k, v in data.items() if k not in _DYNAMIC_FIELDS}
+        config["tally_keys"] = list(data.get("tallies", {}))
+        config["vote_tally_keys"] = [list(vt) for vt in data.get("vote_tallies", [])]
+        with self._write() as conn:
+            conn.execute(_INSERT_POLL, (
+                data["poll_id"], data["channel_id"], int(bool(data.get("active"))),
+                data.get("message_ts"), json.dumps(config),
+            ))
+        return data
+
+    def get_poll(self, poll_id):
+        """Return a snapshot of the poll stored under `poll_id`, or None."""
+        return self._load_poll(poll_id, rows=True)
+
+    def get_poll_counts(self, poll_id):
+        """Return a snapshot of the poll's settings, state and tallies, or
+        None. Its individual votes and responses are not read."""
+        return self._load_poll(poll_id, rows=False)
+
+    def _load_poll(self, poll_id, rows):
+        if not poll_id:
+            return None
+        conn = self._conn()
+        row = conn.execute(_SELECT_POLL, (poll_id,)).fetchone()
+        if row is None:
+            return None
+        active, message_ts, config, version = row
+        config = json.loads(config)
+        tally_keys = config.pop("tally_keys")
+        vote_tally_keys = config.pop("vote_tally_keys")
+        data = new_poll_data(**config)
+        data["active"] = bool(active)
+        data["message_ts"] = message_ts
+        data["version"] = version
+
+        data["tallies"] = Tally(tally_keys)
+        for choice, count in conn.execute(_TALLY_VOTES, (poll_id,)):
+            data["tallies"].add(choice, count)
+        if rows:
+            for user, choice in conn.execute(_SELECT_VOTES, (poll_id,)):
+                data["votes"].add(user, choice)
+
+        data["vote_tallies"] = [Tally(keys) for keys in vote_tally_keys]
+        for question, choice, count in conn.execute(_TALLY_RESPONSE_CHOICES, (poll_id,)):
+            if question < len(data["vote_tallies"]):
+                data["vote_tallies"][question].add(json.loads(choice), count)
+        if rows:
+            data["feedback_responses"] = [
+                {"user": user, "answers": json.loads(answers)}
+                for user, answers in conn.execute(_SELECT_RESPONSES, (poll_id,))
+            ]
+        data["aggregates"] = [new_aggregate() for _ in data["feedback_questions"]]
+        for question, stars, count in conn.execute(_SELECT_STAR_COUNTS, (poll_id,)):
+            agg = data["aggregates"][question]
+            agg["count"] += count
+            agg["sum"] += stars * count
+            agg["stars"][stars - 1] = count
+        return data
+
+    def get_channel_poll(self, channel_id):
+        """Return the poll most recently posted in `channel_id`, or None."""
+        row = self._conn().execute(_SELECT_CHANNEL_POLL, (channel_id,)).fetchone()
+        return self.get_poll(row[0]) if row else None
+
+    def channel_poll_version(self, channel_id):
+        """Return `(poll_id, active, version)` of the poll most recently
+        posted in `channel_id`, or None. Reads only its `polls` row."""
+        row = self._conn().execute(_SELECT_CHANNEL_POLL_VERSION, (channel_id,)).fetchone()
+        return None if row is None else (row[0], bool(row[1]), row[2])
+
+    def set_message_ts(self, poll_id, ts):
+        with self._write() as conn:
+            conn.execute(_UPDATE_MESSAGE_TS, (ts, poll_id))
+
+    def close_poll(self, poll_id):
+        """Close the poll. Returns False if it was already closed, so only one
+        worker acts on a close."""
+        with self._write() as conn:
+            return conn.execute(_CLOSE_POLL, (poll_id,)).rowcount == 1
+
+    def pending_deadlines(self):
+        """Return `(poll_id, close_at)` for every open poll with a deadline."""
+        rows = self._conn().execute(_SELECT_ACTIVE_CONFIGS).fetchall()
+        deadlines = [(poll_id, json.loads(config).get("close_at")) for poll_id, config in rows]
+        return [(poll_id, close_at) for poll_id, close_at in deadlines if close_at]
+
+    def record_vote(self, data, user, choice):
+        """Record `user`'s vote for option `choice`.
+
+        Returns the poll's number of voters, counted in the same transaction,
+        or False when the vote is a duplicate or the poll is closed and
+        nothing was recorded.
+        """
+        poll_id = data["poll_id"]
+        with self._write() as conn:
+            if not _is_active(conn, poll_id):
+                return False
+            if not data.get("multi"):
+                if conn.execute(_USER_HAS_VOTED, (poll_id, user)).fetchone():
+                    return False
+            cur = conn.execute(_INSERT_VOTE, (poll_id, user, choice))
+            if cur.rowcount != 1:
+                return False
+            conn.execute(_BUMP_VERSION, (poll_id,))
+            return conn.execute(_COUNT_POLL_VOTERS, (poll_id,)).fetchone()[0]
+
+    def record_feedback(self, data, user, answers):
+        """Record one feedback submission, its vote choices and star counts.
+        Returns the poll's number of responses, or False when the poll is
+        closed and nothing was recorded."""
+        poll_id = data["poll_id"]
+        with self._write() as conn:
+            if not _is_active(conn, poll_id):
+                return False
+            cur = conn.execute(_INSERT_RESPONSE, (poll_id, user, json.dumps(answers)))
+            conn.executemany(_INSERT_RESPONSE_CHOICE, [
+                (cur.lastrowid, poll_id, i, json.dumps(choice))
+                for i, choice in feedback_choices(data, answers)
+            ])
+            conn.executemany(_COUNT_STARS, [
+                (poll_id, i, stars) for i, stars in star_ratings(data, answers)
+            ])
+            conn.execute(_BUMP_VERSION, (poll_id,))
+            return conn.execute(_COUNT_POLL_RESPONSES, (poll_id,)).fetchone()[0]
+
+    def save_draft(self, draft):
+        """Store a poll creation draft, assigning it an id, and return the id.
+        Every worker sees it, whichever one handles the next modal step."""
+        if not draft.get("draft_id"):
+            draft["draft_id"] = secrets.token_urlsafe(9)
+        now = time.time()
+        with self._write() as conn:
+            conn.execute(_EXPIRE_DRAFTS, (now,))
+            conn.execute(_SAVE_DRAFT, (draft["draft_id"], json.dumps(draft), now + DRAFT_TTL))
+        return draft["draft_id"]
+
+    def get_draft(self, draft_id):
+        """Return the draft saved under `draft_id`, or None if it expired."""
+        row = self._conn().execute(_SELECT_DRAFT, (draft_id, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update_draft(self, draft_id, change):
+        """Apply `change(draft)` to the draft saved under `draft_id` and save
+        it, in one write transaction, so changes from two workers do not
+        overwrite each other. Returns the result, or None if it expired."""
+        now = time.time()
+        with self._write() as conn:
+            row = conn.execute(_SELECT_DRAFT, (draft_id, now)).fetchone()
+            if row is None:
+                return None
+            draft = json.loads(row[0])
+            change(draft)
+            conn.execute(_SAVE_DRAFT, (draft_id, json.dumps(draft), now + DRAFT_TTL))
+            return draft
+
+    def delete_draft(self, draft_id):
+        with self._write() as conn:
+            conn.execute(_DELETE_DRAFT, (draft_id,))
+
+    def stats(self):
+        """Return how many polls, votes and feedback responses are stored."""
+        conn = self._conn()
+        polls, active = conn.execute(_COUNT_POLLS).fetchone()
+        return {
+            "polls": polls,
+            "active_polls": active,
+            "votes": conn.execute(_COUNT_VOTES).fetchone()[0],
+            "responses": conn.execute(_COUNT_RESPONSES).fetchone()[0],
+        }
+
+
+def store_from_env():
+    """Return the store selected by `POLL_DB_PATH` or `POLL_STATE_DIR`,
+    defaulting to memory."""
+    path = os.getenv("POLL_DB_PATH")
+    if path:
+        return SQLiteStore(path)
+    directory = os.getenv("POLL_STATE_DIR")
+    if directory:
+        return JournaledStore(
+            directory,
+            fsync_interval=float(os.getenv("POLL_FSYNC_MS", "50")) / 1000,
+            snapshot_interval=float(os.getenv("POLL_SNAPSHOT_SECONDS", "300")),
+        )
+    return MemoryStore()
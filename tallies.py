@@ -0,0 +1,210 @@
+"""Compact, array-backed vote state for polls with very many voters.
+
+Each poll interns its voters' Slack user ids as dense ints from 0. Its ballots
+are one bitmask per interned id, so a voter costs a few bytes whether they
+picked one option or several, and counts live in plain arrays. Both types are
+read-only mappings, so they compare equal to the dicts they replace.
+"""
+import threading
+from array import array
+from collections.abc import Mapping
+
+# Ballot bitmasks are unsigned 32-bit ints: one bit per option.
+MAX_CHOICES = 32
+
+
+class UserIds:
+    """Map Slack user ids to dense ints and back."""
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        self._lock = threading.Lock()
+
+    def intern(self, user):
+        """Return the int for `user`, assigning the next free one if new."""
+        uid = self._ids.get(user)
+        if uid is None:
+            with self._lock:
+                uid = self._ids.get(user)
+                if uid is None:
+                    uid = len(self._names)
+                    self._names.append(user)
+                    self._ids[user] = uid
+        return uid
+
+    def get(self, user):
+        """Return the int for `user`, or None if it was never interned."""
+        return self._ids.get(user)
+
+    def __getitem__(self, uid):
+        return self._names[uid]
+
+    def names(self, uids):
+        """Return an iterator of the user ids for a sequence of ints."""
+        return map(self._names.__getitem__, uids)
+
+    def __len__(self):
+        return len(self._names)
+
+
+class Tally(Mapping):
+    """Counts per key (an option index, or "yes"/"no"), stored in an array.
+
+    Keys are fixed when the poll is created; `add` appends an unknown key
+    rather than dropping its count.
+    """
+
+    __slots__ = ("_keys", "_index", "counts")
+
+    def __init__(self, keys=()):
+        self._keys = list(keys)
+        self._index = {key: i for i, key in enumerate(self._keys)}
+        self.counts = array("Q", bytes(8 * len(self._keys)))
+
+    @classmethod
+    def of(cls, counts):
+        """Return `counts` (a dict or a Tally) as a Tally."""
+        if isinstance(counts, cls):
+            return counts
+        tally = cls(counts)
+        for key, n in counts.items():
+            tally.counts[tally._index[key]] = n
+        return tally
+
+    def add(self, key, n=1):
+        i = self._index.get(key)
+        if i is None:
+            i = len(self._keys)
+            self._keys.append(key)
+            self._index[key] = i
+            self.counts.append(0)
+        self.counts[i] += n
+
+    def total(self):
+        return sum(self.counts)
+
+    def __getitem__(self, key):
+        return self.counts[self._index[key]]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return f"Tally({dict(self)!r})"
+
+
+class Ballots(Mapping):
+    """Each voter's choices as a bitmask of option indices.
+
+    `masks` is indexed by interned user id (0 means no vote) and `order`
+    lists voters' ids in the order they first voted. Ids come from `users`,
+    a table of this poll's own voters unless one is given, so `masks` grows
+    with the poll rather than with every user the process has seen. As a
+    mapping it reads like the old `{user: choice}` dict, with a set of
+    choices per user for multi-select polls.
+    """
+
+    __slots__ = ("multi", "users", "masks", "order")
+
+    def __init__(self, multi=False, users=None):
+        self.multi = multi
+        self.users = UserIds() if users is None else users
+        self.masks = array("I")
+        self.order = array("I")
+
+    @classmethod
+    def of(cls, votes, multi=False, users=None):
+        """Return `votes` (a dict or Ballots) as Ballots."""
+        if isinstance(votes, cls):
+            return votes
+        ballots = cls(multi, users)
+        for user, choice in votes.items():
+            for c in (choice if isinstance(choice, (set, frozenset, list)) else [choice]):
+                ballots.add(user, c)
+        return ballots
+
+    def add(self, user, choice, multi=None):
+        """Record `user`'s vote for `choice`.
+
+        Returns False when it is a duplicate: the same option again, or any
+        second vote on a single-choice poll. `multi`, when given, is the
+        poll's current setting and replaces the one the ballots were built with.
+        """
+        if multi is not None:
+            self.multi = bool(multi)
+        if not 0 <= choice < MAX_CHOICES:
+            raise ValueError(f"choice {choice} out of range")
+        uid = self.users.intern(user)
+        masks = self.masks
+        if uid >= len(masks):
+            masks.frombytes(bytes(masks.itemsize * (uid + 1 - len(masks))))
+        mask = masks[uid]
+        bit = 1 << choice
+        if mask & bit or (mask and not self.multi):
+            return False
+        if not mask:
+            self.order.append(uid)
+        masks[uid] = mask | bit
+        return True
+
+    @classmethod
+    def load(cls, names, masks, multi=False, users=None):
+        """Rebuild ballots from the `(names, masks)` pair made by `dump`."""
+        ballots = cls(multi, users)
+        uids = [ballots.users.intern(name) for name in names]
+        if uids:
+            ballots.masks.frombytes(bytes(ballots.masks.itemsize * (max(uids) + 1)))
+        for uid, mask in zip(uids, masks):
+            ballots.masks[uid] = mask
+        ballots.order = array("I", uids)
+        return ballots
+
+    def dump(self):
+        """Return `(names, masks)`: voters in voting order and their bitmasks."""
+        order = self.order.tolist()
+        return list(self.users.names(order)), list(map(self.masks.__getitem__, order))
+
+    def voters(self):
+        """Return an iterator of `(user, mask)` for every voter, in voting order."""
+        order = self.order.tolist()
+        return zip(self.users.names(order), map(self.masks.__getitem__, order))
+
+    def _mask(self, user):
+        uid = self.users.get(user)
+        if uid is None or uid >= len(self.masks):
+            return 0
+        return self.masks[uid]
+
+    def __getitem__(self, user):
+        mask = self._mask(user)
+        if not mask:
+            raise KeyError(user)
+        if self.multi:
+            return set(choices(mask))
+        return mask.bit_length() - 1
+
+    def __contains__(self, user):
+        return bool(self._mask(user))
+
+    def __iter__(self):
+        return self.users.names(self.order.tolist())
+
+    def __len__(self):
+        return len(self.order)
+
+    def __repr__(self):
+        return f"Ballots({dict(self)!r})"
+
+
+def choices(mask):
+    """Yield the option indices set in a ballot bitmask, lowest first."""
+    i = 0
+    while mask:
+        if mask & 1:
+            yield i
+        mask >>= 1
+        i += 1
@@ -0,0 +1,120 @@
+import asyncio
+import importlib
+import os
+import sys
+import types
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from test_poll import DummyFlask, FakeApp, FakeHandler
+
+
+class FakeAsyncApp:
+    def __init__(self, *args, **kwargs):
+        self.listeners = {}
+
+    def _register(self, matcher):
+        def decorator(func):
+            self.listeners[getattr(matcher, 'pattern', matcher)] = func
+            return func
+        return decorator
+
+    command = action = view = _register
+
+    def web_app(self, path='/slack/events'):
+        return types.SimpleNamespace(router=types.SimpleNamespace(add_get=lambda *a: None))
+
+
+class AsyncSlackClient:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        async def call(**kwargs):
+            await asyncio.sleep(0)
+            self.calls.append((name, kwargs))
+            return {'ok': True, 'ts': '1.2', 'channel': {'id': 'D1'}}
+        return call
+
+
+@pytest.fixture
+def async_main(monkeypatch):
+    fake_adapter_flask = types.SimpleNamespace(SlackRequestHandler=lambda app: FakeHandler(app))
+    monkeypatch.setitem(sys.modules, 'flask', types.SimpleNamespace(Flask=DummyFlask, request=None))
+    monkeypatch.setitem(sys.modules, 'slack_bolt', types.SimpleNamespace(App=FakeApp))
+    monkeypatch.setitem(sys.modules, 'slack_bolt.adapter', types.SimpleNamespace(flask=fake_adapter_flask))
+    monkeypatch.setitem(sys.modules, 'slack_bolt.adapter.flask', fake_adapter_flask)
+    monkeypatch.setitem(sys.modules, 'slack_bolt.async_app', types.SimpleNamespace(AsyncApp=FakeAsyncApp))
+    monkeypatch.setitem(sys.modules, 'aiohttp', types.SimpleNamespace(web=types.SimpleNamespace()))
+    monkeypatch.setenv('SLACK_BOT_TOKEN', 'x')
+    monkeypatch.setenv('SLACK_SIGNING_SECRET', 'y')
+    monkeypatch.setenv('SLACK_API_WORKERS', '0')
+    monkeypatch.syspath_prepend(os.path.dirname(os.path.dirname(__file__)))
+
+    for name in ('main', 'async_main'):
+        sys.modules.pop(name, None)
+    return importlib.import_module('async_main')
+
+
+def test_async_app_registers_every_listener(async_main):
+    registered = async_main.async_app.listeners
+    expected = {getattr(m, 'pattern', m) for _, m, _ in async_main.main.LISTENERS}
+    assert set(registered) == expected
+    assert all(asyncio.iscoroutinefunction(f) for f in registered.values())
+
+
+def test_async_listeners_run_concurrently(async_main):
+    main = async_main.main
+    poll = main.store.add_poll(main.new_poll_data(
+        type='vote', question='Choose', options=['A', 'B'], tallies={0: 0, 1: 0},
+        creator_id='Ucreator', channel_id='C1', active=True))
+    vote = async_main.async_app.listeners[r'^vote_\d$']
+    client = AsyncSlackClient()
+    acks = []
+
+    async def ack(**kwargs):
+        acks.append(kwargs)
+
+    def args(n):
+        return types.SimpleNamespace(
+            ack=ack, client=client,
+            body={'channel': {'id': 'C1'}, 'user': {'id': f'U{n}'}},
+            action={'action_id': f'vote_{n % 2}', 'value': poll['poll_id']})
+
+    async def run():
+        await asyncio.gather(*(vote(args(n)) for n in range(200)))
+
+    asyncio.run(run())
+
+    assert len(acks) == 200
+    assert poll['tallies'] == {0: 100, 1: 100}
+    assert [name for name, _ in client.calls] == ['chat_postEphemeral'] * 200
+
+
+def test_admin_routes_are_served(async_main, monkeypatch):
+    main = async_main.main
+    poll = main.store.add_poll(main.new_poll_data(
+        type='vote', question='Choose', options=['A', 'B'], tallies={0: 0, 1: 0},
+        creator_id='Ucreator', channel_id='C1', active=True))
+    main.store.record_vote(poll, 'U1', 1)
+    monkeypatch.setattr(main, 'export_token', 'secret')
+    monkeypatch.setattr(async_main, 'web', web)
+    app = web.Application()
+    async_main.add_routes(app.router)
+
+    async def run():
+        async with TestClient(TestServer(app)) as http:
+            stats = await (await http.get('/stats')).json()
+            profiles = await http.get('/profiles')
+            denied = await http.get(f"/polls/{poll['poll_id']}/export")
+            export = await http.get(f"/polls/{poll['poll_id']}/export?format=csv",
+                                    headers={'Authorization': 'Bearer secret'})
+            return stats, profiles.status, denied.status, export.status, await export.text()
+
+    stats, profiles, denied, status, text = asyncio.run(run())
+
+    assert 'dispatcher' in stats
+    assert (profiles, denied, status) == (404, 404, 200)
+    assert text.split() == ['choice', 'B']
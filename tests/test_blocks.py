@@ -0,0 +1,112 @@
+import hashlib
+import json
+
+from test_poll import main_module  # noqa: F401  (fixture)
+
+# sha256 prefixes of the JSON each builder produced before the builders were
+# switched to shared templates. The output must stay byte-identical.
+GOLDEN = {
+    'blended_empty': '58e1ca9e7a240feb',
+    'blended_types': '51df10c53c804357',
+    'blended_full': '5266270efc5ac2b1',
+    'qtype_empty': '2d06cc3f9b4ceaa4',
+    'qtype_full': '718e1d9ca76af107',
+    'detail_plain': '06e31ebac72216c2',
+    'detail_full': '21769a6408168e3f',
+    'detail_short_flags': 'ff0abbb215b32c9b',
+    'feedback_empty': '29d3e1757b5edfe1',
+    'feedback_kinds': '1002a14b20308ca2',
+    'feedback_full': '70e32988f713e25e',
+}
+
+TYPES = {str(i): t for i, t in enumerate(
+    ['vote', 'feedback', 'ranking', 'clear', 'vote', 'vote', 'feedback', None, 'ranking', 'vote']) if t}
+KINDS = {str(i): k for i, k in enumerate(
+    ['vote', 'feedback', None, 'vote', 'feedback', 'vote', None, None, 'vote', 'feedback']) if k}
+QUESTIONS = [f'Q{i}' for i in range(10)]
+Q_TYPES = ['vote', 'feedback', 'vote', 'ranking', 'vote', 'feedback', 'vote', 'vote', 'feedback', 'vote']
+
+
+def full_state():
+    state = {}
+    for i in range(10):
+        state[f'q_block_{i}'] = {f'q_input_{i}': {'value': f'Question {i}'}}
+        state[f'feedback_q_block_{i}'] = {f'feedback_q_input_{i}': {'value': f'FB {i}'}}
+        if i % 2:
+            state[f'format_block_{i}'] = {f'format_select_{i}': {'selected_option': {
+                'text': {'type': 'plain_text', 'text': 'Stars 1-5'}, 'value': 'stars'}}}
+        if i % 3 == 0:
+            state[f'multi_block_{i}'] = {f'multi_select_{i}': {'selected_options': [{'value': 'allow_multi'}]}}
+        if i == 4:
+            state[f'multi_block_{i}'] = {f'multi_select_{i}': {'selected_options': []}}
+        for j in range(0, 10, 3):
+            state[f'opt_block_{i}_{j}'] = {f'opt_input_{i}_{j}': {'value': f'Opt {i}.{j}'}}
+    return state
+
+
+def scenarios(m):
+    st = full_state()
+    return {
+        'blended_empty': m.build_blended_blocks('Title'),
+        'blended_types': m.build_blended_blocks('Title', TYPES),
+        'blended_full': m.build_blended_blocks('Title', TYPES, st),
+        'qtype_empty': m.build_question_type_blocks('Title'),
+        'qtype_full': m.build_question_type_blocks('Title', TYPES, st),
+        'detail_plain': m.build_detail_blocks('Title', QUESTIONS, Q_TYPES),
+        'detail_full': m.build_detail_blocks('Title', QUESTIONS, Q_TYPES, st,
+                                             multi_flags=[i % 2 == 0 for i in range(10)]),
+        'detail_short_flags': m.build_detail_blocks('Title', QUESTIONS[:3], Q_TYPES[:3], None, multi_flags=[True]),
+        'feedback_empty': m.build_feedback_blocks('Title'),
+        'feedback_kinds': m.build_feedback_blocks('Title', KINDS),
+        'feedback_full': m.build_feedback_blocks('Title', KINDS, st),
+    }
+
+
+def digest(blocks):
+    return hashlib.sha256(json.dumps(blocks, ensure_ascii=False).encode()).hexdigest()[:16]
+
+
+def test_builders_output_is_byte_identical(main_module):
+    # run twice so state from one call cannot leak into the shared templates
+    for _ in range(2):
+        assert {k: digest(v) for k, v in scenarios(main_module).items()} == GOLDEN
+
+
+def test_static_blocks_are_shared_between_calls(main_module):
+    first = main_module.build_feedback_blocks('Title')
+    second = main_module.build_feedback_blocks('Other', state=full_state())
+
+    assert first[2] is second[2]  # unfilled kind select
+    assert first[1] is not second[1]  # question text was filled in
+
+
+def test_paged_builders_render_only_the_focused_question(main_module):
+    st = full_state()
+    all_votes = {str(i): 'vote' for i in range(10)}
+    pages = {
+        'blended': main_module.build_blended_blocks('Title', all_votes, st, focus=3),
+        'feedback': main_module.build_feedback_blocks('Title', all_votes, st, focus=3),
+        'detail': main_module.build_detail_blocks('Title', QUESTIONS, ['vote'] * 10, st, focus=3),
+    }
+    assert len(main_module.build_detail_blocks('Title', QUESTIONS, ['vote'] * 10, st)) > 100
+
+    for blocks in pages.values():
+        ids = [b.get('block_id', '') for b in blocks]
+        assert len(blocks) <= 25
+        assert 'opt_block_3_9' in ids
+        assert not any(i.startswith('opt_block_') and not i.startswith('opt_block_3_') for i in ids)
+        edits = [b['accessory']['action_id'] for b in blocks if 'accessory' in b]
+        assert edits == [f'edit_q_{i}' for i in range(10) if i != 3]
+        assert [e['action_id'] for e in blocks[-1]['elements']] == ['page_q_prev', 'page_q_next']
+    assert '*1.* Question 0\nVote · 4 options · multiple selections' in json.loads(json.dumps(pages['blended']))[1]['text']['text']
+
+
+def test_paged_page_size_does_not_grow_with_questions(main_module):
+    st = full_state()
+    one = main_module.build_detail_blocks('Title', QUESTIONS[:1], ['vote'], st, focus=0)
+    ten = main_module.build_detail_blocks('Title', QUESTIONS, ['vote'] * 10, st, focus=0)
+    full = main_module.build_detail_blocks('Title', QUESTIONS, ['vote'] * 10, st)
+
+    size = lambda blocks: len(json.dumps(blocks))
+    assert size(ten) < 2 * size(one)
+    assert size(ten) * 3 < size(full)
@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import cache
+from cache import RecentKeys, VersionedCache
+
+
+def test_versioned_cache_drops_least_recently_used():
+    results = VersionedCache(max_entries=2)
+    results.put('a', 1, 'A')
+    results.put('b', 1, 'B')
+    assert results.get('a', 1) == 'A'
+    results.put('c', 1, 'C')
+
+    assert results.get('b', 1) is None
+    assert results.get('a', 2) is None
+    assert results.get('c', 1) == 'C'
+
+
+def test_recent_keys_expire_and_stay_bounded(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    keys = RecentKeys(max_entries=2, ttl=10)
+
+    assert not keys.seen('a')
+    assert keys.seen('a')
+    now[0] += 5
+    assert not keys.seen('b')
+    now[0] += 6  # 'a' has expired, 'b' has not
+    assert not keys.seen('a')
+    assert keys.seen('b')
+    assert not keys.seen('c')  # over max_entries: 'b' is dropped
+
+    assert not keys.seen('b')
+    assert keys.stats() == {'entries': 2, 'repeats': 2}
+
+    keys.forget('b')
+    assert not keys.seen('b')
@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+
+import urllib.error
+
+import pytest
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.slack_response import SlackResponse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from dispatcher import SlackDispatcher, retry_after
+
+
+def api_error(status_code, retry_after=None):
+    headers = {'Retry-After': str(retry_after)} if retry_after is not None else {}
+    response = SlackResponse(client=None, http_verb='POST', api_url='chat.postEphemeral', req_args={},
+                             data={'ok': False, 'error': 'ratelimited' if status_code == 429 else 'invalid'},
+                             headers=headers, status_code=status_code)
+    return SlackApiError('failed', response)
+
+
+class FlakyClient:
+    """Fails the first `failures` calls of every method with `error`."""
+
+    def __init__(self, failures=0, error=None):
+        self.failures = failures
+        self.error = error
+        self.calls = []
+
+    def chat_postEphemeral(self, **kwargs):
+        self.calls.append((time.monotonic(), kwargs))
+        if len(self.calls) <= self.failures:
+            raise self.error
+        return {'ok': True}
+
+
+def test_retry_after_is_honoured():
+    client = FlakyClient(failures=1, error=api_error(429, retry_after=0.2))
+    dispatcher = SlackDispatcher(workers=2)
+
+    assert dispatcher.call(client, 'chat_postEphemeral', text='hi') == {'ok': True}
+
+    (first, _), (second, _) = client.calls
+    assert second - first >= 0.2
+    stats = dispatcher.stats()
+    assert stats['rate_limited'] == 1
+    assert stats['retried'] == 1
+    assert stats['sent'] == 1
+
+
+def test_invalid_requests_are_not_retried():
+    client = FlakyClient(failures=5, error=api_error(200))
+    dispatcher = SlackDispatcher(workers=0)
+
+    future = dispatcher.submit(client, 'chat_postEphemeral', text='hi')
+
+    with pytest.raises(SlackApiError):
+        future.result()
+    assert len(client.calls) == 1
+    assert dispatcher.stats()['failed'] == 1
+
+
+def test_only_slack_and_network_failures_are_retried():
+    dispatcher = SlackDispatcher(workers=0, backoff=0.01)
+
+    for error in (AttributeError('no such method'), TypeError('bad argument'), KeyError('id')):
+        client = FlakyClient(failures=5, error=error)
+        with pytest.raises(type(error)):
+            dispatcher.call(client, 'chat_postEphemeral', text='hi')
+        assert len(client.calls) == 1
+
+    for error in (api_error(503), urllib.error.URLError('refused'), TimeoutError()):
+        client = FlakyClient(failures=1, error=error)
+        assert dispatcher.call(client, 'chat_postEphemeral', text='hi') == {'ok': True}
+        assert len(client.calls) == 2
+
+
+def test_calls_are_paced_per_method():
+    client = FlakyClient()
+    # 10 calls/sec with a burst of 2
+    dispatcher = SlackDispatcher(workers=4, rates={'chat_postEphemeral': (600, 2)})
+
+    start = time.monotonic()
+    futures = [dispatcher.submit(client, 'chat_postEphemeral', n=n) for n in range(6)]
+    for future in futures:
+        future.result()
+
+    assert time.monotonic() - start >= 0.35
+    assert sorted(kwargs['n'] for _, kwargs in client.calls) == list(range(6))
+
+
+def test_stats_report_queue_depth():
+    client = FlakyClient()
+    dispatcher = SlackDispatcher(workers=1, rates={'chat_postEphemeral': (60, 1)})
+
+    futures = [dispatcher.submit(client, 'chat_postEphemeral') for _ in range(3)]
+    time.sleep(0.05)
+    stats = dispatcher.stats()
+
+    assert stats['in_flight'] == 1
+    assert stats['queue_depth'] == 1
+    futures[0].result()
+
+
+def test_rate_limits_from_the_web_api_stand_in():
+    slack_sdk = pytest.importorskip('slack_sdk')
+    import slack_api
+
+    api = slack_api.SlackAPI(tiers=True, tier_scale=0.01).start()
+    try:
+        client = slack_sdk.WebClient(token='xoxb-test', base_url=api.url)
+        dispatcher = SlackDispatcher(workers=0, max_retries=0)
+
+        assert dispatcher.call(client, 'chat_postEphemeral', channel='C1', user='U1', text='hi')['ok']
+        with pytest.raises(slack_sdk.errors.SlackApiError) as excinfo:
+            dispatcher.call(client, 'chat_postEphemeral', channel='C1', user='U1', text='hi')
+    finally:
+        api.shutdown()
+        api.server_close()
+
+    assert 55 <= retry_after(excinfo.value) <= 60
+    assert dispatcher.stats()['rate_limited'] == 1
+    assert api.stats()['chat.postEphemeral']['rate_limited'] == 1
@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from dispatcher import SlackDispatcher
+from export import iter_csv, iter_jsonl, upload_file
+from storage import MemoryStore, new_poll_data
+
+
+def survey(anonymous):
+    store = MemoryStore()
+    poll = store.add_poll(new_poll_data(
+        type='feedback', question='Survey', anonymous=anonymous,
+        feedback_questions=['Pick', 'Ok?', 'Rate', 'Why'],
+        feedback_formats=[None, None, 'stars', 'paragraph'],
+        feedback_kinds=['vote', 'vote', 'feedback', 'feedback'],
+        question_options=[['A', 'B', 'C'], [], [], []],
+        vote_tallies=[{0: 0, 1: 0, 2: 0}, {'yes': 0, 'no': 0}, {}, {}],
+        multi_questions=[True, False, False, False],
+        creator_id='Ucreator', channel_id='C1', active=True))
+    store.record_feedback(poll, 'U1', [[0, 2], 'yes', '4', 'Fine, "mostly"'])
+    store.record_feedback(poll, 'U2', [[1], 'no', '2', '=HYPERLINK("x")'])
+    return poll
+
+
+def test_csv_decodes_options_and_guards_formulas():
+    text = ''.join(iter_csv(survey(anonymous=False)))
+
+    assert text.splitlines() == [
+        'user,Pick,Ok?,Rate,Why',
+        'U1,A; C,yes,4,"Fine, ""mostly"""',
+        'U2,B,no,2,"\'=HYPERLINK(""x"")"',
+    ]
+
+
+def test_anonymous_export_leaves_out_users():
+    rows = [json.loads(line) for line in iter_jsonl(survey(anonymous=True))]
+
+    assert rows[0] == {'Pick': ['A', 'C'], 'Ok?': 'yes', 'Rate': 4, 'Why': 'Fine, "mostly"'}
+    assert all('user' not in row for row in rows)
+
+
+def test_vote_export_has_one_row_per_ballot():
+    store = MemoryStore()
+    poll = store.add_poll(new_poll_data(
+        type='vote', question='Choose', options=['A', 'B', 'C'], tallies={0: 0, 1: 0, 2: 0},
+        creator_id='Ucreator', channel_id='C1', anonymous=False, multi=True, active=True))
+    for user, choice in [('U1', 2), ('U1', 0), ('U2', 1)]:
+        store.record_vote(poll, user, choice)
+
+    assert ''.join(iter_csv(poll)).splitlines() == ['user,choice', 'U1,A; C', 'U2,B']
+
+
+def test_upload_file_sends_the_export_to_slack():
+    slack_sdk = pytest.importorskip('slack_sdk')
+    import slack_api
+
+    api = slack_api.SlackAPI().start()
+    try:
+        client = slack_sdk.WebClient(token='xoxb-test', base_url=api.url)
+        dispatcher = SlackDispatcher(workers=0)
+        resp = upload_file(dispatcher.call, client, iter_csv(survey(anonymous=True)),
+                           'survey.csv', 'D1', comment='Results')
+    finally:
+        api.shutdown()
+        api.server_close()
+
+    file_id = resp['files'][0]['id']
+    assert api.uploads[file_id].decode().startswith('Pick,Ok?,Rate,Why\r\nA; C,yes,4,')
@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from metrics import Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram('call_seconds', 'Call time.', ('method',), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 3):
+        latency.observe(value, method='chat.update')
+
+    assert registry.render().splitlines() == [
+        '# HELP call_seconds Call time.',
+        '# TYPE call_seconds histogram',
+        'call_seconds_bucket{method="chat.update",le="0.1"} 1',
+        'call_seconds_bucket{method="chat.update",le="1"} 3',
+        'call_seconds_bucket{method="chat.update",le="+Inf"} 4',
+        'call_seconds_sum{method="chat.update"} 4.05',
+        'call_seconds_count{method="chat.update"} 4',
+    ]
+
+
+def test_counters_and_gauges_escape_labels():
+    registry = Registry()
+    errors = registry.counter('errors_total', 'Errors.', ('listener',))
+    errors.inc(listener='say "hi"')
+    errors.inc(2, listener='say "hi"')
+    registry.gauge('entries', 'Entries.', lambda: {('votes',): 7, ('polls',): 2}, labels=('entry',))
+    registry.gauge('up', 'Up.', lambda: 1)
+
+    lines = [line for line in registry.render().splitlines() if not line.startswith('#')]
+    assert lines == [
+        'errors_total{listener="say \\"hi\\""} 3',
+        'entries{entry="polls"} 2',
+        'entries{entry="votes"} 7',
+        'up 1',
+    ]
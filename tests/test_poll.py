@@ -3,11 +3,14 @@ import sys
 import types
 import os
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 
 class FakeApp:
     def __init__(self, *args, **kwargs):
-        pass
+        self.kwargs = kwargs
     def command(self, *args, **kwargs):
         def decorator(func):
             return func
@@ -48,6 +51,7 @@ def main_module(monkeypatch):
 
     monkeypatch.setenv('SLACK_BOT_TOKEN', 'x')
     monkeypatch.setenv('SLACK_SIGNING_SECRET', 'y')
+    monkeypatch.setenv('SLACK_API_WORKERS', '0')
 
     root_path = os.path.dirname(os.path.dirname(__file__))
     monkeypatch.syspath_prepend(root_path)
@@ -59,36 +63,36 @@ def main_module(monkeypatch):
 
 @pytest.fixture
 def poll_setup(main_module):
-    pd = main_module.poll_data
-    pd.update({
-        'type': 'vote',
-        'question': 'Choose',
-        'options': ['A', 'B'],
-        'feedback_questions': [],
-        'votes': {},
-        'tallies': {0: 0, 1: 0},
-        'feedback_responses': [],
-        'creator_id': 'Ucreator',
-        'channel_id': 'C1',
-        'multi': False,
-        'active': True,
-    })
-    return pd
+    return main_module.store.add_poll(main_module.new_poll_data(
+        type='vote',
+        question='Choose',
+        options=['A', 'B'],
+        tallies={0: 0, 1: 0},
+        creator_id='Ucreator',
+        channel_id='C1',
+        multi=False,
+        active=True,
+    ))
 
 class MockSlackClient:
     def __init__(self):
         self.messages = []
         self.canvases = []
+        self.updates = []
 
     def chat_postEphemeral(self, channel=None, user=None, text=None, blocks=None):
         self.messages.append({'channel': channel, 'user': user, 'text': text, 'blocks': blocks})
 
-    def chat_postMessage(self, channel=None, text=None, blocks=None):
-        self.messages.append({'channel': channel, 'text': text, 'blocks': blocks})
+    def chat_postMessage(self, channel=None, text=None, blocks=None, thread_ts=None):
+        self.messages.append({'channel': channel, 'text': text, 'blocks': blocks, 'thread_ts': thread_ts})
+        return {'ts': f'{len(self.messages)}.000'}
+
+    def chat_update(self, channel=None, ts=None, text=None, blocks=None):
+        self.updates.append({'channel': channel, 'ts': ts, 'text': text, 'blocks': blocks})
 
-    def conversations_canvases_create(self, channel_id=None, document_content=None, title=None):
+    def canvases_create(self, channel_id=None, title=None, document_content=None):
         self.canvases.append({'channel_id': channel_id, 'document_content': document_content, 'title': title})
-        return {'canvas': {'id': '12345'}}
+        return {'canvas_id': 'F123'}
 
 
 def test_handle_vote_records_and_rejects(main_module, poll_setup):
@@ -98,7 +102,7 @@ def test_handle_vote_records_and_rejects(main_module, poll_setup):
         ack_calls.append(True)
 
     body = {'channel': {'id': 'C1'}, 'user': {'id': 'U1'}}
-    action = {'action_id': 'vote_1'}
+    action = {'action_id': 'vote_1', 'value': poll_setup['poll_id']}
 
     # first vote
     main_module.handle_vote(ack, body, action, client)
@@ -121,8 +125,8 @@ def test_handle_vote_multi_allows_multiple(main_module, poll_setup):
         pass
 
     body = {'channel': {'id': 'C1'}, 'user': {'id': 'U1'}}
-    action0 = {'action_id': 'vote_0'}
-    action1 = {'action_id': 'vote_1'}
+    action0 = {'action_id': 'vote_0', 'value': poll_setup['poll_id']}
+    action1 = {'action_id': 'vote_1', 'value': poll_setup['poll_id']}
 
     main_module.handle_vote(ack, body, action0, client)
     main_module.handle_vote(ack, body, action1, client)
@@ -179,6 +183,136 @@ def test_handle_poll_step1_blended(main_module):
     assert payloads[0]['view']['callback_id'] == 'poll_step2'
 
 
+def test_poll_modals_carry_only_a_draft_id(main_module):
+    opened, payloads = [], []
+    client = types.SimpleNamespace(views_open=lambda **k: opened.append(k))
+    main_module.open_poll_modal(lambda: None, {'trigger_id': 'T1', 'channel_id': 'C1', 'user_id': 'U1'}, client)
+    draft_id = opened[0]['view']['private_metadata']
+    values = {'type_block': {'poll_type': {'selected_option': {'value': 'blended'}}},
+              'question_block': {'question_input': {'value': 'Q'}},
+              'visibility_block': {'visibility_select': {'selected_option': {'value': 'public'}}}}
+    main_module.handle_poll_step1(lambda **k: payloads.append(k), {}, {'private_metadata': draft_id, 'state': {'values': values}}, client)
+
+    state = {'values': {f'q_block_{i}': {f'q_input_{i}': {'value': f'Question {i} ' + 'x' * 400}} for i in range(10)}}
+    main_module.handle_poll_step2(lambda **k: payloads.append(k), {}, {'private_metadata': draft_id, 'state': state}, client)
+
+    assert payloads[-1]['view']['private_metadata'] == draft_id
+    draft = main_module.store.get_draft(draft_id)
+    assert (draft['channel'], draft['type'], len(draft['questions'])) == ('C1', 'blended', 10)
+    assert len(json.dumps(draft)) > 3000
+
+
+def test_poll_submission_deletes_its_draft(main_module):
+    client = types.SimpleNamespace(chat_postMessage=lambda **k: {'ts': '1.0'},
+                                   conversations_open=lambda users: {'channel': {'id': 'D1'}})
+    draft_id = main_module.store.save_draft({'channel': 'C1', 'user': 'U1', 'type': 'ranking', 'title': 'Rate'})
+    view = {'private_metadata': draft_id, 'state': {'values': {}}}
+
+    main_module.handle_poll_submission(lambda: None, {}, view, client)
+    assert main_module.store.get_channel_poll('C1')['question'] == 'Rate'
+    assert main_module.store.get_draft(draft_id) is None
+
+    payloads = []
+    main_module.handle_poll_submission(lambda **k: payloads.append(k), {}, view, client)
+    assert 'expired' in json.dumps(payloads[-1]['view'])
+
+
+def test_kind_selection_updates_the_modal_only_when_its_layout_changes(main_module):
+    updates = []
+    client = types.SimpleNamespace(views_update=lambda **k: updates.append(k) or {'view': {'hash': 'h2'}})
+    draft_id = main_module.store.save_draft({'channel': 'C1', 'user': 'U1', 'type': 'feedback', 'title': 'Q'})
+
+    def select(idx, kind, view_hash):
+        view = {'id': 'V1', 'hash': view_hash, 'private_metadata': draft_id, 'state': {'values': {}}}
+        action = {'action_id': f'kind_select_{idx}', 'selected_option': {'value': kind}}
+        main_module.update_feedback_kind(lambda: None, {'view': view, 'actions': [action]}, client)
+
+    select(0, 'vote', 'h1')
+    select(0, 'vote', 'h2')  # e.g. re-sent by a flaky client: same page again
+
+    [update] = updates
+    assert (update['view_id'], update['hash']) == ('V1', 'h1')
+    assert update['view']['private_metadata'] == draft_id
+    assert any(b.get('block_id') == 'opt_block_0_0' for b in update['view']['blocks'])
+    assert main_module.store.get_draft(draft_id)['q_kinds'] == {'0': 'vote'}
+    assert main_module.view_updates.stats()['skipped'] == 1
+
+
+def test_ten_vote_questions_are_configured_page_by_page(main_module):
+    payloads, updates = [], []
+    client = types.SimpleNamespace(
+        views_update=lambda **k: updates.append(k) or {'view': {'hash': f'h{len(updates)}'}},
+        chat_postMessage=lambda **k: {'ts': '1.0'},
+        conversations_open=lambda users: {'channel': {'id': 'D1'}})
+    draft_id = main_module.store.save_draft(
+        {'channel': 'C1', 'user': 'U1', 'type': 'blended', 'title': 'Big', 'visibility': 'public'})
+    state = {}
+    for i in range(10):
+        state[f'q_block_{i}'] = {f'q_input_{i}': {'value': f'Question {i}'}}
+        state[f'q_type_block_{i}'] = {f'q_type_select_{i}': {'selected_option': {'value': 'vote'}}}
+    main_module.handle_poll_step2(lambda **k: payloads.append(k), {}, {'private_metadata': draft_id, 'state': {'values': state}}, client)
+    assert len(payloads[-1]['view']['blocks']) <= 25
+
+    def options(i):
+        return {f'opt_block_{i}_{j}': {f'opt_input_{i}_{j}': {'value': f'{i}-{j}'}} for j in range(2)}
+
+    # enter question 0's options, then move on to each next question in turn
+    for i in range(9):
+        view = {'id': 'V1', 'hash': f'h{i}', 'private_metadata': draft_id, 'state': {'values': options(i)}}
+        main_module.focus_question(lambda: None, {'view': view, 'actions': [{'action_id': 'page_q_next', 'value': str(i + 1)}]}, client)
+    assert len(updates) == 9
+    assert all(len(u['view']['blocks']) <= 25 for u in updates)
+    assert {b.get('block_id') for b in updates[-1]['view']['blocks']} >= {'opt_block_9_0', 'multi_block_9'}
+
+    view = {'private_metadata': draft_id, 'state': {'values': options(9)}}
+    main_module.handle_poll_submission(lambda: None, {}, view, client)
+
+    poll = main_module.store.get_channel_poll('C1')
+    assert poll['question_options'] == [[f'{i}-0', f'{i}-1'] for i in range(10)]
+
+
+def test_submission_turns_to_a_vote_question_left_without_options(main_module):
+    payloads = []
+    client = MockSlackClient()
+    draft_id = main_module.store.save_draft({
+        'channel': 'C1', 'user': 'U1', 'type': 'blended', 'title': 'Big', 'visibility': 'public',
+        'questions': ['Q0', 'Q1', 'Q2'], 'q_types': ['vote', 'vote', 'vote'],
+        'page': 'detail', 'focus': 0})
+    values = {f'opt_block_0_{j}': {f'opt_input_0_{j}': {'value': f'0-{j}'}} for j in range(2)}
+    view = {'private_metadata': draft_id, 'state': {'values': values},
+            'blocks': main_module.build_detail_blocks('Big', ['Q0', 'Q1', 'Q2'], ['vote'] * 3, focus=0)}
+
+    main_module.handle_poll_submission(lambda **k: payloads.append(k), {}, view, client)
+
+    [payload] = payloads
+    assert payload['response_action'] == 'update'
+    blocks = payload['view']['blocks']
+    assert 'Question 2 needs at least 2 options' in blocks[1]['elements'][0]['text']
+    assert any(b.get('block_id') == 'opt_block_1_0' for b in blocks)
+    assert main_module.store.get_draft(draft_id)['inputs'] == values
+    assert main_module.store.get_channel_poll('C1') is None
+    assert not client.messages
+
+    # on the question's own page the error is shown next to its options
+    view = dict(view, blocks=blocks, state={'values': {}})
+    main_module.handle_poll_submission(lambda **k: payloads.append(k), {}, view, client)
+    assert payloads[-1] == {'response_action': 'errors',
+                            'errors': {'opt_block_1_0': 'Question 2 needs at least 2 options.'}}
+
+
+def test_vote_submission_with_one_option_keeps_the_modal_open(main_module):
+    payloads = []
+    draft_id = main_module.store.save_draft({'channel': 'C1', 'user': 'U1', 'type': 'vote', 'title': 'Pick'})
+    values = {'option_block_0': {'option_input_0': {'value': 'Only'}}}
+
+    main_module.handle_poll_submission(lambda **k: payloads.append(k), {},
+                                       {'private_metadata': draft_id, 'state': {'values': values}}, MockSlackClient())
+
+    assert payloads == [{'response_action': 'errors',
+                         'errors': {'option_block_1': 'You must provide at least 2 vote options.'}}]
+    assert main_module.store.get_draft(draft_id) is not None
+
+
 def test_handle_poll_step2_ack_update(main_module):
     payloads = []
     def ack(**kwargs):
@@ -223,7 +357,7 @@ def test_handle_poll_step2_records_formats(main_module):
 
     main_module.handle_poll_step2(ack, body, view, client=object())
 
-    meta_out = json.loads(payloads[-1]['view']['private_metadata'])
+    meta_out = main_module.store.get_draft(payloads[-1]['view']['private_metadata'])
     assert meta_out['q_formats'][0] == 'stars'
 
 
@@ -259,7 +393,7 @@ def test_handle_poll_submission_ranking(main_module):
 
     main_module.handle_poll_submission(ack, body={}, view=view, client=types.SimpleNamespace(chat_postMessage=lambda **k: None, conversations_open=lambda users: {'channel': {'id': 'D1'}}))
 
-    pd = main_module.poll_data
+    pd = main_module.store.get_channel_poll('C1')
     assert pd['type'] == 'ranking'
     assert pd['feedback_questions'] == ['Rate']
     assert pd['feedback_formats'] == ['stars']
@@ -286,7 +420,7 @@ def test_poll_submission_feedback_formats(main_module):
             chat_postMessage=lambda **k: None,
             conversations_open=lambda users: {'channel': {'id': 'D1'}}))
 
-    pd = main_module.poll_data
+    pd = main_module.store.get_channel_poll('C1')
     assert pd['feedback_formats'] == ['stars']
 
 
@@ -321,24 +455,39 @@ def test_close_poll_posts_summary_blocks(main_module, poll_setup):
     assert 'blocks' in last and last['blocks']
 
 
+
+def test_close_poll_reports_votes_cast_while_closing(main_module, poll_setup):
+    client = MockSlackClient()
+    store = main_module.store
+    get_channel_poll = store.get_channel_poll
+
+    def snapshot_then_vote(channel_id):
+        # an SQLite snapshot does not see votes recorded after it was read
+        poll = get_channel_poll(channel_id)
+        poll = dict(poll, tallies=dict(poll['tallies']))
+        store.record_vote(poll_setup, 'U1', 1)
+        return poll
+
+    store.get_channel_poll = snapshot_then_vote
+    main_module.close_poll(lambda: None, {'user_id': 'Ucreator', 'channel_id': 'C1'}, client)
+
+    fields = client.messages[-1]['blocks'][2]['fields']
+    assert 'Votes: 1 (100%)' in fields[1]['text']
+
+
 def test_close_poll_non_vote_text_summary(main_module):
-    pd = main_module.poll_data
-    pd.update({
-        'type': 'feedback',
-        'question': 'Why',
-        'options': [],
-        'feedback_questions': ['Why'],
-        'feedback_formats': ['paragraph'],
-        'feedback_kinds': ['feedback'],
-        'question_options': [],
-        'vote_tallies': [{}],
-        'tallies': {},
-        'votes': {},
-        'feedback_responses': [{'user': 'U1', 'answers': ['A']}],
-        'creator_id': 'Ucreator',
-        'channel_id': 'C1',
-        'active': True,
-    })
+    pd = main_module.store.add_poll(main_module.new_poll_data(
+        type='feedback',
+        question='Why',
+        feedback_questions=['Why'],
+        feedback_formats=['paragraph'],
+        feedback_kinds=['feedback'],
+        vote_tallies=[{}],
+        feedback_responses=[{'user': 'U1', 'answers': ['A']}],
+        creator_id='Ucreator',
+        channel_id='C1',
+        active=True,
+    ))
 
     client = MockSlackClient()
 
@@ -357,22 +506,19 @@ def test_close_poll_non_vote_text_summary(main_module):
 
 
 def test_feedback_multi_vote_question(main_module):
-    pd = main_module.poll_data
-    pd.update({
-        'type': 'feedback',
-        'question': 'Poll',
-        'options': [],
-        'feedback_questions': ['Q1'],
-        'feedback_formats': [None],
-        'feedback_kinds': ['vote'],
-        'question_options': [['A', 'B', 'C']],
-        'vote_tallies': [{0: 0, 1: 0, 2: 0}],
-        'multi_questions': [True],
-        'feedback_responses': [],
-        'creator_id': 'U1',
-        'channel_id': 'C1',
-        'active': True,
-    })
+    pd = main_module.store.add_poll(main_module.new_poll_data(
+        type='feedback',
+        question='Poll',
+        feedback_questions=['Q1'],
+        feedback_formats=[None],
+        feedback_kinds=['vote'],
+        question_options=[['A', 'B', 'C']],
+        vote_tallies=[{0: 0, 1: 0, 2: 0}],
+        multi_questions=[True],
+        creator_id='U1',
+        channel_id='C1',
+        active=True,
+    ))
 
     state = {
         'values': {
@@ -383,10 +529,664 @@ def test_feedback_multi_vote_question(main_module):
             }
         }
     }
-    view = {'state': state}
+    view = {'private_metadata': json.dumps({'poll_id': pd['poll_id']}), 'state': state}
     body = {'user': {'id': 'U2'}}
     main_module.handle_feedback_submission(lambda: None, body, view, client=types.SimpleNamespace(chat_postEphemeral=lambda **k: None))
 
     assert pd['vote_tallies'][0][0] == 1
     assert pd['vote_tallies'][0][2] == 1
     assert pd['feedback_responses'][0]['answers'][0] == [0, 2]
+
+
+def test_polls_in_different_channels_are_isolated(main_module):
+    client = MockSlackClient()
+    first = main_module.store.add_poll(main_module.new_poll_data(
+        type='vote', question='First', options=['A', 'B'], tallies={0: 0, 1: 0},
+        creator_id='Ucreator', channel_id='C1', active=True))
+    second = main_module.store.add_poll(main_module.new_poll_data(
+        type='vote', question='Second', options=['X', 'Y'], tallies={0: 0, 1: 0},
+        creator_id='Ucreator', channel_id='C2', active=True))
+
+    body = {'channel': {'id': 'C1'}, 'user': {'id': 'U1'}}
+    main_module.handle_vote(lambda: None, body, {'action_id': 'vote_0', 'value': first['poll_id']}, client)
+    body = {'channel': {'id': 'C2'}, 'user': {'id': 'U1'}}
+    main_module.handle_vote(lambda: None, body, {'action_id': 'vote_1', 'value': second['poll_id']}, client)
+
+    assert first['tallies'] == {0: 1, 1: 0}
+    assert second['tallies'] == {0: 0, 1: 1}
+
+    main_module.close_poll(lambda: None, {'user_id': 'Ucreator', 'channel_id': 'C2'}, client)
+    assert first['active']
+    assert not second['active']
+    assert main_module.store.get_channel_poll('C1') is first
+
+
+def test_poll_submission_buttons_carry_poll_id(main_module):
+    posted = []
+    client = types.SimpleNamespace(
+        chat_postMessage=lambda **k: posted.append(k) or {'ts': '111.222'},
+        conversations_open=lambda users: {'channel': {'id': 'D1'}})
+    meta = {'channel': 'C1', 'user': 'U1', 'type': 'vote', 'title': 'Pick', 'visibility': 'public'}
+    state = {'values': {
+        'option_block_0': {'option_input_0': {'value': 'A'}},
+        'option_block_1': {'option_input_1': {'value': 'B'}},
+    }}
+
+    main_module.handle_poll_submission(lambda: None, body={}, view={'private_metadata': json.dumps(meta), 'state': state}, client=client)
+
+    pd = main_module.store.get_channel_poll('C1')
+    assert pd['message_ts'] == '111.222'
+    buttons = posted[0]['blocks'][1]['elements']
+    assert all(b['value'] == pd['poll_id'] for b in buttons)
+
+
+def test_parse_duration(main_module):
+    assert main_module.parse_duration('90m') == 5400
+    assert main_module.parse_duration('1d 12h') == 129600
+    assert main_module.parse_duration(' 2H ') == 7200
+    assert main_module.parse_duration('soon') is None
+    assert main_module.parse_duration('2h later') is None
+
+
+def test_handle_poll_step1_validates_auto_close(main_module):
+    payloads = []
+    values = {
+        'type_block': {'poll_type': {'selected_option': {'value': 'vote'}}},
+        'question_block': {'question_input': {'value': 'Q'}},
+        'visibility_block': {'visibility_select': {'selected_option': {'value': 'public'}}},
+        'close_in_block': {'close_in_input': {'value': 'tomorrow'}},
+        'quorum_block': {'quorum_input': {'value': '50'}},
+    }
+    view = {'private_metadata': json.dumps({'channel': 'C1', 'user': 'U1'}), 'state': {'values': values}}
+
+    main_module.handle_poll_step1(lambda **k: payloads.append(k), {}, view, client=object())
+    assert payloads[-1]['response_action'] == 'errors'
+    assert 'close_in_block' in payloads[-1]['errors']
+
+    values['close_in_block']['close_in_input']['value'] = '2h'
+    main_module.handle_poll_step1(lambda **k: payloads.append(k), {}, view, client=object())
+    meta = main_module.store.get_draft(payloads[-1]['view']['private_metadata'])
+    assert (meta['close_in'], meta['quorum']) == (7200, 50)
+
+
+def test_poll_submission_arms_deadline_until_closed(main_module):
+    posted = []
+    client = types.SimpleNamespace(
+        chat_postMessage=lambda **k: posted.append(k) or {'ts': '111.222'},
+        chat_postEphemeral=lambda **k: None,
+        conversations_open=lambda users: {'channel': {'id': 'D1'}})
+    meta = {'channel': 'C1', 'user': 'U1', 'type': 'vote', 'title': 'Pick', 'visibility': 'public',
+            'close_in': 7200, 'quorum': 50}
+    state = {'values': {
+        'option_block_0': {'option_input_0': {'value': 'A'}},
+        'option_block_1': {'option_input_1': {'value': 'B'}},
+    }}
+
+    main_module.handle_poll_submission(lambda: None, body={}, view={'private_metadata': json.dumps(meta), 'state': state}, client=client)
+
+    poll = main_module.store.get_channel_poll('C1')
+    assert abs(poll['close_at'] - (time.time() + 7200)) < 5
+    assert 'or after 50 responses' in posted[0]['blocks'][-1]['elements'][0]['text']
+    timer = main_module._close_timers[poll['poll_id']]
+
+    main_module.close_poll(lambda: None, {'user_id': 'U1', 'channel_id': 'C1'}, client)
+    assert timer.cancelled
+    assert poll['poll_id'] not in main_module._close_timers
+
+
+def test_quorum_closes_vote_poll_once(main_module, poll_setup):
+    poll_setup['quorum'] = 2
+    client = MockSlackClient()
+    for n in range(3):
+        body = {'channel': {'id': 'C1'}, 'user': {'id': f'U{n}'}}
+        main_module.handle_vote(lambda: None, body, {'action_id': 'vote_0', 'value': poll_setup['poll_id']}, client)
+
+    assert not poll_setup['active']
+    assert dict(poll_setup['tallies']) == {0: 2, 1: 0}
+    closed = [m for m in client.messages if 'Closed automatically after 2 responses' in json.dumps(m['blocks'])]
+    assert len(closed) == 1
+    assert client.messages[-1]['text'] == '❌ This poll is closed or not a vote poll.'
+
+
+def test_quorum_closes_feedback_poll(main_module):
+    poll = paragraph_poll(main_module, 0)
+    poll['quorum'] = 1
+    client = MockSlackClient()
+    view = {'private_metadata': json.dumps({'poll_id': poll['poll_id']}),
+            'state': {'values': {'resp_block_0': {'resp_input_0': {'value': 'Fine'}}}}}
+
+    main_module.handle_feedback_submission(lambda: None, {'user': {'id': 'U1'}}, view, client)
+
+    assert not poll['active']
+    assert 'Closed automatically after 1 response on' in client.messages[-1]['text']
+
+
+def test_deadline_closes_poll_on_the_scheduler(main_module, poll_setup):
+    client = MockSlackClient()
+
+    main_module.schedule_auto_close(poll_setup['poll_id'], time.time() - 1, client)
+    deadline = time.monotonic() + 5
+    while not client.messages and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert not poll_setup['active']
+    assert 'Closed automatically at its deadline' in json.dumps(client.messages[-1]['blocks'])
+    main_module.auto_close(poll_setup['poll_id'], client, 'at its deadline')
+    assert len(client.messages) == 1
+
+
+@pytest.fixture
+def fast_switching():
+    # switch threads far more often than the default 5ms to provoke races
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_parallel_votes_are_counted_exactly(main_module, fast_switching):
+    poll = main_module.store.add_poll(main_module.new_poll_data(
+        type='vote', question='Choose', options=['A', 'B', 'C'],
+        tallies={0: 0, 1: 0, 2: 0}, creator_id='Ucreator', channel_id='C1',
+        active=True))
+    client = MockSlackClient()
+    users = 2000
+
+    def click(n):
+        # every user clicks twice; only the first click may count
+        user = f'U{n % users}'
+        body = {'channel': {'id': 'C1'}, 'user': {'id': user}}
+        action = {'action_id': f'vote_{n % users % 3}', 'value': poll['poll_id']}
+        main_module.handle_vote(lambda: None, body, action, client)
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(click, range(users * 2)))
+
+    expected = {c: sum(1 for u in range(users) if u % 3 == c) for c in range(3)}
+    assert poll['tallies'] == expected
+    assert len(poll['votes']) == users
+
+
+def test_parallel_multi_votes_are_counted_exactly(main_module, fast_switching):
+    poll = main_module.store.add_poll(main_module.new_poll_data(
+        type='vote', question='Choose', options=['A', 'B', 'C'],
+        tallies={0: 0, 1: 0, 2: 0}, creator_id='Ucreator', channel_id='C1',
+        multi=True, active=True))
+    client = MockSlackClient()
+    users = 500
+
+    def click(n):
+        user, choice = f'U{n % users}', n // users % 3
+        body = {'channel': {'id': 'C1'}, 'user': {'id': user}}
+        action = {'action_id': f'vote_{choice}', 'value': poll['poll_id']}
+        main_module.handle_vote(lambda: None, body, action, client)
+
+    # each user clicks every option twice
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(click, range(users * 6)))
+
+    assert poll['tallies'] == {0: users, 1: users, 2: users}
+    assert all(choices == {0, 1, 2} for choices in poll['votes'].values())
+
+
+def test_named_multi_results_list_every_choice(main_module):
+    poll = main_module.store.add_poll(main_module.new_poll_data(
+        type='vote', question='Choose', options=['A', 'B', 'C'],
+        tallies={0: 0, 1: 0, 2: 0}, creator_id='Ucreator', channel_id='C1',
+        anonymous=False, multi=True, active=True))
+    for user, choice in [('U1', 0), ('U1', 2), ('U2', 1)]:
+        main_module.store.record_vote(poll, user, choice)
+
+    blocks = main_module.build_vote_results_blocks(poll)
+    lines = [b['elements'][0]['text'] for b in blocks if b['type'] == 'context']
+    assert lines == ['• <@U1> → A, C', '• <@U2> → B']
+
+
+def test_parallel_feedback_submissions_are_counted_exactly(main_module, fast_switching):
+    poll = main_module.store.add_poll(main_module.new_poll_data(
+        type='feedback', question='Poll', feedback_questions=['Q1'],
+        feedback_formats=[None], feedback_kinds=['vote'],
+        question_options=[['A', 'B']], vote_tallies=[{0: 0, 1: 0}],
+        multi_questions=[False], creator_id='U1', channel_id='C1', active=True))
+    client = types.SimpleNamespace(chat_postEphemeral=lambda **k: None)
+    meta = json.dumps({'poll_id': poll['poll_id']})
+    submissions = 2000
+
+    def submit(n):
+        state = {'values': {'resp_block_0': {'resp_input_0': {'selected_option': {'value': str(n % 2)}}}}}
+        main_module.handle_feedback_submission(
+            lambda: None, {'user': {'id': f'U{n}'}}, {'private_metadata': meta, 'state': state}, client)
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(submit, range(submissions)))
+
+    assert poll['vote_tallies'] == [{0: submissions // 2, 1: submissions // 2}]
+    assert len(poll['feedback_responses']) == submissions
+
+
+def test_live_results_coalesce_message_updates(main_module, poll_setup, monkeypatch):
+    monkeypatch.setattr(main_module, 'live_interval', 0.2)
+    main_module.store.set_message_ts(poll_setup['poll_id'], '111.222')
+    client = MockSlackClient()
+
+    for n in range(50):
+        body = {'channel': {'id': 'C1'}, 'user': {'id': f'U{n}'}}
+        main_module.handle_vote(lambda: None, body, {'action_id': f'vote_{n % 2}', 'value': poll_setup['poll_id']}, client)
+    time.sleep(0.1)
+    body = {'channel': {'id': 'C1'}, 'user': {'id': 'Ulate'}}
+    main_module.handle_vote(lambda: None, body, {'action_id': 'vote_0', 'value': poll_setup['poll_id']}, client)
+    time.sleep(0.4)
+
+    # voters only get the short acknowledgement
+    assert all(len(m['blocks']) == 1 for m in client.messages)
+    # the first vote updates at once, everything after is batched into one more
+    assert len(client.updates) == 2
+    last = client.updates[-1]
+    assert last['ts'] == '111.222'
+    assert last['blocks'][-1]['elements'][0]['text'] == '*A* 26 · *B* 25 — 51 voters'
+
+
+def test_live_results_final_update_on_close(main_module, poll_setup, monkeypatch):
+    monkeypatch.setattr(main_module, 'live_interval', 5)
+    main_module.store.set_message_ts(poll_setup['poll_id'], '111.222')
+    client = MockSlackClient()
+    body = {'channel': {'id': 'C1'}, 'user': {'id': 'U1'}}
+    main_module.handle_vote(lambda: None, body, {'action_id': 'vote_0', 'value': poll_setup['poll_id']}, client)
+    deadline = time.monotonic() + 2
+    while not client.updates and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert poll_setup['poll_id'] in main_module._live_sent
+
+    main_module.close_poll(lambda: None, {'user_id': 'Ucreator', 'channel_id': 'C1'}, client)
+
+    blocks = client.updates[-1]['blocks']
+    assert [b['type'] for b in blocks] == ['section', 'context']
+    assert blocks[-1]['elements'][0]['text'].endswith('— closed')
+    # a closed poll gets no more updates, so nothing is kept for it
+    assert poll_setup['poll_id'] not in main_module._live_sent
+    assert poll_setup['poll_id'] not in main_module._live_pending
+
+
+def test_poll_results_use_star_aggregates(main_module):
+    poll = main_module.store.add_poll(main_module.new_poll_data(
+        type='ranking', question='Rate', feedback_questions=['Rate'],
+        feedback_formats=['stars'], feedback_kinds=['feedback'],
+        question_options=[[]], vote_tallies=[{}], creator_id='U1',
+        channel_id='C1', active=True))
+    client = MockSlackClient()
+    meta = json.dumps({'poll_id': poll['poll_id']})
+    for n, stars in enumerate(['5', '4', '4']):
+        state = {'values': {'resp_block_0': {'resp_input_0': {'selected_option': {'value': stars}}}}}
+        main_module.handle_feedback_submission(
+            lambda: None, {'user': {'id': f'U{n}'}}, {'private_metadata': meta, 'state': state}, client)
+
+    # rendering reads the aggregate, not the individual responses
+    poll['feedback_responses'].clear()
+    main_module.show_poll_results(lambda: None, {'channel_id': 'C1', 'user_id': 'U1'}, client)
+
+    assert poll['aggregates'][0] == {'count': 3, 'sum': 13, 'stars': [0, 0, 0, 2, 1]}
+    assert '• *Rate*: average 4.3/5' in client.messages[-1]['text']
+
+
+def paragraph_poll(main_module, responses, anonymous=True):
+    return main_module.store.add_poll(main_module.new_poll_data(
+        type='feedback', question='Why', feedback_questions=['Why'],
+        feedback_formats=['paragraph'], feedback_kinds=['feedback'],
+        vote_tallies=[{}], creator_id='Ucreator', channel_id='C1',
+        anonymous=anonymous, active=True,
+        feedback_responses=[{'user': f'U{n}', 'answers': [f'answer {n} ' + 'x' * 80]} for n in range(responses)]))
+
+
+def test_close_poll_threads_long_reports(main_module, monkeypatch):
+    monkeypatch.setattr(main_module, 'results_canvas', False)
+    paragraph_poll(main_module, 200)
+    client = MockSlackClient()
+
+    main_module.close_poll(lambda: None, {'user_id': 'Ucreator', 'channel_id': 'C1'}, client)
+
+    first, *replies = client.messages
+    assert len(replies) >= 4
+    assert first['thread_ts'] is None
+    assert all(r['thread_ts'] == '1.000' for r in replies)
+    assert all(len(m['text']) <= main_module.RESULTS_CHUNK_CHARS for m in client.messages)
+    report = ''.join(m['text'] for m in client.messages)
+    assert all(f'answer {n} ' in report for n in range(200))
+    assert 'Closed by <@Ucreator>' in replies[-1]['text']
+
+
+def test_close_poll_publishes_long_reports_to_a_canvas(main_module):
+    poll = paragraph_poll(main_module, 200, anonymous=False)
+    poll['feedback_questions'].append('Rate')
+    poll['feedback_formats'].append('stars')
+    poll['feedback_kinds'].append('feedback')
+    poll['aggregates'].append({'count': 3, 'sum': 13, 'stars': [0, 0, 0, 2, 1]})
+    client = MockSlackClient()
+    body = {'user_id': 'Ucreator', 'channel_id': 'C1', 'team_id': 'T1', 'team_domain': 'hfc'}
+
+    main_module.close_poll(lambda: None, body, client)
+
+    [canvas] = client.canvases
+    assert canvas['channel_id'] == 'C1'
+    markdown = canvas['document_content']['markdown']
+    assert all(f'![](@U{n}): answer {n} ' in markdown for n in range(200))
+    assert 'Average 4.3/5 from 3 ratings' in markdown
+    assert '## Responses by person' in markdown
+    [message] = client.messages
+    assert 'https://hfc.slack.com/docs/T1/F123' in message['text']
+    assert 'Closed by <@Ucreator>' in message['text']
+
+
+def test_close_poll_threads_the_report_when_the_canvas_fails(main_module):
+    from slack_sdk.errors import SlackApiError
+    from slack_sdk.web.slack_response import SlackResponse
+
+    class NoCanvasClient(MockSlackClient):
+        def canvases_create(self, **kwargs):
+            self.canvases.append(kwargs)
+            response = SlackResponse(client=None, http_verb='POST', api_url='canvases.create', req_args={},
+                                     data={'ok': False, 'error': 'not_allowed_token_type'},
+                                     headers={}, status_code=200)
+            raise SlackApiError('not_allowed_token_type', response)
+
+    paragraph_poll(main_module, 200)
+    client = NoCanvasClient()
+
+    main_module.close_poll(lambda: None, {'user_id': 'Ucreator', 'channel_id': 'C1'}, client)
+
+    assert len(client.canvases) == 1  # not retried
+    first, *replies = client.messages
+    assert len(replies) >= 4
+    assert all(r['thread_ts'] == '1.000' for r in replies)
+    assert 'Closed by <@Ucreator>' in replies[-1]['text']
+
+
+def test_close_poll_links_vote_canvas_without_voter_list(main_module, poll_setup):
+    poll_setup['anonymous'] = False
+    client = MockSlackClient()
+    for n in range(120):
+        body = {'channel': {'id': 'C1'}, 'user': {'id': f'U{n}'}}
+        main_module.handle_vote(lambda: None, body, {'action_id': f'vote_{n % 2}', 'value': poll_setup['poll_id']}, client)
+    client.messages.clear()
+
+    main_module.close_poll(lambda: None, {'user_id': 'Ucreator', 'channel_id': 'C1'}, client)
+
+    markdown = client.canvases[0]['document_content']['markdown']
+    assert '**120 voters**' in markdown
+    assert '- ![](@U119): B' in markdown
+    [message] = client.messages
+    text = json.dumps(message['blocks'])
+    assert 'in a canvas in this channel' in text
+    assert '<@U1>' not in text
+
+
+def test_poll_results_paginates_ephemerals(main_module):
+    paragraph_poll(main_module, 200, anonymous=False)
+    client = MockSlackClient()
+
+    main_module.show_poll_results(lambda: None, {'user_id': 'U1', 'channel_id': 'C1'}, client)
+
+    pages = client.messages
+    assert len(pages) > 1
+    assert all(p['user'] == 'U1' for p in pages)
+    assert all(len(p['text']) <= main_module.RESULTS_CHUNK_CHARS for p in pages)
+    assert pages[-1]['text'].endswith(f'_Page {len(pages)}/{len(pages)}_')
+
+
+def test_post_pages_queues_each_page_without_waiting(main_module, monkeypatch):
+    from dispatcher import SlackDispatcher
+
+    answer = threading.Event()
+
+    class SlowClient(MockSlackClient):
+        def chat_postMessage(self, **kwargs):
+            answer.wait(2)
+            return super().chat_postMessage(**kwargs)
+
+    monkeypatch.setattr(main_module, 'dispatcher', SlackDispatcher(workers=2, rates={'chat_postMessage': (6000, 100)}))
+    client = SlowClient()
+
+    main_module.post_pages(client, 'C1', ['p1', 'p2', 'p3'])
+    assert not client.messages  # returned before Slack answered
+    answer.set()
+    main_module.dispatcher.join()
+
+    assert [m['text'] for m in client.messages] == ['p1', 'p2', 'p3']
+    assert [m['thread_ts'] for m in client.messages] == [None, '1.000', '1.000']
+
+
+def test_pack_text_splits_oversized_fragments(main_module):
+    chunks = list(main_module.pack_text(['ab', 'c' * 12, 'de'], limit=5))
+
+    assert chunks == ['ab', 'ccccc', 'ccccc', 'ccde']
+
+
+def test_vote_results_respect_block_limit(main_module, poll_setup, monkeypatch):
+    monkeypatch.setattr(main_module, 'results_canvas', False)
+    poll_setup['anonymous'] = False
+    client = MockSlackClient()
+    for n in range(120):
+        body = {'channel': {'id': 'C1'}, 'user': {'id': f'U{n}'}}
+        main_module.handle_vote(lambda: None, body, {'action_id': 'vote_0', 'value': poll_setup['poll_id']}, client)
+    client.messages.clear()
+
+    main_module.close_poll(lambda: None, {'user_id': 'Ucreator', 'channel_id': 'C1'}, client)
+
+    assert len(client.messages) == 3
+    assert all(len(m['blocks']) <= 50 for m in client.messages)
+    assert all(m['thread_ts'] == '1.000' for m in client.messages[1:])
+
+
+def test_poll_results_are_cached_until_the_poll_changes(main_module, poll_setup):
+    client = MockSlackClient()
+    body = {'user_id': 'U1', 'channel_id': 'C1'}
+    vote = {'action_id': 'vote_0', 'value': poll_setup['poll_id']}
+
+    main_module.show_poll_results(lambda: None, body, client)
+    loads = []
+    get_poll = main_module.store.get_poll
+    main_module.store.get_poll = lambda poll_id: loads.append(poll_id) or get_poll(poll_id)
+    main_module.show_poll_results(lambda: None, body, client)
+    assert not loads  # a hit does not load the poll
+    del main_module.store.get_poll
+    assert main_module.results_cache.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+    assert client.messages[0]['blocks'] is client.messages[1]['blocks']
+
+    main_module.handle_vote(lambda: None, {'channel': {'id': 'C1'}, 'user': {'id': 'U1'}}, vote, client)
+    main_module.show_poll_results(lambda: None, body, client)
+
+    assert main_module.results_cache.stats()['misses'] == 2
+    assert 'Votes: 1 (100%)' in client.messages[-1]['blocks'][2]['fields'][0]['text']
+
+
+
+def test_poll_results_are_cached_under_the_version_read_first(main_module, poll_setup):
+    client = MockSlackClient()
+    body = {'user_id': 'U1', 'channel_id': 'C1'}
+    get_poll = main_module.store.get_poll
+
+    def vote_while_rendering(poll_id):
+        main_module.store.record_vote(get_poll(poll_id), 'U1', 0)
+        return get_poll(poll_id)
+
+    main_module.store.get_poll = vote_while_rendering
+    main_module.show_poll_results(lambda: None, body, client)
+    del main_module.store.get_poll
+    main_module.show_poll_results(lambda: None, body, client)
+
+    assert main_module.results_cache.stats()['misses'] == 2
+    assert 'Votes: 1 (100%)' in client.messages[-1]['blocks'][2]['fields'][0]['text']
+
+
+
+def test_vote_reads_counts_and_not_every_ballot(main_module, poll_setup):
+    client = MockSlackClient()
+    vote = {'action_id': 'vote_1', 'value': poll_setup['poll_id']}
+    body = {'channel': {'id': 'C1'}, 'user': {'id': 'U1'}}
+    main_module.store.get_poll = lambda poll_id: pytest.fail('loaded every ballot')
+
+    main_module.handle_vote(lambda: None, body, vote, client)
+    del main_module.store.get_poll
+
+    assert 'Votes: 1 (100%)' in client.messages[0]['blocks'][3]['fields'][1]['text']
+
+
+def test_vote_racing_the_close_is_reported_closed(main_module, poll_setup):
+    client = MockSlackClient()
+    vote = {'action_id': 'vote_1', 'value': poll_setup['poll_id']}
+    record_vote = main_module.store.record_vote
+
+    def close_first(*args):
+        main_module.store.close_poll(poll_setup['poll_id'])
+        return record_vote(*args)
+
+    main_module.store.record_vote = close_first
+    main_module.handle_vote(lambda: None, {'channel': {'id': 'C1'}, 'user': {'id': 'U1'}}, vote, client)
+
+    assert client.messages[-1]['text'] == '❌ This poll is closed or not a vote poll.'
+    assert poll_setup['tallies'] == {0: 0, 1: 0}
+
+
+def test_metrics_export_listener_and_api_timings(main_module, poll_setup):
+    client = MockSlackClient()
+    vote = {'action_id': 'vote_1', 'value': poll_setup['poll_id']}
+    for n in range(3):
+        main_module.handle_vote(lambda: None, {'channel': {'id': 'C1'}, 'user': {'id': 'U1'}}, vote, client)
+
+    text, status, headers = main_module.export_metrics()
+
+    assert status == 200
+    assert headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    assert 'slack_listener_seconds_count{listener="handle_vote"} 3' in text
+    assert 'slack_listener_ack_seconds_count{listener="handle_vote"} 3' in text
+    assert 'slack_api_call_seconds_count{method="chat_postEphemeral"} 3' in text
+    assert 'poll_votes_total 1' in text
+    assert 'poll_store_entries{entry="active_polls"} 1' in text
+
+
+def test_profiled_listeners_report_on_admin_route(main_module, monkeypatch, tmp_path):
+    monkeypatch.setenv('PROFILE_LISTENERS', 'close_poll')
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path))
+    monkeypatch.setenv('PROFILE_TOKEN', 'secret')
+    del sys.modules['main']
+    main = importlib.import_module('main')
+    poll = main.store.add_poll(main.new_poll_data(
+        type='vote', question='Choose', options=['A', 'B'], tallies={0: 0, 1: 0},
+        creator_id='Ucreator', channel_id='C1', active=True))
+
+    main.close_poll(lambda: None, {'user_id': 'Ucreator', 'channel_id': 'C1'}, MockSlackClient())
+
+    assert not main.store.get_poll(poll['poll_id'])['active']
+    assert 'slack_listener_seconds_count{listener="close_poll"} 1' in main.export_metrics()[0]
+    monkeypatch.setattr(main, 'request', types.SimpleNamespace(headers={'Authorization': 'Bearer nope'}))
+    assert main.profile_reports()[1] == 404
+    monkeypatch.setattr(main, 'request', types.SimpleNamespace(headers={'Authorization': 'Bearer secret'}))
+    text, status, _ = main.profile_reports()
+    assert status == 200
+    assert 'build_vote_results_blocks' in text
+
+
+def test_retried_requests_are_acked_but_not_handled_again(main_module, poll_setup):
+    posted = []
+    client = types.SimpleNamespace(
+        chat_postMessage=lambda **k: posted.append(k) or {'ts': '111.222'},
+        conversations_open=lambda users: {'channel': {'id': 'D1'}})
+    meta = {'channel': 'C2', 'user': 'U1', 'type': 'vote', 'title': 'Pick', 'visibility': 'anonymous'}
+    state = {'values': {
+        'option_block_0': {'option_input_0': {'value': 'A'}},
+        'option_block_1': {'option_input_1': {'value': 'B'}},
+    }}
+    view = {'id': 'V1', 'hash': '1.abc', 'private_metadata': json.dumps(meta), 'state': state}
+    body = {'type': 'view_submission', 'trigger_id': '1.2.3', 'view': view}
+    acks = []
+
+    for _ in range(2):
+        main_module.handle_poll_submission(lambda: acks.append(True), body=body, view=view, client=client)
+
+    assert len(acks) == 2
+    assert [m['channel'] for m in posted] == ['C2', 'D1']
+
+    # a new submission of the same view has its own trigger_id
+    main_module.handle_poll_submission(lambda: None, body=dict(body, trigger_id='4.5.6'), view=view, client=client)
+    assert [m['channel'] for m in posted] == ['C2', 'D1', 'C2', 'D1']
+    assert 'slack_dropped_retries_total{listener="handle_poll_submission"} 1' in main_module.export_metrics()[0]
+
+
+def test_requests_that_failed_before_ack_are_handled_on_retry(main_module, monkeypatch):
+    load_draft = main_module.load_draft
+    failures = [RuntimeError('store unavailable')]
+
+    def flaky_load_draft(view):
+        if failures:
+            raise failures.pop()
+        return load_draft(view)
+
+    monkeypatch.setattr(main_module, 'load_draft', flaky_load_draft)
+    client = types.SimpleNamespace(chat_postMessage=lambda **k: {'ts': '1.0'},
+                                   conversations_open=lambda users: {'channel': {'id': 'D1'}})
+    meta = {'channel': 'C1', 'user': 'U1', 'type': 'ranking', 'title': 'Rate'}
+    view = {'id': 'V1', 'hash': '1.abc', 'private_metadata': json.dumps(meta), 'state': {'values': {}}}
+    body = {'type': 'view_submission', 'trigger_id': '1.2.3', 'view': view}
+    acks = []
+
+    with pytest.raises(RuntimeError):
+        main_module.handle_poll_submission(lambda: acks.append(True), body=body, view=view, client=client)
+    main_module.handle_poll_submission(lambda: acks.append(True), body=body, view=view, client=client)
+
+    assert acks == [True]
+    assert main_module.store.get_channel_poll('C1')['question'] == 'Rate'
+
+
+def test_fast_start_authorizes_without_auth_test(main_module, monkeypatch):
+    monkeypatch.setenv('FAST_START', '1')
+    monkeypatch.setitem(sys.modules, 'slack_bolt.authorization',
+                        types.SimpleNamespace(AuthorizeResult=dict))
+    del sys.modules['main']
+    main = importlib.import_module('main')
+
+    assert main.app.kwargs['token'] is None
+    assert main.authorize(None, 'T1', 'U1')['bot_token'] == 'x'
+    main.app.client = types.SimpleNamespace(
+        auth_test=lambda token: {'user_id': 'UBOT', 'bot_id': 'BBOT'})
+    main.verify_token()
+    assert main.authorize(None, 'T1', 'U1')['bot_user_id'] == 'UBOT'
+    assert set(main.stats()['startup']['phases_ms']) == {'imports', 'slack app', 'store', 'listeners'}
+
+
+
+def test_api_url_client_carries_the_token(main_module, monkeypatch):
+    monkeypatch.setenv('SLACK_API_URL', 'http://127.0.0.1:9/api')
+    del sys.modules['main']
+    main = importlib.import_module('main')
+
+    assert main.app.kwargs['token'] is None
+    assert main.app.kwargs['client'].token == 'x'
+    assert main.app.kwargs['client'].base_url == 'http://127.0.0.1:9/api/'
+
+
+def test_failed_export_is_reported_to_the_creator(main_module, poll_setup):
+    class NoDMClient(MockSlackClient):
+        def conversations_open(self, users=None):
+            raise TimeoutError('timed out')
+
+    client = NoDMClient()
+    main_module.dispatcher.backoff = 0
+    main_module.export_poll(lambda: None, {'user_id': 'Ucreator', 'channel_id': 'C1', 'text': 'csv'}, client)
+
+    assert client.messages[-1]['user'] == 'Ucreator'
+    assert client.messages[-1]['text'] == '❌ The export could not be sent. Please try again.'
+
+
+def test_export_needs_the_creator_or_the_export_token(main_module, poll_setup, monkeypatch):
+    client = MockSlackClient()
+    main_module.export_poll(lambda: None, {'user_id': 'U1', 'channel_id': 'C1', 'text': 'csv'}, client)
+    assert client.messages[-1]['text'] == '❌ Only the poll creator can export it.'
+
+    monkeypatch.setattr(main_module, 'export_token', 'secret')
+    request = types.SimpleNamespace(headers={'Authorization': 'Bearer nope'}, args={'format': 'csv'})
+    monkeypatch.setattr(main_module, 'request', request)
+    assert main_module.download_export(poll_setup['poll_id'])[1] == 404
+
+    request.headers['Authorization'] = 'Bearer secret'
+    chunks, status, headers = main_module.download_export(poll_setup['poll_id'])
+    assert status == 200 and headers['Content-Type'].startswith('text/csv')
+    assert ''.join(chunks).startswith('choice\r\n')
@@ -0,0 +1,61 @@
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from profiling import ListenerProfiler, profiler_from_env
+
+
+def build_report(rows):
+    return [''.join(str(n) for n in range(i)) for i in range(rows)]
+
+
+def close_poll(ack, body, client):
+    ack()
+    return build_report(200)
+
+
+def test_profiled_calls_write_reports(tmp_path):
+    profiler = ListenerProfiler(str(tmp_path), listeners=['close_poll'], memory=True, top=5)
+    wrapped = profiler.wrap(close_poll)
+    try:
+        assert wrapped(lambda: None, {}, None) == build_report(200)
+    finally:
+        tracemalloc.stop()
+
+    names = sorted(os.listdir(tmp_path))
+    assert [n.rsplit('.', 1)[1] for n in names] == ['prof', 'txt']
+    text = (tmp_path / names[1]).read_text()
+    assert text.startswith('close_poll: ')
+    assert 'build_report' in text
+    assert 'Largest allocations' in text
+    assert profiler.summary() == text
+
+
+def test_only_selected_slow_calls_are_kept(tmp_path):
+    profiler = ListenerProfiler(str(tmp_path), listeners=['close_poll'], min_seconds=60, every=2)
+
+    assert profiler.wrap(build_report) is build_report
+    wrapped = profiler.wrap(close_poll)
+    for _ in range(4):
+        wrapped(lambda: None, {}, None)
+
+    assert os.listdir(tmp_path) == []
+    assert profiler.summary() == 'No profiled calls yet.\n'
+
+
+def test_profiler_from_env(monkeypatch, tmp_path):
+    assert profiler_from_env() is None
+
+    monkeypatch.setenv('PROFILE_LISTENERS', 'close_poll, handle_vote')
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path / 'profiles'))
+    monkeypatch.setenv('PROFILE_MIN_MS', '250')
+    monkeypatch.setenv('PROFILE_TOKEN', 'secret')
+    profiler = profiler_from_env()
+
+    assert profiler.wants('handle_vote') and not profiler.wants('open_poll_modal')
+    assert profiler.cpu and not profiler.memory
+    assert profiler.min_seconds == 0.25
+    assert profiler.authorized('Bearer secret')
+    assert not profiler.authorized('Bearer wrong')
@@ -0,0 +1,34 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from scheduler import Scheduler
+
+
+def test_callbacks_run_in_deadline_order_and_cancelled_ones_are_skipped():
+    scheduler = Scheduler()
+    fired = []
+    done = threading.Event()
+
+    scheduler.call_later(0.15, fired.append, 'late')
+    scheduler.call_later(0.05, fired.append, 'early')
+    scheduler.call_later(0.1, fired.append, 'cancelled').cancel()
+    scheduler.call_later(0.2, done.set)
+
+    assert done.wait(2)
+    assert fired == ['early', 'late']
+
+
+def test_earlier_timer_wakes_the_scheduler():
+    scheduler = Scheduler()
+    done = threading.Event()
+
+    scheduler.call_later(60, done.set)
+    start = time.monotonic()
+    scheduler.call_later(0.05, done.set)
+
+    assert done.wait(2)
+    assert time.monotonic() - start < 1
@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import startup
+from startup import StartupTimer
+
+
+def test_startup_timer_reports_phases_since_process_start(monkeypatch):
+    now = [10.0]
+    monkeypatch.setattr(startup.time, 'perf_counter', lambda: now[0])
+    monkeypatch.setattr(startup, 'process_age', lambda: 0.5)
+    timer = StartupTimer()
+    now[0] += 0.25
+    timer.mark('app')
+    timer.done()
+
+    assert timer.report()['phases_ms'] == {'app': 750.0}
+    assert timer.report()['ready_ms'] == 750.0
+    assert str(timer) == 'Ready in 750 ms: app 750 ms'
+
+
+def test_process_age_is_plausible():
+    age = startup.process_age()
+    assert age is None or 0 <= age < 24 * 3600
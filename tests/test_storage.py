@@ -0,0 +1,283 @@
+import os
+import sys
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import storage
+from storage import JournaledStore, MemoryStore, SQLiteStore, new_poll_data
+
+
+def vote_poll(**fields):
+    return new_poll_data(
+        type='vote', question='Choose', options=['A', 'B'], tallies={0: 0, 1: 0},
+        creator_id='Ucreator', channel_id='C1', active=True, **fields)
+
+
+def feedback_poll():
+    return new_poll_data(
+        type='feedback', question='Survey',
+        feedback_questions=['Pick', 'Ok?', 'Rate'],
+        feedback_formats=[None, None, 'stars'],
+        feedback_kinds=['vote', 'vote', 'feedback'],
+        question_options=[['A', 'B', 'C'], [], []],
+        vote_tallies=[{0: 0, 1: 0, 2: 0}, {'yes': 0, 'no': 0}, {}],
+        multi_questions=[True, False, False],
+        creator_id='Ucreator', channel_id='C1', active=True)
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'journaled'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryStore()
+    if request.param == 'journaled':
+        store = JournaledStore(str(tmp_path / 'state'))
+        request.addfinalizer(store.close)
+        return store
+    return SQLiteStore(str(tmp_path / 'polls.db'))
+
+
+def test_single_choice_vote_rejects_second_vote(store):
+    poll = store.add_poll(vote_poll())
+
+    assert store.record_vote(poll, 'U1', 1)
+    assert not store.record_vote(poll, 'U1', 0)
+
+    data = store.get_poll(poll['poll_id'])
+    assert data['tallies'] == {0: 0, 1: 1}
+    assert data['votes'] == {'U1': 1}
+
+
+def test_multi_choice_vote_rejects_repeated_option(store):
+    poll = store.add_poll(vote_poll(multi=True))
+
+    assert store.record_vote(poll, 'U1', 0) == 1
+    assert store.record_vote(poll, 'U1', 1) == 1  # still one voter
+    assert not store.record_vote(poll, 'U1', 1)
+
+    data = store.get_poll(poll['poll_id'])
+    assert data['tallies'] == {0: 1, 1: 1}
+    assert data['votes'] == {'U1': {0, 1}}
+    assert store.record_vote(poll, 'U2', 1) == 2
+
+
+def test_feedback_updates_vote_tallies(store):
+    poll = store.add_poll(feedback_poll())
+
+    store.record_feedback(poll, 'U1', [[0, 2], 'yes', '4'])
+    store.record_feedback(poll, 'U2', [[2], 'no', '5'])
+
+    data = store.get_poll(poll['poll_id'])
+    assert data['vote_tallies'] == [{0: 1, 1: 0, 2: 2}, {'yes': 1, 'no': 1}, {}]
+    assert data['feedback_responses'] == [
+        {'user': 'U1', 'answers': [[0, 2], 'yes', '4']},
+        {'user': 'U2', 'answers': [[2], 'no', '5']},
+    ]
+
+
+def test_channel_poll_and_close(store):
+    first = store.add_poll(vote_poll())
+    second = store.add_poll(vote_poll())
+    store.set_message_ts(second['poll_id'], '123.456')
+
+    current = store.get_channel_poll('C1')
+    assert current['poll_id'] == second['poll_id']
+    assert current['message_ts'] == '123.456'
+
+    store.close_poll(second['poll_id'])
+    assert not store.get_poll(second['poll_id'])['active']
+    assert store.get_poll(first['poll_id'])['active']
+    assert store.get_channel_poll('C2') is None
+
+
+def test_close_poll_reports_only_the_first_close(store):
+    poll = store.add_poll(vote_poll(close_at=2e9, quorum=5))
+    store.add_poll(vote_poll())
+
+    assert store.pending_deadlines() == [(poll['poll_id'], 2e9)]
+    assert store.close_poll(poll['poll_id'])
+    assert not store.close_poll(poll['poll_id'])
+    assert store.pending_deadlines() == []
+    assert store.get_poll(poll['poll_id'])['quorum'] == 5
+
+
+def test_record_feedback_returns_the_response_count(store):
+    poll = store.add_poll(feedback_poll())
+
+    counts = [store.record_feedback(poll, f'U{n}', [[0], 'yes', '4']) for n in range(3)]
+
+    assert counts == [1, 2, 3]
+
+
+
+def test_closed_polls_record_nothing(store):
+    poll = store.add_poll(vote_poll())
+    survey = store.add_poll(feedback_poll())
+    store.close_poll(poll['poll_id'])
+    store.close_poll(survey['poll_id'])
+
+    assert store.record_vote(poll, 'U1', 0) is False
+    assert store.record_feedback(survey, 'U1', [[0], 'yes', '4']) is False
+    assert store.get_poll(poll['poll_id'])['tallies'] == {0: 0, 1: 0}
+    assert store.get_poll(survey['poll_id'])['feedback_responses'] == []
+
+
+def test_poll_counts_carry_the_tallies(store):
+    poll = store.add_poll(vote_poll(quorum=3))
+    store.record_vote(poll, 'U1', 1)
+
+    counts = store.get_poll_counts(poll['poll_id'])
+
+    assert counts['tallies'] == {0: 0, 1: 1}
+    assert (counts['active'], counts['quorum'], counts['options']) == (True, 3, ['A', 'B'])
+    assert store.get_poll_counts('missing') is None
+
+
+def test_drafts_are_saved_until_they_expire(store, monkeypatch):
+    draft = {'channel': 'C1', 'user': 'U1', 'questions': ['Q'] * 10}
+    draft_id = store.save_draft(draft)
+    assert store.get_draft(draft_id) == draft
+    draft['title'] = 'T'
+    assert store.save_draft(draft) == draft_id
+    assert store.get_draft(draft_id)['title'] == 'T'
+    assert store.get_draft('missing') is None
+
+    later = time.time() + storage.DRAFT_TTL + 1, time.monotonic() + storage.DRAFT_TTL + 1
+    monkeypatch.setattr(storage, 'time', types.SimpleNamespace(time=lambda: later[0], monotonic=lambda: later[1]))
+    other = store.save_draft({'user': 'U2'})
+    assert store.get_draft(draft_id) is None
+    store.delete_draft(other)
+    assert store.get_draft(other) is None
+
+
+def test_draft_updates_are_atomic(store):
+    draft_id = store.save_draft({'user': 'U1', 'inputs': {}})
+    store.get_draft(draft_id)['inputs']['stray'] = 1  # a copy, not the stored draft
+
+    def select(n):
+        return store.update_draft(draft_id, lambda draft: draft['inputs'].update({f'q_{n}': n}))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(select, range(40)))
+
+    assert store.get_draft(draft_id)['inputs'] == {f'q_{n}': n for n in range(40)}
+    assert store.update_draft('missing', lambda draft: None) is None
+
+
+def test_sqlite_state_is_shared_between_stores(tmp_path):
+    path = str(tmp_path / 'polls.db')
+    worker_a = SQLiteStore(path)
+    worker_b = SQLiteStore(path)
+
+    poll = worker_a.add_poll(vote_poll())
+    assert worker_b.record_vote(poll, 'U1', 0)
+    assert not worker_a.record_vote(poll, 'U1', 1)
+
+    assert worker_a.get_poll(poll['poll_id'])['tallies'] == {0: 1, 1: 0}
+    mode = worker_a._conn().execute('PRAGMA journal_mode').fetchone()[0]
+    assert mode == 'wal'
+
+
+def test_sqlite_parallel_votes_are_counted_exactly(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'polls.db'))
+    poll = store.add_poll(vote_poll())
+    users = 300
+
+    def click(n):
+        return store.record_vote(poll, f'U{n % users}', n % 2)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        voters = [n for n in pool.map(click, range(users * 2)) if n]
+
+    # every recorded vote saw the voter count including itself
+    assert sorted(voters) == list(range(1, users + 1))
+    assert sum(store.get_poll(poll['poll_id'])['tallies'].values()) == users
+
+
+def test_feedback_keeps_running_star_aggregates(store):
+    poll = store.add_poll(feedback_poll())
+
+    store.record_feedback(poll, 'U1', [[0], 'yes', '4'])
+    store.record_feedback(poll, 'U2', [[1], 'no', '5'])
+    store.record_feedback(poll, 'U3', [[2], 'no', '4'])
+
+    aggs = store.get_poll(poll['poll_id'])['aggregates']
+    assert aggs[2] == {'count': 3, 'sum': 13, 'stars': [0, 0, 0, 2, 1]}
+    assert aggs[0]['count'] == aggs[1]['count'] == 0
+
+
+def test_mutations_bump_the_poll_version(store):
+    poll = store.add_poll(vote_poll())
+    version = store.get_poll(poll['poll_id'])['version']
+
+    store.record_vote(poll, 'U1', 0)
+    store.record_vote(poll, 'U1', 0)  # duplicate, nothing changes
+    assert store.get_poll(poll['poll_id'])['version'] == version + 1
+
+    store.close_poll(poll['poll_id'])
+    assert store.get_poll(poll['poll_id'])['version'] == version + 2
+    assert store.channel_poll_version('C1') == (poll['poll_id'], False, version + 2)
+    assert store.channel_poll_version('C2') is None
+
+
+def test_stats_count_polls_votes_and_responses(store):
+    poll = store.add_poll(vote_poll())
+    survey = store.add_poll(feedback_poll())
+    store.record_vote(poll, 'U1', 0)
+    store.record_vote(poll, 'U2', 1)
+    store.record_feedback(survey, 'U1', [[0], 'yes', '5'])
+    store.close_poll(survey['poll_id'])
+
+    assert store.stats() == {'polls': 2, 'active_polls': 1, 'votes': 2, 'responses': 1}
+
+
+def test_journaled_store_restores_snapshot_and_journal_tail(tmp_path):
+    directory = str(tmp_path / 'state')
+    store = JournaledStore(directory)
+    vote = store.add_poll(vote_poll(anonymous=False))
+    survey = store.add_poll(feedback_poll())
+    store.record_vote(vote, 'U1', 1)
+    store.record_feedback(survey, 'U1', [[0, 2], 'yes', '4'])
+    store.snapshot()
+    store.record_vote(vote, 'U2', 0)
+    store.set_message_ts(vote['poll_id'], '123.456')
+    store.close_poll(survey['poll_id'])
+    store.close()
+
+    restored = JournaledStore(directory)
+    try:
+        assert restored.restore_stats['polls'] == 2
+        assert restored.restore_stats['journal_entries'] == 3
+        data = restored.get_poll(vote['poll_id'])
+        assert data['votes'] == {'U1': 1, 'U2': 0}
+        assert data['tallies'] == {0: 1, 1: 1}
+        assert data['message_ts'] == '123.456'
+        assert data['version'] == vote['version']
+        data = restored.get_channel_poll('C1')
+        assert data['poll_id'] == survey['poll_id'] and not data['active']
+        assert data['vote_tallies'] == [{0: 1, 1: 0, 2: 1}, {'yes': 1, 'no': 0}, {}]
+        assert data['aggregates'][2] == {'count': 1, 'sum': 4, 'stars': [0, 0, 0, 1, 0]}
+        assert not restored.record_vote(vote, 'U1', 0)
+    finally:
+        restored.close()
+
+
+def test_journaled_store_drops_journals_a_snapshot_replaces(tmp_path):
+    directory = str(tmp_path / 'state')
+    store = JournaledStore(directory)
+    poll = store.add_poll(vote_poll())
+    store.record_vote(poll, 'U1', 0)
+    store.snapshot()
+    store.close()
+
+    assert sorted(os.listdir(directory)) == ['journal.2.log', 'lock', 'snapshot.json']
+    first = JournaledStore(directory)
+    try:
+        with pytest.raises(RuntimeError):
+            JournaledStore(directory)
+    finally:
+        first.close()
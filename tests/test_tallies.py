@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from tallies import Ballots, Tally, UserIds, choices
+
+
+def test_tally_reads_like_a_dict():
+    tally = Tally.of({0: 2, 1: 0})
+    tally.add(1)
+    tally.add('yes', 3)
+
+    assert tally == {0: 2, 1: 1, 'yes': 3}
+    assert tally.get(5, 0) == 0
+    assert tally.total() == 6
+
+
+def test_single_choice_ballots_keep_the_first_vote():
+    ballots = Ballots(users=UserIds())
+
+    assert ballots.add('U1', 2)
+    assert not ballots.add('U1', 0)
+    assert ballots.add('U2', 0)
+
+    assert ballots == {'U1': 2, 'U2': 0}
+    assert 'U3' not in ballots
+    assert list(ballots.voters()) == [('U1', 0b100), ('U2', 0b1)]
+
+
+def test_multi_choice_ballots_store_a_bitmask_per_voter():
+    ballots = Ballots.of({'U1': {0, 3}}, multi=True, users=UserIds())
+
+    assert ballots.add('U1', 1)
+    assert not ballots.add('U1', 3)
+
+    assert ballots['U1'] == {0, 1, 3}
+    assert len(ballots) == 1
+    assert list(choices(0b1011)) == [0, 1, 3]
+
+
+def test_ballots_intern_only_their_own_voters():
+    for n in range(1000):
+        Ballots().add(f'U{n}', 0)
+
+    ballots = Ballots.of({'Ua': 0, 'Ub': 1})
+    assert len(ballots.masks) == 2
+    assert Ballots.load(*ballots.dump()) == {'Ua': 0, 'Ub': 1}
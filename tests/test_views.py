@@ -0,0 +1,144 @@
+import os
+import sys
+from concurrent.futures import Future
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from views import ViewUpdater, fingerprint, focus_page, summary_block
+
+
+class ApiError(Exception):
+    def __init__(self, error):
+        super().__init__(error)
+        self.response = {'ok': False, 'error': error}
+
+
+class FakeSlack:
+    """Answer views_update like Slack: a stale hash is a hash_conflict."""
+
+    def __init__(self, hold=False):
+        self.hash = 'h0'
+        self.calls = []
+        self.held = [] if hold else None
+
+    def submit(self, client, method, **kwargs):
+        self.calls.append(kwargs)
+        future = Future()
+        if self.held is not None:
+            self.held.append((future, kwargs))
+        else:
+            self.answer(future, kwargs)
+        return future
+
+    def answer(self, future, kwargs):
+        if kwargs.get('hash') not in (None, self.hash):
+            future.set_exception(ApiError('hash_conflict'))
+            return
+        self.hash = f'h{len(self.calls)}'
+        future.set_result({'ok': True, 'view': {'id': kwargs['view_id'], 'hash': self.hash}})
+
+    def release(self):
+        future, kwargs = self.held.pop(0)
+        self.answer(future, kwargs)
+
+
+def modal(types, typed=''):
+    blocks = [{'type': 'input', 'block_id': f'q_{i}',
+               'element': {'type': 'plain_text_input', 'initial_value': typed}} for i in types]
+    return {'type': 'modal', 'blocks': blocks}
+
+
+def test_fingerprint_ignores_entered_values():
+    assert fingerprint(modal([0, 1], 'a')) == fingerprint(modal([0, 1], 'b'))
+    assert fingerprint(modal([0, 1])) != fingerprint(modal([0]))
+
+
+def test_updates_skip_unchanged_layouts_and_pass_the_hash():
+    slack = FakeSlack()
+    updates = ViewUpdater(slack.submit)
+
+    updates.request(None, 'V1', 'h0', lambda: modal([0]))
+    updates.request(None, 'V1', 'h1', lambda: modal([0], 'typed'))
+    updates.request(None, 'V1', 'h1', lambda: modal([0, 1]))
+
+    assert [c['hash'] for c in slack.calls] == ['h0', 'h1']
+    assert updates.stats() == {'sent': 2, 'skipped': 1, 'coalesced': 0, 'conflicts': 0, 'views': 1}
+
+
+def test_requests_during_an_update_coalesce_into_the_newest():
+    slack = FakeSlack(hold=True)
+    updates = ViewUpdater(slack.submit)
+
+    updates.request(None, 'V1', 'h0', lambda: modal([0]))
+    # clicked before the first update landed, so they carry its old hash
+    updates.request(None, 'V1', 'h0', lambda: modal([0, 1]))
+    updates.request(None, 'V1', 'h0', lambda: modal([0, 1, 2]))
+    assert len(slack.calls) == 1
+    slack.release()
+    slack.release()
+
+    assert len(slack.calls) == 2
+    assert len(slack.calls[1]['view']['blocks']) == 3
+    assert slack.calls[1]['hash'] == 'h1'
+    assert updates.stats()['coalesced'] == 2
+    assert updates.stats()['conflicts'] == 0
+
+
+def test_stale_update_loses_to_a_newer_one():
+    slack = FakeSlack()
+    updates = ViewUpdater(slack.submit)
+    slack.hash = 'h9'  # updated elsewhere since the action was sent
+
+    updates.request(None, 'V1', 'h0', lambda: modal([0]))
+    updates.request(None, 'V1', 'h9', lambda: modal([0]))
+
+    assert updates.stats()['conflicts'] == 1
+    assert [c['hash'] for c in slack.calls] == ['h0', 'h9']
+
+
+def test_deferred_requests_wait_for_the_burst():
+    slack = FakeSlack()
+    deferred = []
+    updates = ViewUpdater(slack.submit, lambda delay, func, *args: deferred.append((func, args)), delay=0.1)
+
+    for n in range(1, 4):
+        updates.request(None, 'V1', 'h0', lambda n=n: modal(range(n)))
+    assert not slack.calls
+    func, args = deferred.pop()
+    func(*args)
+
+    assert not deferred
+    assert len(slack.calls) == 1
+    assert len(slack.calls[0]['view']['blocks']) == 3
+
+
+
+def test_failed_build_frees_the_view():
+    slack = FakeSlack()
+    updates = ViewUpdater(slack.submit)
+
+    def broken():
+        raise KeyError('draft')
+
+    with pytest.raises(KeyError):
+        updates.request(None, 'V1', 'h0', broken)
+    updates.request(None, 'V1', 'h0', lambda: modal([0]))
+
+    assert len(slack.calls) == 1
+    assert updates.stats()['coalesced'] == 0
+
+
+def test_focus_page_keeps_the_nearest_summaries_within_budget():
+    render = lambda i: [{'type': 'input', 'block_id': f'q_{i}'}] * 5
+    summary = lambda i: summary_block(f'Question {i}', i)
+
+    page = focus_page([{'type': 'header'}], 10, 4, render, summary, max_blocks=12)
+
+    assert len(page) == 12
+    shown = [b['accessory']['value'] for b in page if 'accessory' in b]
+    assert shown == ['2', '3', '5', '6']
+    assert page[-2]['elements'][0]['text'].startswith('5 more questions')
+    assert [b['value'] for b in page[-1]['elements']] == ['3', '5']
+    assert focus_page([], 10, 42, render, summary)[-1]['elements'][0]['value'] == '8'
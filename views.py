@@ -0,0 +1,208 @@
+"""Render and send `views_update` for the /poll configuration modal.
+
+Selecting a question type or kind re-renders the /poll modal. `ViewUpdater`
+makes those updates cheap and safe when clicks come quickly:
+
+- an update whose blocks have the same structure as the last one sent for
+  the view is skipped; values the user entered do not count, since the
+  open modal already shows them;
+- the view's `hash` is passed, so Slack answers `hash_conflict` instead of
+  letting an update built from a stale view overwrite a newer one;
+- each view has at most one update scheduled or in flight. Actions arriving
+  meanwhile replace the pending one, so a burst becomes one update built
+  from the newest state.
+
+`focus_page` keeps a page within a block and byte budget whatever the number
+of questions: only the question being edited is rendered in full.
+"""
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# Element fields holding the user's input rather than the modal's layout.
+_INPUT_FIELDS = frozenset((
+    "initial_value", "initial_option", "initial_options", "initial_date",
+    "initial_time", "initial_date_time", "initial_user", "initial_users",
+    "initial_channel", "initial_channels", "initial_conversation",
+    "initial_conversations",
+))
+
+
+def _structure(value):
+    if isinstance(value, dict):
+        return {k: _structure(v) for k, v in value.items() if k not in _INPUT_FIELDS}
+    if isinstance(value, list):
+        return [_structure(v) for v in value]
+    return value
+
+
+def fingerprint(view):
+    """Return a digest of `view` that ignores the values the user entered."""
+    text = json.dumps(_structure(view), sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def _size(block):
+    return len(json.dumps(block, ensure_ascii=False, separators=(",", ":")).encode())
+
+
+def summary_block(text, index):
+    """Return a one-line stand-in for item `index` with a button to edit it."""
+    return {
+        "type": "section",
+        "text": {"type": "mrkdwn", "text": text},
+        "accessory": {"type": "button", "text": {"type": "plain_text", "text": "Edit"},
+                      "action_id": f"edit_q_{index}", "value": str(index)},
+    }
+
+
+def _nav_block(focus, count):
+    buttons = []
+    if focus > 0:
+        buttons.append({"type": "button", "text": {"type": "plain_text", "text": "◀ Previous"},
+                        "action_id": "page_q_prev", "value": str(focus - 1)})
+    if focus < count - 1:
+        buttons.append({"type": "button", "text": {"type": "plain_text", "text": "Next ▶"},
+                        "action_id": "page_q_next", "value": str(focus + 1)})
+    return {"type": "actions", "block_id": "page_nav", "elements": buttons}
+
+
+def focus_page(header, count, focus, render, summary, max_blocks=100, max_bytes=24000):
+    """Return the blocks of a page editing item `focus` of `count`.
+
+    `render(i)` returns item i's input blocks and `summary(i)` one block
+    standing in for it. The focused item is rendered in full among the
+    summaries of the others. Summaries nearest to it are kept while the page
+    stays within `max_blocks` blocks and `max_bytes` bytes of JSON; the rest
+    are counted in a note and reached with the Previous/Next buttons.
+    """
+    focus = min(max(focus, 0), count - 1)
+    focused = render(focus)
+    blocks = list(header) + focused
+    if count > 1:
+        blocks.append(_nav_block(focus, count))
+    # leave room for the note about summaries that do not fit
+    spare_blocks = max_blocks - len(blocks) - 1
+    spare_bytes = max_bytes - sum(map(_size, blocks)) - 200
+    shown = {}
+    for i in sorted(range(count), key=lambda i: (abs(i - focus), i))[1:]:
+        block = summary(i)
+        size = _size(block)
+        if spare_blocks < 1 or size > spare_bytes:
+            break
+        shown[i] = block
+        spare_blocks -= 1
+        spare_bytes -= size
+    before = [shown[i] for i in range(focus) if i in shown]
+    after = [shown[i] for i in range(focus + 1, count) if i in shown]
+    page = list(header) + before + focused + after
+    hidden = count - 1 - len(shown)
+    if hidden:
+        page.append({"type": "context", "elements": [{"type": "mrkdwn", "text": (
+            f"{hidden} more question{'s' if hidden != 1 else ''} not shown; "
+            "use Previous and Next to reach them.")}]})
+    if count > 1:
+        page.append(_nav_block(focus, count))
+    return page
+
+
+def error_code(error):
+    """Return the Slack error code of a failed Web API call, e.g. "hash_conflict"."""
+    response = getattr(error, "response", None)
+    try:
+        return response.get("error")
+    except AttributeError:
+        return None
+
+
+class ViewUpdater:
+    """Coalesce, deduplicate and hash-check `views_update` calls per view.
+
+    `submit(client, method, **kwargs)` sends a call and returns a Future, e.g.
+    `SlackDispatcher.submit`; `defer(delay, func, *args)` runs `func` later,
+    e.g. `Scheduler.call_later`. Requests wait `delay` seconds for more to
+    arrive; with `delay=0` they are sent from the caller's thread.
+    """
+
+    def __init__(self, submit, defer=None, delay=0.0, max_views=1000):
+        self._submit = submit
+        self._defer = defer
+        self.delay = delay
+        self.max_views = max_views
+        self._lock = threading.Lock()
+        self._pending = {}  # view_id -> newest (client, view_hash, build)
+        self._busy = set()  # views with an update scheduled or in flight
+        # view_id -> (fingerprint sent, hash it was sent with, hash it returned)
+        self._views = OrderedDict()
+        self.counts = {"sent": 0, "skipped": 0, "coalesced": 0, "conflicts": 0}
+
+    def request(self, client, view_id, view_hash, build):
+        """Update view `view_id` to `build()`, the view built from the latest
+        state. `view_hash` is the hash of the view the action came from."""
+        with self._lock:
+            self._pending[view_id] = (client, view_hash, build)
+            if view_id in self._busy:
+                self.counts["coalesced"] += 1
+                return
+            self._busy.add(view_id)
+        if self.delay > 0 and self._defer is not None:
+            self._defer(self.delay, self._flush, view_id)
+        else:
+            self._flush(view_id)
+
+    def _flush(self, view_id):
+        while True:
+            with self._lock:
+                request = self._pending.pop(view_id, None)
+                if request is None:
+                    self._busy.discard(view_id)
+                    return
+            client, view_hash, build = request
+            try:
+                view = build()
+                digest = fingerprint(view)
+                with self._lock:
+                    sent, sent_with, returned = self._views.get(view_id, (None, None, None))
+                    if digest == sent:
+                        self.counts["skipped"] += 1
+                        continue
+                    self.counts["sent"] += 1
+                # An action fired before our last update landed carries the
+                # hash that update replaced; the hash it returned is the
+                # current one unless someone else has updated the view since.
+                if view_hash is not None and view_hash == sent_with:
+                    view_hash = returned
+                kwargs = {"view_id": view_id, "view": view}
+                if view_hash:
+                    kwargs["hash"] = view_hash
+                future = self._submit(client, "views_update", **kwargs)
+            except BaseException:
+                # free the view so the next request is not coalesced forever
+                with self._lock:
+                    self._pending.pop(view_id, None)
+                    self._busy.discard(view_id)
+                raise
+            future.add_done_callback(functools.partial(self._done, view_id, view_hash, digest))
+            return
+
+    def _done(self, view_id, view_hash, digest, future):
+        error = future.exception()
+        with self._lock:
+            if error is None:
+                response = future.result() or {}
+                returned = (response.get("view") or {}).get("hash")
+                self._views[view_id] = (digest, view_hash, returned)
+                self._views.move_to_end(view_id)
+                while len(self._views) > self.max_views:
+                    self._views.popitem(last=False)
+            elif error_code(error) == "hash_conflict":
+                # the view changed under us; the newer update stands
+                self.counts["conflicts"] += 1
+        # send what arrived while this update was in flight, or free the view
+        self._flush(view_id)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts, views=len(self._views))